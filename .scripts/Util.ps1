@@ -141,6 +141,38 @@ function Invoke-PythonFunction {
     Invoke-Expression -Command $pythonCommand
 }
 
+function Request-DataverseBudget {
+    param (
+        [Parameter(Mandatory = $true)]
+        [string]$Deployment,
+
+        [Parameter(Mandatory = $true)]
+        [string]$Environment,
+
+        [Parameter(Mandatory = $false)]
+        [int]$Count = 1,
+
+        [Parameter(Mandatory = $false)]
+        [int]$TimeoutSeconds = 300
+    )
+
+    # Reserves requests from the request budget shared with the Python Dataverse client,
+    # so pac calls and the backend stay under the service protection limits together.
+    # Example: Request-DataverseBudget -Deployment "Development" -Environment "INDUSTRY APPS CORE" -Count 20
+
+    $budgetScript = "$PSScriptRoot\..\ui-tools\dataverse-client\request_budget.py"
+    if (-not (Test-Path $budgetScript) -or -not (Get-Command python -ErrorAction SilentlyContinue)) {
+        return
+    }
+
+    $output = python "$budgetScript" reserve --deployment "$Deployment" --environment "$Environment" --count $Count --timeout $TimeoutSeconds 2>$null
+    if ($LASTEXITCODE -ne 0) {
+        # Budgeting is best effort; never block a deployment because it is unavailable
+        Write-Host "Request budget not reserved: $output" -ForegroundColor DarkGray
+    }
+    $global:LASTEXITCODE = 0
+}
+
 function Select-ItemFromList {
     param(
         [Parameter(Mandatory = $true)]
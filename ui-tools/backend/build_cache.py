@@ -0,0 +1,276 @@
+"""
+Build Cache
+
+Content-addressed cache of built solution packages. A module's build inputs
+(its `src/` tree and `.cdsproj`) are hashed Merkle-style: every file has a
+digest, every directory a digest of its sorted entries, and the module's
+source digest is the digest of the root. File digests are cached by
+(mtime, size) stamp, so checking 30 unchanged modules only stats their files.
+
+After a successful build the packages in `.releases/<module>` are copied into
+the cache under the source digest. A later build of the same source and
+version is skipped when the release packages are still in place, or served
+by copying them back from the cache when they were removed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .workspace_index import file_stamp
+except ImportError:
+    from workspace_index import file_stamp
+
+logger = logging.getLogger(__name__)
+
+# Folders inside src/ that are build output or tooling, not solution source
+EXCLUDE_FOLDERS = {"bin", "obj", "__pycache__", "node_modules"}
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """Source digests of modules and the packages built from them"""
+
+    def __init__(self, project_root: Path, cache_dir: Path, max_builds_per_module: int = 3):
+        """
+        Args:
+            project_root: Repository root (module paths and .releases are relative to it)
+            cache_dir: Directory for the digest index and the cached packages
+            max_builds_per_module: Cached builds kept per module (oldest are removed)
+        """
+        self.project_root = Path(project_root)
+        self.cache_dir = Path(cache_dir)
+        self.index_path = self.cache_dir / "index.json"
+        self.max_builds_per_module = max(1, max_builds_per_module)
+
+        self._lock = threading.Lock()
+        self._files: Dict[str, List[Any]] = {}  # relative path -> [mtime_ns, size, digest]
+        self._builds: Dict[str, List[Dict[str, Any]]] = {}  # module path -> records, newest first
+        self._dirty = False
+        self.stats = {"hits": 0, "restored": 0, "misses": 0, "filesHashed": 0, "filesReused": 0}
+        self._load()
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._files = data.get("files", {})
+            self._builds = data.get("builds", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable build cache index {self.index_path}: {e}")
+
+    def save(self) -> None:
+        """Write the digest index if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"files": self._files, "builds": self._builds}
+            self._dirty = False
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Could not save build cache index: {e}")
+
+    # -------------------------------------------------------------------------
+    # Source digests
+    # -------------------------------------------------------------------------
+
+    def _file_digest(self, path: Path, relative: str) -> str:
+        stamp = file_stamp(path)
+        with self._lock:
+            cached = self._files.get(relative)
+        if cached is not None and stamp is not None and (cached[0], cached[1]) == stamp:
+            self.stats["filesReused"] += 1
+            return cached[2]
+
+        digest = _hash_file(path)
+        self.stats["filesHashed"] += 1
+        if stamp is not None:
+            with self._lock:
+                self._files[relative] = [stamp[0], stamp[1], digest]
+                self._dirty = True
+        return digest
+
+    def _tree_digest(self, directory: Path, relative: str, seen: set) -> str:
+        """Digest of a directory: its sorted (name, kind, digest) entries"""
+        entries: List[Tuple[str, str, str]] = []
+        try:
+            items = list(os.scandir(directory))
+        except OSError:
+            items = []
+        for item in items:
+            child = f"{relative}/{item.name}"
+            if item.is_dir(follow_symlinks=False):
+                if item.name not in EXCLUDE_FOLDERS:
+                    entries.append((item.name, "d", self._tree_digest(Path(item.path), child, seen)))
+            elif item.is_file():
+                seen.add(child)
+                entries.append((item.name, "f", self._file_digest(Path(item.path), child)))
+
+        digest = hashlib.blake2b(digest_size=20)
+        for name, kind, child_digest in sorted(entries):
+            digest.update(f"{name}\0{kind}\0{child_digest}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def source_digest(self, module_path: str) -> str:
+        """
+        Digest of a module's build inputs (src/ and the .cdsproj project file)
+
+        Raises:
+            FileNotFoundError: If the module has no src folder
+        """
+        module_dir = self.project_root / module_path
+        if not (module_dir / "src").is_dir():
+            raise FileNotFoundError(f"No src folder in {module_path}")
+
+        seen: set = set()
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"src\0d\0{self._tree_digest(module_dir / 'src', f'{module_path}/src', seen)}\n".encode("utf-8"))
+        for project in sorted(module_dir.glob("*.cdsproj")):
+            relative = f"{module_path}/{project.name}"
+            seen.add(relative)
+            digest.update(f"{project.name}\0f\0{self._file_digest(project, relative)}\n".encode("utf-8"))
+
+        # Forget digests of files removed from this module
+        prefix = f"{module_path}/"
+        with self._lock:
+            removed = [path for path in self._files if path.startswith(prefix) and path not in seen]
+            for path in removed:
+                del self._files[path]
+            if removed:
+                self._dirty = True
+        return digest.hexdigest()
+
+    # -------------------------------------------------------------------------
+    # Builds
+    # -------------------------------------------------------------------------
+
+    def _release_dir(self, module_name: str) -> Path:
+        return self.project_root / ".releases" / module_name
+
+    def _store_dir(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / digest
+
+    def lookup(self, module_path: str, module_name: str, version: str, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        Build record of packages built from this source digest and version
+
+        Release packages that were removed or replaced since the build are copied
+        back from the cache. Returns None (a miss) if there is no such build or its
+        cached packages are gone.
+        """
+        with self._lock:
+            records = list(self._builds.get(module_path, []))
+        record = next((r for r in records if r["digest"] == digest and r["version"] == version), None)
+        if record is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        release_dir = self._release_dir(module_name)
+        restored = []
+        for package in record["packages"]:
+            target = release_dir / package["name"]
+            if file_stamp(target) == tuple(package["stamp"]):
+                continue
+            source = self._store_dir(digest) / package["name"]
+            if not source.exists():
+                with self._lock:
+                    self.stats["misses"] += 1
+                return None
+            release_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+            package["stamp"] = list(file_stamp(target))
+            restored.append(package["name"])
+
+        with self._lock:
+            self.stats["restored" if restored else "hits"] += 1
+            if restored:
+                self._dirty = True
+        self.save()
+        return {**record, "restored": restored}
+
+    def record(self, module_path: str, module_name: str, version: str, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        Cache the packages of a successful build (the .releases files of this version)
+
+        Returns:
+            The build record, or None if the build left no packages
+        """
+        release_dir = self._release_dir(module_name)
+        packages = sorted(release_dir.glob(f"*-v{version}.zip")) if release_dir.is_dir() else []
+        if not packages:
+            return None
+
+        store_dir = self._store_dir(digest)
+        store_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for package in packages:
+            shutil.copy2(package, store_dir / package.name)
+            entries.append({"name": package.name, "stamp": list(file_stamp(package)), "size": package.stat().st_size})
+
+        record = {
+            "digest": digest,
+            "version": version,
+            "packages": entries,
+            "builtAt": datetime.now().isoformat()
+        }
+        with self._lock:
+            records = [r for r in self._builds.get(module_path, []) if r["digest"] != digest or r["version"] != version]
+            records.insert(0, record)
+            expired = records[self.max_builds_per_module:]
+            self._builds[module_path] = records[:self.max_builds_per_module]
+            kept = {r["digest"] for builds in self._builds.values() for r in builds}
+            self._dirty = True
+
+        for old in expired:
+            if old["digest"] not in kept:
+                shutil.rmtree(self._store_dir(old["digest"]), ignore_errors=True)
+        self.save()
+        return record
+
+    def status(self, module_path: str, module_name: str, version: str) -> Dict[str, Any]:
+        """Whether a module's packages are current for its source (without restoring anything)"""
+        try:
+            digest = self.source_digest(module_path)
+        except FileNotFoundError:
+            return {"path": module_path, "version": version, "upToDate": False, "digest": None}
+        with self._lock:
+            record = next(
+                (r for r in self._builds.get(module_path, []) if r["digest"] == digest and r["version"] == version),
+                None
+            )
+        return {
+            "path": module_path,
+            "version": version,
+            "digest": digest,
+            "upToDate": record is not None,
+            "builtAt": record["builtAt"] if record else None,
+            "packages": [p["name"] for p in record["packages"]] if record else []
+        }
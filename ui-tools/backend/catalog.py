@@ -0,0 +1,330 @@
+"""
+Workspace Catalog
+
+Persistent SQLite catalog of modules, solution metadata, global option sets
+and their options. Every parsed file is stored with its (mtime, size) stamp,
+so a cold start only re-parses files that changed since the last run, and
+filtered lookups (by module, publisher prefix or option value range) run as
+indexed SQL queries.
+"""
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the schema changes; older catalogs are dropped and rebuilt
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS modules (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    top_category TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_modules_name ON modules(name);
+
+CREATE TABLE IF NOT EXISTS solutions (
+    file_path TEXT PRIMARY KEY,
+    module_path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    unique_name TEXT,
+    localized_name TEXT,
+    display_name TEXT,
+    version TEXT,
+    prefix TEXT,
+    option_value_prefix TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_solutions_module ON solutions(module_path);
+CREATE INDEX IF NOT EXISTS ix_solutions_unique_name ON solutions(unique_name);
+CREATE INDEX IF NOT EXISTS ix_solutions_prefix ON solutions(prefix);
+
+CREATE TABLE IF NOT EXISTS option_sets (
+    file_path TEXT PRIMARY KEY,
+    module_path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    schema_name TEXT,
+    display_name TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_option_sets_module ON option_sets(module_path);
+CREATE INDEX IF NOT EXISTS ix_option_sets_schema_name ON option_sets(schema_name);
+
+CREATE TABLE IF NOT EXISTS options (
+    file_path TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    value INTEGER,
+    value_text TEXT NOT NULL,
+    label TEXT NOT NULL,
+    PRIMARY KEY (file_path, position)
+);
+CREATE INDEX IF NOT EXISTS ix_options_value ON options(value);
+"""
+
+
+def _to_int(value: str) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class WorkspaceCatalog:
+    """
+    SQLite store behind the workspace index.
+
+    Paths are stored relative to the project root so the catalog survives moving
+    the repository. All access is serialized through one connection.
+    """
+
+    def __init__(self, db_path: Path, project_root: Path):
+        """
+        Open (or create) the catalog
+
+        Args:
+            db_path: SQLite database file
+            project_root: Repository root that stored paths are relative to
+        """
+        self.db_path = Path(db_path)
+        self.project_root = Path(project_root).resolve()
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS modules; DROP TABLE IF EXISTS solutions;"
+                "DROP TABLE IF EXISTS option_sets; DROP TABLE IF EXISTS options;"
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _rel(self, path: Path) -> str:
+        return Path(path).relative_to(self.project_root).as_posix()
+
+    def _abs(self, relative: str) -> Path:
+        return self.project_root / Path(relative)
+
+    # ------------------------------------------------------------------
+    # Persistence for the workspace index
+    # ------------------------------------------------------------------
+
+    def load_parsed(self) -> Dict[Path, Tuple[Tuple[int, int], Dict[str, Any]]]:
+        """
+        Load every stored parse result with its stamp
+
+        Returns:
+            Mapping of absolute file path -> ((mtime_ns, size), parsed data) in the
+            format produced by parse_solution_xml / parse_optionset_xml
+        """
+        parsed: Dict[Path, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        with self._lock:
+            for row in self._conn.execute("SELECT * FROM solutions"):
+                parsed[self._abs(row["file_path"])] = ((row["mtime_ns"], row["size"]), {
+                    "uniqueName": row["unique_name"],
+                    "localizedName": row["localized_name"],
+                    "displayName": row["display_name"],
+                    "version": row["version"],
+                    "prefix": row["prefix"],
+                    "optionValuePrefix": row["option_value_prefix"]
+                })
+
+            options: Dict[str, List[Dict[str, str]]] = {}
+            for row in self._conn.execute("SELECT file_path, value_text, label FROM options ORDER BY file_path, position"):
+                options.setdefault(row["file_path"], []).append({"value": row["value_text"], "label": row["label"]})
+
+            for row in self._conn.execute("SELECT * FROM option_sets"):
+                parsed[self._abs(row["file_path"])] = ((row["mtime_ns"], row["size"]), {
+                    "schemaName": row["schema_name"],
+                    "displayName": row["display_name"],
+                    "options": options.get(row["file_path"], [])
+                })
+        return parsed
+
+    def sync(
+        self,
+        modules: Iterable[Any],
+        upserts: Dict[Path, Tuple[str, Path, Tuple[int, int], Dict[str, Any]]],
+        deletes: Iterable[Path]
+    ) -> None:
+        """
+        Write index changes in one transaction
+
+        Args:
+            modules: Current module entries (path, name, category, top_category)
+            upserts: file path -> (kind "solution"/"optionset", module path, stamp, parsed data)
+            deletes: File paths that no longer exist or no longer belong to a module
+        """
+        with self._lock, self._conn:
+            conn = self._conn
+            conn.execute("DELETE FROM modules")
+            conn.executemany(
+                "INSERT INTO modules (path, name, category, top_category) VALUES (?, ?, ?, ?)",
+                [(self._rel(m.path), m.name, m.category, m.top_category) for m in modules]
+            )
+
+            for path in deletes:
+                rel = self._rel(path)
+                conn.execute("DELETE FROM solutions WHERE file_path = ?", (rel,))
+                conn.execute("DELETE FROM option_sets WHERE file_path = ?", (rel,))
+                conn.execute("DELETE FROM options WHERE file_path = ?", (rel,))
+
+            for path, (kind, module_path, stamp, data) in upserts.items():
+                rel = self._rel(path)
+                if kind == "solution":
+                    conn.execute(
+                        "INSERT OR REPLACE INTO solutions (file_path, module_path, mtime_ns, size, unique_name, "
+                        "localized_name, display_name, version, prefix, option_value_prefix) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (rel, self._rel(module_path), stamp[0], stamp[1], data["uniqueName"], data["localizedName"],
+                         data["displayName"], data["version"], data["prefix"], data["optionValuePrefix"])
+                    )
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO option_sets (file_path, module_path, mtime_ns, size, schema_name, display_name) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (rel, self._rel(module_path), stamp[0], stamp[1], data["schemaName"], data["displayName"])
+                    )
+                    conn.execute("DELETE FROM options WHERE file_path = ?", (rel,))
+                    conn.executemany(
+                        "INSERT INTO options (file_path, position, value, value_text, label) VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (rel, i, _to_int(o["value"]), o["value"], o["label"])
+                            for i, o in enumerate(data["options"])
+                        ]
+                    )
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query_option_sets(
+        self,
+        module: Optional[str] = None,
+        category: Optional[str] = None,
+        prefix: Optional[str] = None,
+        value_min: Optional[int] = None,
+        value_max: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query option sets (scan_option_sets format)
+
+        Args:
+            module: Module folder name
+            category: Top-level category folder
+            prefix: Publisher prefix of the schema name (e.g. "appbase")
+            value_min: Only option sets with an option value >= value_min
+            value_max: Only option sets with an option value <= value_max
+
+        Returns:
+            Matching option sets with their labelled options
+        """
+        where, params = [], []
+        if module:
+            where.append("m.name = ?")
+            params.append(module)
+        if category:
+            where.append("m.top_category = ?")
+            params.append(category)
+        if prefix:
+            where.append("os.schema_name LIKE ? ESCAPE '\\'")
+            params.append(prefix.replace("_", "\\_").replace("%", "\\%") + "\\_%")
+        if value_min is not None or value_max is not None:
+            where.append(
+                "os.file_path IN (SELECT file_path FROM options WHERE value BETWEEN ? AND ?)"
+            )
+            params.extend([
+                value_min if value_min is not None else -(2 ** 63),
+                value_max if value_max is not None else 2 ** 63 - 1
+            ])
+
+        sql = (
+            "SELECT os.file_path, os.schema_name, os.display_name, m.name AS module, m.top_category AS category "
+            "FROM option_sets os JOIN modules m ON m.path = os.module_path"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY m.top_category, m.name, os.display_name"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            options: Dict[str, List[Dict[str, str]]] = {}
+            paths = [row["file_path"] for row in rows]
+            for start in range(0, len(paths), 500):
+                chunk = paths[start:start + 500]
+                for opt in self._conn.execute(
+                    f"SELECT file_path, value_text, label FROM options WHERE file_path IN ({','.join('?' * len(chunk))}) "
+                    f"AND label != '' ORDER BY file_path, position",
+                    chunk
+                ):
+                    options.setdefault(opt["file_path"], []).append({"value": opt["value_text"], "label": opt["label"]})
+
+        return [
+            {
+                "schemaName": row["schema_name"],
+                "displayName": row["display_name"],
+                "options": options.get(row["file_path"], []),
+                "category": row["category"],
+                "module": row["module"],
+                "filePath": str(Path(row["file_path"]))
+            }
+            for row in rows
+        ]
+
+    def query_solutions(self, prefix: Optional[str] = None, option_value_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Query solutions (list_solutions format) by publisher prefix or option value prefix"""
+        where, params = [], []
+        if prefix:
+            where.append("s.prefix = ?")
+            params.append(prefix)
+        if option_value_prefix:
+            where.append("s.option_value_prefix = ?")
+            params.append(option_value_prefix)
+
+        sql = (
+            "SELECT s.*, m.name AS module, m.top_category AS category FROM solutions s "
+            "JOIN modules m ON m.path = s.module_path"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY m.top_category, m.name"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {
+                "uniqueName": row["unique_name"],
+                "displayName": row["localized_name"],
+                "category": row["category"],
+                "module": row["module"],
+                "path": str(Path(row["module_path"])),
+                "prefix": row["prefix"],
+                "optionValuePrefix": row["option_value_prefix"]
+            }
+            for row in rows
+        ]
+
+    def max_option_value(self, module_path: Path) -> Optional[int]:
+        """Highest option value used by any option set of a module"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(o.value) FROM options o JOIN option_sets os ON os.file_path = o.file_path "
+                "WHERE os.module_path = ?",
+                (self._rel(module_path),)
+            ).fetchone()
+        return row[0] if row else None
@@ -0,0 +1,189 @@
+"""
+Changelog Index
+
+Parses a module's CHANGELOG.md once into an ordered index of its `## `
+sections (title, version, date and byte offsets) and caches the index by file
+stamp. Release endpoints extract sections, check whether Unreleased has
+content and preview the release transformation from the index instead of
+re-reading the file and running a regular expression per request. Release
+notes of many modules are collected in one pass.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    from .workspace_index import file_stamp
+except ImportError:
+    from workspace_index import file_stamp
+
+CHANGELOG_FILE = "CHANGELOG.md"
+
+_HEADING = re.compile(rb"^## (.*?)\r?$", re.MULTILINE)
+_VERSION_TITLE = re.compile(r"^\[?(?P<version>\d[\w.\-]*)\]?(?:\s*-\s*(?P<date>\S+))?")
+
+# Unreleased content shorter than this (subheadings excluded) counts as empty
+MIN_UNRELEASED_LENGTH = 10
+
+
+class ChangelogSection(NamedTuple):
+    title: str
+    version: Optional[str]  # None for Unreleased and other unversioned sections
+    date: Optional[str]
+    start: int  # Byte offset of the "## " heading
+    body_start: int  # Byte offset after the heading line
+    end: int  # Byte offset of the next "## " heading (or end of file)
+
+    @property
+    def unreleased(self) -> bool:
+        return self.title.strip("[]").lower() == "unreleased"
+
+
+class Changelog:
+    """One parsed CHANGELOG.md"""
+
+    def __init__(self, path: Path, data: bytes):
+        self.path = path
+        self.data = data
+        self.sections: List[ChangelogSection] = []
+        self._versions: Dict[str, ChangelogSection] = {}
+
+        headings = list(_HEADING.finditer(data))
+        for index, match in enumerate(headings):
+            title = match.group(1).decode("utf-8", errors="replace").strip()
+            version_match = _VERSION_TITLE.match(title)
+            body_start = match.end() + 1 if data[match.end():match.end() + 1] == b"\n" else match.end()
+            section = ChangelogSection(
+                title=title,
+                version=version_match.group("version") if version_match else None,
+                date=version_match.group("date") if version_match else None,
+                start=match.start(),
+                body_start=body_start,
+                end=headings[index + 1].start() if index + 1 < len(headings) else len(data)
+            )
+            self.sections.append(section)
+            if section.version is not None:
+                self._versions.setdefault(section.version, section)
+
+    @property
+    def text(self) -> str:
+        return self.data.decode("utf-8")
+
+    @property
+    def unreleased(self) -> Optional[ChangelogSection]:
+        return next((section for section in self.sections if section.unreleased), None)
+
+    def section(self, version: str) -> Optional[ChangelogSection]:
+        return self._versions.get(version)
+
+    def body(self, section: ChangelogSection) -> str:
+        """Content of a section without its heading, stripped"""
+        return self.data[section.body_start:section.end].decode("utf-8", errors="replace").strip()
+
+    def notes(self, version: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Release notes of a version, falling back to Unreleased
+
+        Returns:
+            (content, source) with source "versioned", "unreleased" or "none"
+        """
+        if version:
+            section = self.section(version)
+            if section is not None:
+                return self.body(section), "versioned"
+        unreleased = self.unreleased
+        if unreleased is not None:
+            return self.body(unreleased), "unreleased"
+        return "", "none"
+
+    def unreleased_is_empty(self) -> bool:
+        """True if Unreleased has no content besides subheadings (or is missing)"""
+        unreleased = self.unreleased
+        if unreleased is None:
+            return True
+        content = "\n".join(
+            line for line in self.body(unreleased).splitlines() if not line.lstrip().startswith("#")
+        ).strip()
+        return len(content) < MIN_UNRELEASED_LENGTH
+
+    def release(self, version: str, date: str) -> str:
+        """
+        The changelog after releasing a version, as Full-Release-UI.ps1 writes it:
+        a new empty Unreleased section followed by the versioned section
+
+        Raises:
+            ValueError: If there is no Unreleased section
+        """
+        unreleased = self.unreleased
+        if unreleased is None:
+            raise ValueError("CHANGELOG.md does not contain an '## Unreleased' section")
+        heading = f"## Unreleased\n\n## [{version}] - {date}".encode("utf-8")
+        line_end = self.data.find(b"\n", unreleased.start)
+        if line_end == -1:
+            line_end = len(self.data)
+        elif self.data[line_end - 1:line_end] == b"\r":
+            line_end -= 1
+        return (self.data[:unreleased.start] + heading + self.data[line_end:]).decode("utf-8")
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [
+            {"title": s.title, "version": s.version, "date": s.date, "start": s.start, "end": s.end}
+            for s in self.sections
+        ]
+
+
+class ChangelogIndex:
+    """Parsed changelogs of the workspace modules, re-parsed only when a file changes"""
+
+    def __init__(self, project_root: Path, max_entries: int = 256):
+        self.project_root = Path(project_root)
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Path, Tuple[Tuple[int, int], Changelog]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, module_path: str) -> Optional[Changelog]:
+        """Parsed CHANGELOG.md of a module (None if it has none)"""
+        path = self.project_root / module_path / CHANGELOG_FILE
+        stamp = file_stamp(path)
+        if stamp is None:
+            return None
+
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == stamp:
+                self._cache.move_to_end(path)
+                self.stats["hits"] += 1
+                return cached[1]
+            self.stats["misses"] += 1
+
+        changelog = Changelog(path, path.read_bytes())
+        with self._lock:
+            self._cache[path] = (stamp, changelog)
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return changelog
+
+    def aggregate(self, module_paths: Iterable[str], version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Release notes of many modules (the given version or Unreleased) in one pass
+
+        Returns:
+            {"modules": [{modulePath, source, content}], "content": combined Markdown}
+        """
+        modules = []
+        parts = []
+        for module_path in module_paths:
+            changelog = self.get(module_path)
+            if changelog is None:
+                modules.append({"modulePath": module_path, "source": "missing", "content": ""})
+                continue
+            content, source = changelog.notes(version)
+            modules.append({"modulePath": module_path, "source": source, "content": content})
+            if content:
+                parts.append(f"## {Path(module_path).name}\n\n{content}")
+        return {"modules": modules, "content": "\n\n".join(parts)}
@@ -0,0 +1,276 @@
+"""
+Dataverse Client Registry
+
+Keeps authenticated DataverseClient instances per (deployment, environment)
+between helper requests. The parsed deployments.json is cached and reloaded
+only when the file changes, and idle clients keep their access token and warm
+connection pool, so consecutive requests skip config parsing, authentication
+and TLS setup. Clients unused for longer than the idle timeout are closed.
+
+A client is leased to one request at a time (per-request state such as the
+solution component buffer lives on the client); concurrent requests for the
+same environment get additional clients that are pooled as well.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from client import DataverseClient
+from workspace_index import file_stamp
+
+
+class ClientConfigError(ValueError):
+    """Deployment configuration does not allow creating a client for the requested environment"""
+
+
+class ClientSettings(NamedTuple):
+    environment_url: str
+    tenant_id: str
+    client_id: str
+    client_secret: str
+
+
+class _IdleClient(NamedTuple):
+    client: DataverseClient
+    settings: ClientSettings
+    released_at: float
+
+
+class ClientRegistry:
+    """Pool of authenticated Dataverse clients keyed by (deployment, environment)"""
+
+    def __init__(self, config_path: Path, idle_timeout: float = 600.0, max_idle_clients: int = 16):
+        """
+        Args:
+            config_path: Path to deployments.json
+            idle_timeout: Seconds an unused client is kept before it is closed
+            max_idle_clients: Maximum number of idle clients kept across all environments
+        """
+        self.config_path = Path(config_path)
+        self.idle_timeout = idle_timeout
+        self.max_idle_clients = max_idle_clients
+
+        self._config: Optional[Dict[str, Any]] = None
+        self._config_stamp: Optional[Tuple[int, int]] = None
+        self._idle: "OrderedDict[Tuple[str, str], List[_IdleClient]]" = OrderedDict()
+        self._leased: Dict[int, Tuple[Tuple[str, str], ClientSettings]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"reused": 0, "created": 0, "evicted": 0}
+
+    # -------------------------------------------------------------------------
+    # Configuration
+    # -------------------------------------------------------------------------
+
+    def load_config(self) -> Dict[str, Any]:
+        """
+        Parsed deployments.json, re-read only when the file changed.
+
+        The returned dictionary is shared; callers must not modify it.
+
+        Raises:
+            ClientConfigError: If the configuration file does not exist
+        """
+        stamp = file_stamp(self.config_path)
+        if stamp is None:
+            raise ClientConfigError(f"Configuration not found at {self.config_path}")
+
+        with self._lock:
+            if stamp != self._config_stamp:
+                with open(self.config_path, "r") as f:
+                    self._config = json.load(f)
+                self._config_stamp = stamp
+            return self._config
+
+    def resolve(self, deployment: str, environment: str) -> ClientSettings:
+        """
+        Connection settings of an environment from the deployment's Auth block
+
+        Raises:
+            ClientConfigError: If the deployment, its credentials or the environment URL are missing
+        """
+        deployments = self.load_config().get("Deployments", {})
+        if deployment not in deployments:
+            raise ClientConfigError(f"Deployment '{deployment}' not found in configuration")
+
+        auth_config = deployments[deployment].get("Auth")
+        if not auth_config:
+            raise ClientConfigError(
+                f"Auth configuration missing for deployment '{deployment}'. "
+                "Please add Auth section with TenantId, ClientId, ClientSecret, and EnvironmentUrls."
+            )
+
+        tenant_id = auth_config.get("TenantId")
+        client_id = auth_config.get("ClientId")
+        client_secret = auth_config.get("ClientSecret")
+        if not all([tenant_id, client_id, client_secret]):
+            raise ClientConfigError(
+                f"Incomplete auth configuration for deployment '{deployment}'. "
+                "TenantId, ClientId, and ClientSecret are required."
+            )
+
+        environment_url = auth_config.get("EnvironmentUrls", {}).get(environment)
+        if not environment_url:
+            raise ClientConfigError(
+                f"Environment URL not configured for '{environment}' in deployment '{deployment}'"
+            )
+
+        return ClientSettings(environment_url, tenant_id, client_id, client_secret)
+
+    # -------------------------------------------------------------------------
+    # Client leases
+    # -------------------------------------------------------------------------
+
+    def acquire(self, deployment: str, environment: str) -> DataverseClient:
+        """
+        Lease an authenticated client for an environment
+
+        Reuses an idle client with the same settings if there is one; clients
+        created from outdated settings (credentials or URL changed) are closed.
+        Return the client with ``release`` when the request is done.
+
+        Raises:
+            ClientConfigError: If the environment is not configured
+            Exception: If authentication fails
+        """
+        key = (deployment, environment)
+        settings = self.resolve(deployment, environment)
+        stale: List[DataverseClient] = []
+        client = None
+
+        with self._lock:
+            self._evict_expired(stale)
+            idle = self._idle.get(key, [])
+            while idle and client is None:
+                entry = idle.pop()
+                if entry.settings == settings:
+                    client = entry.client
+                else:
+                    stale.append(entry.client)
+            if not idle:
+                self._idle.pop(key, None)
+
+        self._close_all(stale)
+
+        with self._lock:
+            self.stats["reused" if client is not None else "created"] += 1
+
+        if client is None:
+            client = DataverseClient(
+                environment_url=settings.environment_url,
+                tenant_id=settings.tenant_id,
+                client_id=settings.client_id,
+                client_secret=settings.client_secret
+            )
+            try:
+                client.authenticate()
+            except Exception:
+                client.close()
+                raise
+
+        with self._lock:
+            self._leased[id(client)] = (key, settings)
+        return client
+
+    def release(self, client: DataverseClient) -> None:
+        """Return a leased client to the pool, dropping its per-request state"""
+        client.component_buffer = None
+        stale: List[DataverseClient] = []
+
+        with self._lock:
+            leased = self._leased.pop(id(client), None)
+            if leased is None:
+                stale.append(client)
+            else:
+                key, settings = leased
+                self._idle.setdefault(key, []).append(_IdleClient(client, settings, time.monotonic()))
+                self._idle.move_to_end(key)
+                self._evict_overflow(stale)
+
+        self._close_all(stale)
+
+    @contextmanager
+    def lease(self, deployment: str, environment: str) -> Iterator[DataverseClient]:
+        """Context manager around ``acquire``/``release``"""
+        client = self.acquire(deployment, environment)
+        try:
+            yield client
+        finally:
+            self.release(client)
+
+    # -------------------------------------------------------------------------
+    # Eviction
+    # -------------------------------------------------------------------------
+
+    def _evict_expired(self, stale: List[DataverseClient]) -> None:
+        """Move clients idle for longer than the timeout to stale (lock held)"""
+        cutoff = time.monotonic() - self.idle_timeout
+        for key in list(self._idle):
+            entries = self._idle[key]
+            expired = [entry for entry in entries if entry.released_at < cutoff]
+            if expired:
+                stale.extend(entry.client for entry in expired)
+                entries[:] = [entry for entry in entries if entry.released_at >= cutoff]
+            if not entries:
+                del self._idle[key]
+
+    def _evict_overflow(self, stale: List[DataverseClient]) -> None:
+        """Drop least recently used idle clients above max_idle_clients (lock held)"""
+        self._evict_expired(stale)
+        count = sum(len(entries) for entries in self._idle.values())
+        while count > self.max_idle_clients:
+            key = next(iter(self._idle))
+            entries = self._idle[key]
+            stale.append(entries.pop(0).client)
+            if not entries:
+                del self._idle[key]
+            count -= 1
+
+    def _close_all(self, clients: List[DataverseClient]) -> None:
+        if clients:
+            with self._lock:
+                self.stats["evicted"] += len(clients)
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    def evict_idle(self) -> int:
+        """Close clients that have been idle for longer than the timeout; returns the number closed"""
+        stale: List[DataverseClient] = []
+        with self._lock:
+            self._evict_expired(stale)
+        self._close_all(stale)
+        return len(stale)
+
+    def close(self) -> None:
+        """Close every idle client (leased clients are closed when released)"""
+        stale: List[DataverseClient] = []
+        with self._lock:
+            for entries in self._idle.values():
+                stale.extend(entry.client for entry in entries)
+            self._idle.clear()
+            self._leased.clear()
+        self._close_all(stale)
+
+    def status(self) -> Dict[str, Any]:
+        """Idle and leased client counts per deployment/environment"""
+        now = time.monotonic()
+        with self._lock:
+            idle = {
+                f"{deployment}/{environment}": {
+                    "idle": len(entries),
+                    "idleSeconds": round(now - max(entry.released_at for entry in entries), 1)
+                }
+                for (deployment, environment), entries in self._idle.items()
+            }
+            leased: Dict[str, int] = {}
+            for (deployment, environment), _ in self._leased.values():
+                name = f"{deployment}/{environment}"
+                leased[name] = leased.get(name, 0) + 1
+        return {"idle": idle, "leased": leased}
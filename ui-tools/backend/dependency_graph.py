@@ -0,0 +1,427 @@
+"""
+Module Dependency Graph
+
+Cross-module dependency graph extracted from the unpacked solutions:
+
+- Solution.xml: RootComponents (which module owns which table) and
+  MissingDependencies (components required from other solutions)
+- Other/Relationships/*.xml: relationships whose tables belong to other modules
+- Entities/*/Entity.xml: lookup columns, resolved to their target tables
+  through the relationships that define them
+
+Every parsed file is cached with its (mtime, size) stamp, in memory and in a JSON
+cache file, so refreshes (and restarts) only re-parse files that changed.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from .workspace_index import file_stamp
+except ImportError:
+    from workspace_index import file_stamp
+
+logger = logging.getLogger(__name__)
+
+# Bump when the parsed format changes; older cache files are ignored
+CACHE_VERSION = 1
+
+# RootComponent type of tables
+COMPONENT_TYPE_ENTITY = "1"
+
+
+def parse_solution_dependencies(path: Path) -> Dict[str, Any]:
+    """
+    Owned tables and required solutions of a Solution.xml
+
+    Only custom tables (with the solution publisher's prefix) count as owned; system
+    tables such as contact are merely customized by whichever solution includes them.
+
+    Returns:
+        Dictionary with uniqueName, entities (lowercase logical name -> root component
+        behavior) and required (list of {solution, type, name, dependent})
+    """
+    root = ET.parse(path).getroot()
+    manifest = root.find("SolutionManifest")
+    result = {"uniqueName": None, "entities": {}, "required": []}
+    if manifest is None:
+        return result
+
+    result["uniqueName"] = manifest.findtext("UniqueName")
+    prefix = (manifest.findtext("Publisher/CustomizationPrefix") or "").lower()
+
+    for component in manifest.iterfind("RootComponents/RootComponent"):
+        name = (component.get("schemaName") or "").lower()
+        if component.get("type") == COMPONENT_TYPE_ENTITY and prefix and name.startswith(f"{prefix}_"):
+            result["entities"][name] = component.get("behavior", "0")
+
+    for missing in manifest.iterfind("MissingDependencies/MissingDependency"):
+        required = missing.find("Required")
+        if required is None or not required.get("solution"):
+            continue
+        dependent = missing.find("Dependent")
+        result["required"].append({
+            # "appbase_core (1.1.2.2)" -> "appbase_core"
+            "solution": required.get("solution").split(" (")[0].strip(),
+            "type": required.get("type"),
+            "name": required.get("schemaName") or required.get("displayName"),
+            "dependent": dependent.get("schemaName") or dependent.get("displayName") if dependent is not None else None
+        })
+    return result
+
+
+def parse_relationships(path: Path) -> List[Dict[str, str]]:
+    """One-to-many relationships of a Relationships/*.xml file (table names lowercase)"""
+    relationships = []
+    for element in ET.parse(path).getroot().iter("EntityRelationship"):
+        referencing = element.findtext("ReferencingEntityName")
+        referenced = element.findtext("ReferencedEntityName")
+        if not referencing or not referenced:
+            continue
+        relationships.append({
+            "name": element.get("Name"),
+            "referencing": referencing.lower(),
+            "referenced": referenced.lower(),
+            "attribute": (element.findtext("ReferencingAttributeName") or "").lower()
+        })
+    return relationships
+
+
+def parse_entity_lookups(path: Path) -> Dict[str, Any]:
+    """Logical name and custom lookup columns of an Entity.xml"""
+    entity = None
+    lookups = []
+    for _, element in ET.iterparse(path, events=("end",)):
+        if element.tag == "entity" and entity is None:
+            entity = (element.get("Name") or "").lower()
+        elif element.tag == "attribute":
+            if element.findtext("Type") == "lookup" and element.findtext("IsCustomField") == "1":
+                lookups.append((element.findtext("LogicalName") or element.get("PhysicalName", "")).lower())
+            element.clear()
+    if entity is None:
+        entity = path.parent.name.lower()
+    return {"entity": entity, "lookups": lookups}
+
+
+_PARSERS = {
+    "solution": parse_solution_dependencies,
+    "relationships": parse_relationships,
+    "entity": parse_entity_lookups
+}
+
+
+class DependencyGraph:
+    """
+    Dependency graph between workspace modules.
+
+    An edge A -> B means module A needs module B to be installed first. Each edge
+    keeps the reasons it was derived from (required components, relationships,
+    lookups). Refreshes re-parse only files whose stamps changed.
+    """
+
+    def __init__(self, project_root: Path, cache_path: Optional[Path] = None, min_refresh_interval: float = 2.0):
+        """
+        Initialize the graph
+
+        Args:
+            project_root: Repository root that module paths are relative to
+            cache_path: JSON file caching parsed files between runs (no persistence if None)
+            min_refresh_interval: Seconds during which a refresh is skipped after the last one
+        """
+        self.project_root = Path(project_root).resolve()
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.min_refresh_interval = min_refresh_interval
+
+        self._parsed: Dict[str, Tuple[Tuple[int, int], Any]] = {}  # relative file path -> (stamp, data)
+        self._modules: List[str] = []
+        self._module_keys: Optional[Tuple[Tuple[str, str], ...]] = None
+        self._edges: Dict[str, Dict[str, List[str]]] = {}  # module -> dependency -> reasons
+        self._last_refresh = 0.0
+        self.stats = {"refreshes": 0, "parsed": 0}
+        self._lock = threading.Lock()
+        self._load_cache()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _load_cache(self) -> None:
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("version") == CACHE_VERSION:
+                self._parsed = {path: (tuple(stamp), data) for path, (stamp, data) in cache["files"].items()}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable dependency cache {self.cache_path}: {e}")
+
+    def _save_cache(self) -> None:
+        if not self.cache_path:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "files": self._parsed}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not save dependency cache: {e}")
+
+    def _module_files(self, module_path: str) -> List[Tuple[str, str]]:
+        """(kind, relative path) of the files of a module that carry dependency information"""
+        src = self.project_root / module_path / "src"
+        files = [("solution", f"{module_path}/src/Other/Solution.xml")]
+        relationships_dir = src / "Other" / "Relationships"
+        if relationships_dir.is_dir():
+            files += [
+                ("relationships", f"{module_path}/src/Other/Relationships/{p.name}")
+                for p in sorted(relationships_dir.glob("*.xml"))
+            ]
+        entities_dir = src / "Entities"
+        if entities_dir.is_dir():
+            files += [
+                ("entity", f"{module_path}/src/Entities/{p.name}/Entity.xml")
+                for p in sorted(entities_dir.iterdir()) if (p / "Entity.xml").is_file()
+            ]
+        return files
+
+    def refresh(self, modules: Iterable[Dict[str, Any]], force: bool = False) -> bool:
+        """
+        Bring the graph up to date, re-parsing only changed files
+
+        Args:
+            modules: Workspace modules (dictionaries with "path" relative to the project root)
+            force: Refresh even within min_refresh_interval of the last refresh
+
+        Returns:
+            True if any file was (re)parsed or the module set changed
+        """
+        module_keys = tuple(sorted((m["path"], m.get("uniqueName") or "") for m in modules))
+        with self._lock:
+            now = time.monotonic()
+            if (not force and module_keys == self._module_keys
+                    and now - self._last_refresh < self.min_refresh_interval):
+                return False
+            self._last_refresh = now
+            self.stats["refreshes"] += 1
+
+            files: Dict[str, List[Tuple[str, str]]] = {path: self._module_files(path) for path, _ in module_keys}
+            seen: Set[str] = set()
+            parsed = 0
+            for module_files in files.values():
+                for kind, relative in module_files:
+                    seen.add(relative)
+                    stamp = file_stamp(self.project_root / relative)
+                    cached = self._parsed.get(relative)
+                    if stamp is None:
+                        self._parsed.pop(relative, None)
+                        continue
+                    if cached is not None and cached[0] == stamp:
+                        continue
+                    try:
+                        data = _PARSERS[kind](self.project_root / relative)
+                    except (ET.ParseError, OSError) as e:
+                        logger.warning(f"Could not parse {relative}: {e}")
+                        data = None
+                    self._parsed[relative] = (stamp, data)
+                    parsed += 1
+
+            removed = [path for path in self._parsed if path not in seen]
+            for path in removed:
+                del self._parsed[path]
+
+            changed = bool(parsed or removed) or module_keys != self._module_keys
+            if changed:
+                self._module_keys = module_keys
+                self._modules = [path for path, _ in module_keys]
+                self._edges = self._derive_edges(files)
+                self.stats["parsed"] += parsed
+                self._save_cache()
+                logger.info(f"Dependency graph refreshed: {parsed} file(s) parsed, {len(self._modules)} modules")
+            return changed
+
+    def _derive_edges(self, files: Dict[str, List[Tuple[str, str]]]) -> Dict[str, Dict[str, List[str]]]:
+        def data(relative: str) -> Any:
+            entry = self._parsed.get(relative)
+            return entry[1] if entry else None
+
+        solutions = {module: data(module_files[0][1]) or {} for module, module_files in files.items()}
+
+        # Owning module per solution unique name and per table (full root components win)
+        by_unique_name = {s["uniqueName"]: m for m, s in solutions.items() if s.get("uniqueName")}
+        owners: Dict[str, str] = {}
+        for module, solution in sorted(solutions.items()):
+            for entity, behavior in solution.get("entities", {}).items():
+                if entity not in owners or behavior == "0":
+                    owners[entity] = module
+
+        # Lookup target per (table, lookup column), from every module's relationships
+        lookup_targets: Dict[Tuple[str, str], str] = {}
+        module_relationships: Dict[str, List[Dict[str, str]]] = {}
+        for module, module_files in files.items():
+            relationships = []
+            for kind, relative in module_files:
+                if kind == "relationships":
+                    relationships += data(relative) or []
+            module_relationships[module] = relationships
+            for relationship in relationships:
+                if relationship["attribute"]:
+                    lookup_targets[(relationship["referencing"], relationship["attribute"])] = relationship["referenced"]
+
+        edges: Dict[str, Dict[str, List[str]]] = {module: {} for module in files}
+
+        def add(module: str, dependency: Optional[str], reason: str) -> None:
+            if dependency and dependency != module:
+                reasons = edges[module].setdefault(dependency, [])
+                if reason not in reasons:
+                    reasons.append(reason)
+
+        for module, solution in solutions.items():
+            for required in solution.get("required", []):
+                add(module, by_unique_name.get(required["solution"]),
+                    f"requires {required['name'] or required['type']} from {required['solution']}")
+
+            for relationship in module_relationships[module]:
+                for entity in (relationship["referencing"], relationship["referenced"]):
+                    add(module, owners.get(entity), f"relationship {relationship['name']} uses table {entity}")
+
+            for kind, relative in files[module]:
+                entity_data = data(relative) if kind == "entity" else None
+                if not entity_data or owners.get(entity_data["entity"]) != module:
+                    continue
+                for lookup in entity_data["lookups"]:
+                    target = lookup_targets.get((entity_data["entity"], lookup))
+                    add(module, owners.get(target), f"lookup {entity_data['entity']}.{lookup} targets {target}")
+
+        return edges
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def dependency_map(self) -> Dict[str, Set[str]]:
+        """Module -> modules it directly depends on"""
+        with self._lock:
+            return {module: set(deps) for module, deps in self._edges.items()}
+
+    def dependencies(self, module: str, transitive: bool = False) -> Dict[str, List[str]]:
+        """Modules a module depends on, with reasons (transitive dependencies have none listed)"""
+        with self._lock:
+            return self._closure(module, self._edges, transitive)
+
+    def dependents(self, module: str, transitive: bool = False) -> Dict[str, List[str]]:
+        """What depends on a module: dependent module -> reasons"""
+        with self._lock:
+            reverse: Dict[str, Dict[str, List[str]]] = {m: {} for m in self._edges}
+            for dependent, deps in self._edges.items():
+                for dependency, reasons in deps.items():
+                    reverse[dependency][dependent] = reasons
+            return self._closure(module, reverse, transitive)
+
+    @staticmethod
+    def _closure(module: str, edges: Dict[str, Dict[str, List[str]]], transitive: bool) -> Dict[str, List[str]]:
+        if module not in edges:
+            raise KeyError(module)
+        result = {other: list(reasons) for other, reasons in edges[module].items()}
+        if transitive:
+            stack = list(result)
+            while stack:
+                for other in edges.get(stack.pop(), {}):
+                    if other not in result and other != module:
+                        result[other] = []
+                        stack.append(other)
+        return dict(sorted(result.items()))
+
+    def cycles(self) -> List[List[str]]:
+        """Groups of modules that depend on each other (strongly connected components)"""
+        with self._lock:
+            edges = {module: sorted(deps) for module, deps in self._edges.items()}
+
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+
+        # Iterative Tarjan
+        for root in sorted(edges):
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, child = work.pop()
+                if child == 0:
+                    index[node] = low[node] = len(index)
+                    stack.append(node)
+                    on_stack.add(node)
+                if child < len(edges[node]):
+                    work.append((node, child + 1))
+                    nxt = edges[node][child]
+                    if nxt not in index:
+                        work.append((nxt, 0))
+                    elif nxt in on_stack:
+                        low[node] = min(low[node], index[nxt])
+                    continue
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1:
+                        components.append(sorted(component))
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+        return sorted(components)
+
+    def topological_levels(self) -> List[List[str]]:
+        """
+        Install waves: every module comes after the modules it depends on. Modules in a
+        dependency cycle share the wave after their outside dependencies.
+        """
+        cycle_of = {m: tuple(c) for c in self.cycles() for m in c}
+        with self._lock:
+            edges = {module: set(deps) for module, deps in self._edges.items()}
+
+        # Collapse cycles into single nodes, then run Kahn's algorithm
+        group = {module: cycle_of.get(module, (module,)) for module in edges}
+        deps = {g: set() for g in group.values()}
+        for module, module_deps in edges.items():
+            for dep in module_deps:
+                if group[dep] != group[module]:
+                    deps[group[module]].add(group[dep])
+
+        levels = []
+        remaining = dict(deps)
+        while remaining:
+            ready = [g for g, d in remaining.items() if not (d & remaining.keys())]
+            levels.append(sorted(m for g in ready for m in g))
+            for g in ready:
+                del remaining[g]
+        return levels
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Whole graph for the API"""
+        with self._lock:
+            modules = list(self._modules)
+            edges = [
+                {"module": module, "dependsOn": dependency, "reasons": reasons}
+                for module, deps in sorted(self._edges.items())
+                for dependency, reasons in sorted(deps.items())
+            ]
+        return {
+            "modules": modules,
+            "edges": edges,
+            "levels": self.topological_levels(),
+            "cycles": self.cycles()
+        }
@@ -0,0 +1,349 @@
+"""
+Deploy Orchestrator
+
+Deploys many modules to one or more environments in parallel. Modules form a
+dependency DAG (core -> shared -> domain modules, plus the dependencies found by
+the module dependency graph); a module is deployed to an environment
+as soon as all of its dependencies have been deployed there. Ready deploys are
+started longest-remaining-chain first, so a full refresh takes about as long as
+the critical path of the DAG rather than the sum of all deploys.
+
+Output of concurrent deploys is interleaved into one event stream; every line is
+tagged with its module and environment.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Set, Tuple
+
+try:
+    from . import sse
+except ImportError:
+    import sse
+
+logger = logging.getLogger(__name__)
+
+CORE_MODULE = "shared/core"
+SHARED_CATEGORY = "shared"
+
+NODE_PENDING = "pending"
+NODE_RUNNING = "running"
+NODE_SUCCEEDED = "succeeded"
+NODE_FAILED = "failed"
+NODE_SKIPPED = "skipped"
+
+
+def module_dependencies(
+    modules: List[Dict[str, Any]],
+    declared: Dict[str, Set[str]],
+    tiered: bool = True
+) -> Dict[str, Set[str]]:
+    """
+    Deploy ordering constraints between workspace modules
+
+    Args:
+        modules: Modules from the workspace index (path, category)
+        declared: Module path -> paths of the modules it depends on (DependencyGraph.dependency_map)
+        tiered: Also order shared modules before all domain modules
+
+    Returns:
+        Module path -> paths of the modules it must be deployed after
+    """
+    shared = {m["path"] for m in modules if m["category"] == SHARED_CATEGORY}
+    dependencies: Dict[str, Set[str]] = {}
+
+    for module in modules:
+        path = module["path"]
+        deps = set(declared.get(path, ()))
+
+        if path != CORE_MODULE and CORE_MODULE in shared:
+            deps.add(CORE_MODULE)
+        if tiered and path not in shared:
+            deps |= shared
+
+        deps.discard(path)
+        dependencies[path] = deps
+    return dependencies
+
+
+class DeployGraph:
+    """DAG of module deploys; edges point from a module to the modules it depends on"""
+
+    def __init__(self, dependencies: Dict[str, Set[str]]):
+        """
+        Args:
+            dependencies: Module -> modules it depends on (unknown modules are ignored)
+
+        Raises:
+            ValueError: If the dependencies contain a cycle
+        """
+        self.dependencies = {
+            module: {dep for dep in deps if dep in dependencies}
+            for module, deps in dependencies.items()
+        }
+        self.dependents: Dict[str, Set[str]] = {module: set() for module in self.dependencies}
+        for module, deps in self.dependencies.items():
+            for dep in deps:
+                self.dependents[dep].add(module)
+        self.levels = self._levels()
+        self.heights = self._heights()
+
+    def _levels(self) -> List[List[str]]:
+        """Kahn's algorithm: waves of modules whose dependencies are all in earlier waves"""
+        remaining = {module: len(deps) for module, deps in self.dependencies.items()}
+        level = sorted(module for module, count in remaining.items() if count == 0)
+        levels = []
+        while level:
+            levels.append(level)
+            next_level = []
+            for module in level:
+                for dependent in self.dependents[module]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        next_level.append(dependent)
+            level = sorted(next_level)
+
+        placed = sum(len(level) for level in levels)
+        if placed != len(self.dependencies):
+            cyclic = sorted(module for module, count in remaining.items() if count > 0)
+            raise ValueError(f"Dependency cycle between modules: {', '.join(cyclic)}")
+        return levels
+
+    def _heights(self) -> Dict[str, int]:
+        """Length of the longest chain of dependents starting at each module (itself included)"""
+        heights: Dict[str, int] = {}
+        for level in reversed(self.levels):
+            for module in level:
+                heights[module] = 1 + max((heights[d] for d in self.dependents[module]), default=0)
+        return heights
+
+    def critical_path(self) -> List[str]:
+        """Longest dependency chain (the modules that bound the total deploy time)"""
+        if not self.heights:
+            return []
+        module = max(sorted(m for m in self.dependencies if not self.dependencies[m]), key=self.heights.get)
+        path = [module]
+        while self.dependents[module]:
+            module = max(sorted(self.dependents[module]), key=self.heights.get)
+            path.append(module)
+        return path
+
+    def restricted(self, modules: Iterable[str]) -> "DeployGraph":
+        """
+        Graph over a subset of modules, keeping ordering implied through modules
+        outside the subset (A -> B -> C with B left out still orders A before C)
+        """
+        selected = set(modules)
+        ancestors_cache: Dict[str, Set[str]] = {}
+
+        def ancestors(module: str) -> Set[str]:
+            if module not in ancestors_cache:
+                result = set()
+                for dep in self.dependencies[module]:
+                    result.add(dep)
+                    result |= ancestors(dep)
+                ancestors_cache[module] = result
+            return ancestors_cache[module]
+
+        return DeployGraph({
+            module: ancestors(module) & selected
+            for module in self.dependencies if module in selected
+        })
+
+    def plan(self) -> Dict[str, Any]:
+        return {
+            "modules": sorted(self.dependencies),
+            "dependencies": {module: sorted(deps) for module, deps in sorted(self.dependencies.items())},
+            "levels": self.levels,
+            "criticalPath": self.critical_path()
+        }
+
+
+class DeployOrchestrator:
+    """
+    Runs the deploys of a DeployGraph to one or more environments.
+
+    Every (module, environment) pair is one deploy. Environments are independent of
+    each other; within an environment a module waits for its dependencies. When a
+    deploy fails, the modules depending on it are skipped in that environment while
+    independent modules continue.
+    """
+
+    def __init__(
+        self,
+        graph: DeployGraph,
+        environments: List[str],
+        run_deploy: Callable[[str, str], AsyncIterable[str]],
+        max_parallel: int = 4,
+        max_per_environment: int = 1
+    ):
+        """
+        Initialize the orchestrator
+
+        Args:
+            graph: Modules to deploy and their ordering constraints
+            environments: Environment keys to deploy to
+            run_deploy: Called with (module path, environment); returns the deploy's SSE frames
+            max_parallel: Maximum number of deploys running at once
+            max_per_environment: Maximum number of deploys running at once per environment
+                                 (default 1: Dataverse rejects concurrent solution imports,
+                                 so parallelism comes from deploying to several environments)
+        """
+        self.graph = graph
+        self.environments = list(dict.fromkeys(environments))
+        self.run_deploy = run_deploy
+        self.max_parallel = max(1, max_parallel)
+        self.max_per_environment = max(1, min(max_per_environment, self.max_parallel))
+
+        self.status: Dict[Tuple[str, str], str] = {
+            (module, env): NODE_PENDING for env in self.environments for module in graph.dependencies
+        }
+        self.durations: Dict[Tuple[str, str], float] = {}
+
+    def _ready(self, running_per_env: Dict[str, int]) -> List[Tuple[str, str]]:
+        """Pending deploys whose dependencies succeeded, critical (tallest) chains first"""
+        ready = []
+        for (module, env), state in self.status.items():
+            if state != NODE_PENDING or running_per_env[env] >= self.max_per_environment:
+                continue
+            if all(self.status[(dep, env)] == NODE_SUCCEEDED for dep in self.graph.dependencies[module]):
+                ready.append((module, env))
+        ready.sort(key=lambda node: (-self.graph.heights[node[0]], node[0], self.environments.index(node[1])))
+        return ready
+
+    def _skip_dependents(self, module: str, env: str) -> List[str]:
+        skipped = []
+        stack = list(self.graph.dependents[module])
+        while stack:
+            dependent = stack.pop()
+            if self.status[(dependent, env)] == NODE_PENDING:
+                self.status[(dependent, env)] = NODE_SKIPPED
+                skipped.append(dependent)
+                stack.extend(self.graph.dependents[dependent])
+        return sorted(skipped)
+
+    async def _deploy(self, module: str, env: str, output: asyncio.Queue) -> None:
+        """Run one deploy, forwarding its events tagged with module and environment"""
+        tag = f"[{module.split('/')[-1]} @ {env}]"
+        exit_code = None
+        error = None
+        started = time.monotonic()
+        try:
+            async for frame in self.run_deploy(module, env):
+                tagged = []
+                for line in frame.split("\n"):
+                    if not line.startswith("data: "):
+                        continue
+                    try:
+                        event = json.loads(line[6:])
+                    except ValueError:
+                        continue
+                    if event.get("type") == "complete":
+                        exit_code = event.get("exitCode")
+                        continue
+                    if event.get("type") == "error":
+                        error = event.get("message") or "Unknown error"
+                        event = {"type": "output", "line": f"✗ Error: {error}"}
+                    if event.get("type") == "output":
+                        event["line"] = f"{tag} {event.get('line', '')}"
+                    event.update(module=module, environment=env)
+                    tagged.append(f"data: {sse.dumps(event)}\n\n")
+                if tagged:
+                    await output.put("".join(tagged))
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        self.durations[(module, env)] = time.monotonic() - started
+        succeeded = error is None and exit_code == 0
+        await output.put((module, env, succeeded, exit_code if error is None else error))
+
+    def _status_event(self, module: str, env: str, **extra: Any) -> str:
+        event = {"type": "deploy-status", "module": module, "environment": env,
+                 "status": self.status[(module, env)], **extra}
+        return f"data: {sse.dumps(event)}\n\n"
+
+    def _line(self, line: str) -> str:
+        return sse.output(line)
+
+    async def run(self) -> AsyncIterator[str]:
+        """Deploy everything, yielding SSE frames; ends with a complete event (exit code 0 if all succeeded)"""
+        started = time.monotonic()
+        plan = self.graph.plan()
+        yield self._line(
+            f"=== Deploy {len(plan['modules'])} module(s) to {', '.join(self.environments)} "
+            f"({self.max_parallel} parallel, {self.max_per_environment} per environment) ==="
+        )
+        for number, level in enumerate(plan["levels"], 1):
+            yield self._line(f"  Wave {number}: {', '.join(m.split('/')[-1] for m in level)}")
+        yield self._line(f"  Critical path: {' -> '.join(m.split('/')[-1] for m in plan['criticalPath'])}")
+        yield self._line("")
+
+        # Bounded queue: deploy output waits while the consumer catches up
+        output: asyncio.Queue = asyncio.Queue(maxsize=64)
+        tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+        running_per_env = {env: 0 for env in self.environments}
+
+        try:
+            while True:
+                for module, env in self._ready(running_per_env):
+                    if len(tasks) >= self.max_parallel:
+                        break
+                    if running_per_env[env] >= self.max_per_environment:
+                        continue
+                    self.status[(module, env)] = NODE_RUNNING
+                    running_per_env[env] += 1
+                    tasks[(module, env)] = asyncio.create_task(self._deploy(module, env, output))
+                    yield self._status_event(module, env)
+
+                if not tasks:
+                    break
+
+                item = await output.get()
+                if isinstance(item, str):
+                    yield item
+                    continue
+
+                module, env, succeeded, result = item
+                del tasks[(module, env)]
+                running_per_env[env] -= 1
+                elapsed = self.durations[(module, env)]
+                self.status[(module, env)] = NODE_SUCCEEDED if succeeded else NODE_FAILED
+                yield self._status_event(module, env, elapsed=round(elapsed, 1))
+
+                name = module.split("/")[-1]
+                if succeeded:
+                    yield self._line(f"✓ {name} deployed to {env} ({elapsed:.0f}s)")
+                else:
+                    yield self._line(f"✗ {name} failed in {env} ({result})")
+                    for skipped in self._skip_dependents(module, env):
+                        yield self._status_event(skipped, env)
+                        yield self._line(f"  - Skipping {skipped.split('/')[-1]} in {env} (depends on {name})")
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        counts = {state: 0 for state in (NODE_SUCCEEDED, NODE_FAILED, NODE_SKIPPED)}
+        for state in self.status.values():
+            counts[state] = counts.get(state, 0) + 1
+
+        total_elapsed = time.monotonic() - started
+        sequential = sum(self.durations.values())
+        yield self._line("")
+        yield self._line("=== Summary ===")
+        yield self._line(f"✓ Deployed: {counts[NODE_SUCCEEDED]}")
+        if counts[NODE_FAILED]:
+            yield self._line(f"✗ Failed: {counts[NODE_FAILED]}")
+        if counts[NODE_SKIPPED]:
+            yield self._line(f"- Skipped: {counts[NODE_SKIPPED]}")
+        yield self._line(f"Elapsed: {total_elapsed:.0f}s (sequential deploys would take {sequential:.0f}s)")
+
+        logger.info(
+            f"Deployed {counts[NODE_SUCCEEDED]}/{len(self.status)} module(s) in {total_elapsed:.0f}s "
+            f"(sequential: {sequential:.0f}s)"
+        )
+        exit_code = 0 if counts[NODE_SUCCEEDED] == len(self.status) else 1
+        yield sse.event("complete", exitCode=exit_code)
@@ -0,0 +1,134 @@
+"""
+HTTP Response Cache
+
+Conditional GET support for the catalog endpoints the frontend polls. Each
+response gets a weak ETag derived from the request and a validator (e.g. the
+workspace index fingerprint, which hashes file stamps): a request with a
+matching If-None-Match is answered with 304 Not Modified, and otherwise the
+serialized and compressed body of the last response is reused as long as the
+validator is unchanged, so nothing is serialized or compressed twice.
+
+Bodies are compressed with brotli when the package is installed and the
+client accepts it, otherwise with gzip.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed (the framing overhead is not worth it)
+MIN_COMPRESS_SIZE = 1024
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    """Whether an Accept-Encoding header allows a content coding (q=0 excludes it)"""
+    for part in accept_encoding.lower().split(","):
+        name, *params = part.split(";")
+        if name.strip() not in (coding, "*"):
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        return quality > 0
+    return False
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+class CachedBody:
+    """Serialized JSON body of a response with its compressed variants"""
+
+    def __init__(self, etag: str, body: bytes):
+        self.etag = etag
+        self.body = body
+        self.encoded: Dict[str, bytes] = {}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            self.encoded["gzip"] = gzip.compress(body, compresslevel=6)
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(body, quality=5)
+
+    def headers(self) -> Dict[str, str]:
+        return {"ETag": self.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    def response(self, accept_encoding: str) -> Response:
+        """Response with the best encoding the client accepts"""
+        headers = self.headers()
+        for coding in ("br", "gzip"):
+            if coding in self.encoded and _accepts(accept_encoding, coding):
+                headers["Content-Encoding"] = coding
+                return Response(self.encoded[coding], media_type="application/json", headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """Last serialized body per cache key (path and query), validated by ETag"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"notModified": 0, "hits": 0, "misses": 0}
+
+    @staticmethod
+    def key(request: Request) -> str:
+        """Cache key of a request: path plus sorted query parameters"""
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    @staticmethod
+    def etag(key: str, validator: str) -> str:
+        digest = hashlib.blake2b(f"{key}\0{validator}".encode(), digest_size=12).hexdigest()
+        return f'W/"{digest}"'
+
+    def not_modified(self, request: Request, etag: str) -> Optional[Response]:
+        """304 response if the client's cached copy is current, else None"""
+        if not _etag_matches(request.headers.get("if-none-match"), etag):
+            return None
+        with self._lock:
+            self.stats["notModified"] += 1
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"})
+
+    def get(self, key: str, etag: str) -> Optional[CachedBody]:
+        """Cached body for key if it was produced under the same ETag"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.etag != etag:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, key: str, etag: str, content: Any) -> CachedBody:
+        """Serialize and compress content and keep it for key"""
+        body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        entry = CachedBody(etag, body)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
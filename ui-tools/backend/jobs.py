@@ -0,0 +1,467 @@
+"""
+Job Manager
+
+Runs long operations (deploy, sync, ship, build, field creation, ...) as jobs that
+outlive the HTTP response that started them. Every job keeps a bounded ring buffer
+of its server-sent events, mirrored to an append-only log on disk, so a client that
+lost its connection can reconnect with Last-Event-ID and replay what it missed
+instead of re-running the operation. Job history survives backend restarts.
+
+Jobs wait for a free global slot and for a free slot on every Dataverse environment
+they touch, so concurrent imports never hit the same environment at once.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from collections import deque
+from contextlib import AsyncExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from . import sse
+except ImportError:
+    import sse
+
+logger = logging.getLogger(__name__)
+
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_SUCCEEDED = "succeeded"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+STATE_INTERRUPTED = "interrupted"  # Backend stopped while the job was running
+
+FINISHED_STATES = {STATE_SUCCEEDED, STATE_FAILED, STATE_CANCELLED, STATE_INTERRUPTED}
+
+# Events sent per write when replaying or catching up
+REPLAY_BATCH_EVENTS = 200
+
+# Seconds without events after which a heartbeat is sent to keep the connection open
+HEARTBEAT_INTERVAL = 15.0
+
+_UNSAFE_FILE_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="milliseconds")
+
+
+def _split_frame(frame: str) -> Iterable[str]:
+    """Yield the data payloads of the SSE events in a frame"""
+    for line in frame.split("\n"):
+        if line.startswith("data: "):
+            yield line[6:]
+
+
+class Job:
+    """A single operation with its buffered event stream"""
+
+    def __init__(
+        self,
+        job_id: str,
+        kind: str,
+        title: str,
+        environments: Iterable[str],
+        buffer_size: int,
+        jobs_dir: Path
+    ):
+        self.id = job_id
+        self.kind = kind
+        self.title = title
+        self.environments = sorted(set(environments))
+        self.state = STATE_QUEUED
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.exit_code: Optional[int] = None
+        self.error: Optional[str] = None
+        self.last_event_id = 0
+        self.events: Deque[Tuple[int, str]] = deque(maxlen=buffer_size)
+        self.task: Optional[asyncio.Task] = None
+
+        file_stem = _UNSAFE_FILE_CHARS.sub("_", job_id)
+        self.meta_path = jobs_dir / f"{file_stem}.json"
+        self.log_path = jobs_dir / f"{file_stem}.log"
+        self._log = None
+        self._log_lines = 0
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "title": self.title,
+            "environments": self.environments,
+            "state": self.state,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "exitCode": self.exit_code,
+            "error": self.error,
+            "lastEventId": self.last_event_id,
+            "bufferedFrom": self.events[0][0] if self.events else self.last_event_id + 1
+        }
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+
+    def append(self, payloads: Iterable[str]) -> None:
+        """Buffer and persist event payloads (JSON text), then wake subscribers once"""
+        lines = []
+        for data in payloads:
+            self.last_event_id += 1
+            self.events.append((self.last_event_id, data))
+            lines.append(f"{self.last_event_id} {data}\n")
+
+            if '"complete"' in data or '"error"' in data:
+                try:
+                    event = json.loads(data)
+                except ValueError:
+                    event = {}
+                if event.get("type") == "complete":
+                    self.exit_code = event.get("exitCode")
+                elif event.get("type") == "error":
+                    self.error = event.get("message") or "Unknown error"
+
+        if lines:
+            self._write_log(lines)
+            self._notify()
+
+    def append_event(self, event: Dict[str, Any]) -> None:
+        self.append([sse.dumps(event)])
+
+    def events_after(self, last_event_id: int) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Buffered events newer than last_event_id
+
+        Returns:
+            Tuple of (number of newer events no longer buffered, events)
+        """
+        if not self.events or last_event_id >= self.last_event_id:
+            return 0, []
+        first_id = self.events[0][0]
+        missed = max(0, first_id - 1 - last_event_id)
+        start = max(0, last_event_id + 1 - first_id)
+        return missed, [self.events[i] for i in range(start, len(self.events))]
+
+    def changed(self) -> asyncio.Event:
+        """Event set on the next change (take it before reading, then wait on it)"""
+        return self._changed
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    # ------------------------------------------------------------------
+    # State and persistence
+    # ------------------------------------------------------------------
+
+    def set_state(self, state: str) -> None:
+        self.state = state
+        if state == STATE_RUNNING:
+            self.started_at = _now()
+        elif state in FINISHED_STATES:
+            self.finished_at = _now()
+            self._close_log()
+        self.save_meta()
+        self._notify()
+
+    def save_meta(self) -> None:
+        tmp_path = self.meta_path.with_suffix(".json.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.summary(), f)
+            os.replace(tmp_path, self.meta_path)
+        except OSError as e:
+            logger.warning(f"Could not save job {self.id}: {e}")
+
+    def _write_log(self, lines: List[str]) -> None:
+        try:
+            if self._log is None:
+                self._log = open(self.log_path, "a", encoding="utf-8")
+            self._log.writelines(lines)
+            self._log.flush()
+            self._log_lines += len(lines)
+
+            # Keep the log bounded like the ring buffer it mirrors
+            if self._log_lines > 2 * self.events.maxlen:
+                self._compact_log()
+        except OSError as e:
+            logger.warning(f"Could not write job log {self.log_path}: {e}")
+
+    def _compact_log(self) -> None:
+        self._close_log()
+        tmp_path = self.log_path.with_suffix(".log.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{event_id} {data}\n" for event_id, data in self.events)
+        os.replace(tmp_path, self.log_path)
+        self._log_lines = len(self.events)
+
+    def _close_log(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    @classmethod
+    def load(cls, meta_path: Path, buffer_size: int) -> "Job":
+        """Restore a job and the tail of its event log from disk"""
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        job = cls(meta["id"], meta["kind"], meta["title"], meta.get("environments", []),
+                  buffer_size, meta_path.parent)
+        job.state = meta["state"]
+        job.created_at = meta.get("createdAt")
+        job.started_at = meta.get("startedAt")
+        job.finished_at = meta.get("finishedAt")
+        job.exit_code = meta.get("exitCode")
+        job.error = meta.get("error")
+        job.last_event_id = meta.get("lastEventId", 0)
+
+        if job.log_path.exists():
+            with open(job.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    event_id, _, data = line.rstrip("\n").partition(" ")
+                    if event_id.isdigit() and data:
+                        job.events.append((int(event_id), data))
+                        job._log_lines += 1
+            if job.events:
+                job.last_event_id = max(job.last_event_id, job.events[-1][0])
+        return job
+
+    def delete_files(self) -> None:
+        for path in (self.meta_path, self.log_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class JobManager:
+    """
+    Registry and scheduler of jobs.
+
+    Limits default to the JOBS_MAX_CONCURRENT (4), JOBS_MAX_PER_ENVIRONMENT (1),
+    JOBS_BUFFER_EVENTS (5000) and JOBS_HISTORY (200) environment variables.
+    """
+
+    def __init__(
+        self,
+        jobs_dir: Path,
+        max_concurrent: Optional[int] = None,
+        max_per_environment: Optional[int] = None,
+        buffer_size: Optional[int] = None,
+        history: Optional[int] = None
+    ):
+        """
+        Initialize the manager
+
+        Args:
+            jobs_dir: Directory for job metadata and event logs
+            max_concurrent: Maximum number of jobs running at once
+            max_per_environment: Maximum number of running jobs per Dataverse environment
+            buffer_size: Events kept per job for replay
+            history: Finished jobs kept (older ones are deleted)
+        """
+        self.jobs_dir = Path(jobs_dir)
+        self.max_concurrent = max_concurrent or _env_int("JOBS_MAX_CONCURRENT", 4)
+        self.max_per_environment = max_per_environment or _env_int("JOBS_MAX_PER_ENVIRONMENT", 1)
+        self.buffer_size = buffer_size or _env_int("JOBS_BUFFER_EVENTS", 5000)
+        self.history = history or _env_int("JOBS_HISTORY", 200)
+
+        self._jobs: Dict[str, Job] = {}
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._environment_slots: Dict[str, asyncio.Semaphore] = {}
+        self._shutting_down = False
+
+    def load(self) -> None:
+        """Restore job history from disk; jobs that were still running are marked interrupted"""
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        jobs = []
+        for meta_path in self.jobs_dir.glob("*.json"):
+            try:
+                jobs.append(Job.load(meta_path, self.buffer_size))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping unreadable job {meta_path.name}: {e}")
+
+        for job in sorted(jobs, key=lambda j: j.created_at or ""):
+            if not job.finished:
+                job.append_event({"type": "error", "message": "Backend stopped while the job was running"})
+                job.set_state(STATE_INTERRUPTED)
+            self._jobs[job.id] = job
+        self._prune()
+
+    async def shutdown(self) -> None:
+        """Stop running jobs (terminating their processes); they are recorded as interrupted"""
+        self._shutting_down = True
+        tasks = [job.task for job in self._jobs.values() if job.task and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=5)
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def submit(
+        self,
+        kind: str,
+        source: Callable[[str], AsyncIterable[str]],
+        title: str,
+        job_id: Optional[str] = None,
+        environments: Iterable[str] = ()
+    ) -> Job:
+        """
+        Start a job, or return the existing job if job_id is already known
+
+        Args:
+            kind: Operation type (deploy, sync, ship, build, create-fields, ...)
+            source: Called with the job id; returns an async iterable of SSE frames
+            title: Human readable description
+            job_id: Client supplied id (the operationId); generated if None
+            environments: Environment keys ("Deployment/Environment") the job touches
+
+        Returns:
+            The job; it runs in the background whether or not anyone streams it
+        """
+        if job_id and job_id in self._jobs:
+            return self._jobs[job_id]
+
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        job = Job(job_id or uuid.uuid4().hex, kind, title, environments, self.buffer_size, self.jobs_dir)
+        self._jobs[job.id] = job
+        job.save_meta()
+        job.task = asyncio.create_task(self._run(job, source))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, state: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Job summaries, newest first"""
+        jobs = [job for job in reversed(list(self._jobs.values())) if not state or job.state == state]
+        return [job.summary() for job in jobs[:limit]]
+
+    async def cancel(self, job_id: str, timeout: float = 5.0) -> bool:
+        """
+        Cancel a queued or running job and wait (up to timeout) for its process to stop
+
+        Returns:
+            False if the job is unknown or already finished
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.finished or job.task is None:
+            return False
+        job.task.cancel()
+        await asyncio.wait([job.task], timeout=timeout)
+        return True
+
+    async def stream(self, job_id: str, last_event_id: int = 0) -> AsyncIterator[str]:
+        """
+        Server-sent events of a job: buffered events after last_event_id, then live
+        events until the job finishes. Every event carries its id for reconnects.
+        """
+        job = self._jobs[job_id]
+        while True:
+            waiter = job.changed()
+            missed, events = job.events_after(last_event_id)
+            if missed:
+                yield sse.event("gap", missed=missed)
+
+            if events:
+                for start in range(0, len(events), REPLAY_BATCH_EVENTS):
+                    batch = events[start:start + REPLAY_BATCH_EVENTS]
+                    yield "".join(f"id: {event_id}\ndata: {data}\n\n" for event_id, data in batch)
+                last_event_id = events[-1][0]
+                continue
+
+            if job.finished:
+                return
+            try:
+                await asyncio.wait_for(waiter.wait(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield sse.HEARTBEAT
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    async def _acquire_slots(self, job: Job, stack: AsyncExitStack) -> None:
+        """Wait for a slot on every environment of the job (in sorted order), then a global slot"""
+        semaphores = []
+        for environment in job.environments:
+            if environment not in self._environment_slots:
+                self._environment_slots[environment] = asyncio.Semaphore(self.max_per_environment)
+            semaphores.append((environment, self._environment_slots[environment]))
+        semaphores.append((None, self._slots))
+
+        for environment, semaphore in semaphores:
+            if semaphore.locked():
+                waiting_for = f"environment {environment}" if environment else "a free job slot"
+                job.append_event({"type": "output", "line": f"⏳ Queued: waiting for {waiting_for}..."})
+            await stack.enter_async_context(semaphore)
+
+    async def _run(self, job: Job, source: Callable[[str], AsyncIterable[str]]) -> None:
+        try:
+            async with AsyncExitStack() as stack:
+                await self._acquire_slots(job, stack)
+                job.set_state(STATE_RUNNING)
+                started = time.monotonic()
+
+                # Frames produced in quick succession are buffered and persisted together
+                async for frame in sse.coalesce(source(job.id)):
+                    job.append(_split_frame(frame))
+
+            if job.error is not None:
+                state = STATE_FAILED
+            elif job.exit_code is None:
+                job.error = "Operation ended without reporting completion"
+                state = STATE_FAILED
+            else:
+                state = STATE_SUCCEEDED if job.exit_code == 0 else STATE_FAILED
+            logger.info(f"Job {job.id} ({job.kind}) {state} after {time.monotonic() - started:.1f}s")
+            job.set_state(state)
+
+        except asyncio.CancelledError:
+            if self._shutting_down:
+                job.append_event({"type": "error", "message": "Backend stopped while the job was running"})
+                job.set_state(STATE_INTERRUPTED)
+            else:
+                job.append_event({"type": "cancelled"})
+                job.set_state(STATE_CANCELLED)
+
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.kind}) failed")
+            job.append_event({"type": "error", "message": str(e) or type(e).__name__})
+            job.set_state(STATE_FAILED)
+
+        finally:
+            if job.finished:
+                self._prune()
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond the history limit"""
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job.id]
+            job.delete_files()
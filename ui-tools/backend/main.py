@@ -1,21 +1,61 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import asyncio
+import codecs
 import json
+import locale
+import re
 from pathlib import Path
 from typing import Optional
 import sys
 import subprocess
 import shutil
+import time
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
 
 # Add shared dataverse-client library to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'dataverse-client'))
+from circuit_breaker import get_environment_health
+from workspace_index import WorkspaceIndex, file_stamp
+from catalog import WorkspaceCatalog
+from optionset_search import OptionSetSearchIndex
+from jobs import JobManager
+from deploy_orchestrator import DeployGraph, DeployOrchestrator, module_dependencies
+from release_pipeline import ReleasePipeline, ReleaseStateStore
+from build_cache import BuildCache
+from package_inspector import PackageError, PackageInspector
+from changelog_index import ChangelogIndex
+from powershell_host import PowerShellHostPool
+from dependency_graph import DependencyGraph
 from client import DataverseClient
-
-app = FastAPI(title="Module Deployment API")
+from client_registry import ClientConfigError, ClientRegistry
+from http_cache import ResponseCache
+from pending_store import PendingOptionSetStore
+import sse
+from metrics import RequestMetricsMiddleware, ratio_samples, registry as metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the workspace index in the background and keep it current while running
+    workspace_index.start()
+    job_manager.load()
+    powershell_hosts.warm_up()
+    client_eviction = asyncio.create_task(evict_idle_clients())
+    yield
+    client_eviction.cancel()
+    await job_manager.shutdown()
+    await powershell_hosts.close()
+    workspace_index.stop()
+    client_registry.close()
+    pending_optionsets.close()
+    SCAN_EXECUTOR.shutdown(wait=False)
+
+app = FastAPI(title="Module Deployment API", lifespan=lifespan)
 
 # CORS for local development
 app.add_middleware(
@@ -24,6 +64,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Job-Id"],  # read by the frontend to reattach to a job's events
+)
+
+# Request latency per route (time to the first byte of the response)
+app.add_middleware(
+    RequestMetricsMiddleware,
+    histogram=metrics.histogram("http_request_duration_seconds", "HTTP request latency until the response starts")
 )
 
 # Get project root (go up from backend to repo root)
@@ -31,63 +78,90 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 
 # Cache directory for pending option sets
 CACHE_DIR = Path(__file__).parent / ".cache"
-PENDING_CACHE_FILE = CACHE_DIR / "pending_optionsets.json"
 
 # Track active processes for cancellation
 active_processes = {}
 
-def load_pending_optionsets():
-    """Load pending option sets from cache file"""
-    if not PENDING_CACHE_FILE.exists():
-        return []
-    try:
-        with open(PENDING_CACHE_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get("pending", [])
-    except Exception as e:
-        print(f"Error loading pending option sets: {e}", file=sys.stderr)
-        return []
+# Warm PowerShell workers that run UI scripts without a pwsh start per operation
+powershell_hosts = PowerShellHostPool(PROJECT_ROOT / "ui-tools" / "scripts" / "PowerShell-Worker.ps1", PROJECT_ROOT)
 
-def save_pending_optionsets(pending_list):
-    """Save pending option sets to cache file"""
-    try:
-        CACHE_DIR.mkdir(exist_ok=True)
-        with open(PENDING_CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump({
-                "pending": pending_list,
-                "lastUpdated": asyncio.get_event_loop().time() if asyncio.get_event_loop().is_running() else None
-            }, f, indent=2)
-        # print(f"[DEBUG] Saved {len(pending_list)} pending option sets to cache")
-    except Exception as e:
-        print(f"Error saving pending option sets: {e}", file=sys.stderr)
+# Bounded pool for blocking filesystem and XML work, so scans never stall the event loop
+# (and with it every SSE stream). Cold parsing itself fans out to worker processes.
+SCAN_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="scan")
 
-def read_solution_display_name(module_path: Path) -> str:
-    """Read display name from Solution.xml file"""
-    solution_xml_path = module_path / "src" / "Other" / "Solution.xml"
-    
-    if not solution_xml_path.exists():
-        return None
-    
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the scan pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(SCAN_EXECUTOR, partial(func, *args, **kwargs))
+
+def open_workspace_catalog():
+    """Open the persistent workspace catalog (None if it cannot be opened)"""
     try:
-        tree = ET.parse(solution_xml_path)
-        root = tree.getroot()
-        
-        # Find the LocalizedName element with description attribute
-        localized_name = root.find(".//LocalizedName[@languagecode='1033']")
-        if localized_name is not None:
-            display_name = localized_name.get('description')
-            if display_name:
-                display_name = display_name.strip()
-                # Remove "App Base - " prefix if present
-                if display_name.startswith("App Base - "):
-                    display_name = display_name[11:]  # Remove "App Base - " (11 characters)
-                return display_name
-        
-        return None
+        return WorkspaceCatalog(CACHE_DIR / "workspace_catalog.sqlite", PROJECT_ROOT)
     except Exception as e:
-        print(f"Error reading display name from {solution_xml_path}: {e}", file=sys.stderr)
+        print(f"Error opening workspace catalog: {e}", file=sys.stderr)
         return None
 
+# In-memory index of modules, solutions and option sets (updated from filesystem events,
+# persisted to the SQLite catalog so restarts only re-parse changed files)
+workspace_index = WorkspaceIndex(PROJECT_ROOT, catalog=open_workspace_catalog())
+
+# Authenticated Dataverse clients per deployment/environment, kept warm between helper requests
+client_registry = ClientRegistry(PROJECT_ROOT / ".config" / "deployments.json")
+
+# Seconds between sweeps that close clients idle for longer than the registry's idle timeout
+CLIENT_EVICTION_INTERVAL = 60.0
+
+async def evict_idle_clients():
+    """Close idle Dataverse clients periodically, so they don't outlive a burst of activity"""
+    while True:
+        await asyncio.sleep(CLIENT_EVICTION_INTERVAL)
+        try:
+            await run_blocking(client_registry.evict_idle)
+        except Exception as e:
+            print(f"Error evicting idle Dataverse clients: {e}", file=sys.stderr)
+
+# Similarity search index over workspace option sets (rebuilt when the workspace index changes)
+optionset_search_index = OptionSetSearchIndex()
+
+def get_optionset_search_index() -> OptionSetSearchIndex:
+    """Get the option set search index, rebuilding it if the workspace changed"""
+    workspace_index.refresh()
+    generation = workspace_index.generation
+    if optionset_search_index.generation != generation:
+        optionset_search_index.build(workspace_index.get_option_sets(), generation)
+    return optionset_search_index
+
+# Last serialized catalog responses, revalidated with ETags derived from file stamps
+response_cache = ResponseCache()
+
+async def cached_json_response(request: Request, validator: str, build) -> Response:
+    """
+    JSON response for a polled catalog endpoint
+
+    Answers 304 if the client's ETag is current and reuses the last serialized
+    (and compressed) body while the validator is unchanged; build is only
+    awaited when the content actually changed.
+    """
+    key = response_cache.key(request)
+    etag = response_cache.etag(key, validator)
+    not_modified = response_cache.not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    entry = response_cache.get(key, etag)
+    if entry is None:
+        entry = await run_blocking(response_cache.put, key, etag, await build())
+    return entry.response(request.headers.get("accept-encoding", ""))
+
+# Option sets created in Dataverse but not synced yet; entries are dropped as soon as the
+# workspace index parses an option set file with the same schema name
+pending_optionsets = PendingOptionSetStore(
+    CACHE_DIR / "pending_optionsets.sqlite",
+    legacy_path=CACHE_DIR / "pending_optionsets.json"
+)
+workspace_index.add_option_set_listener(pending_optionsets.discard_synced)
+
 def read_solution_version(module_path: Path) -> str:
     """Read version from Solution.xml file"""
     solution_xml_path = module_path / "src" / "Other" / "Solution.xml"
@@ -183,6 +257,19 @@ class CreateFieldsRequest(BaseModel):
     environment: str
     tableName: str
     fields: list[dict]
+    targetSolution: Optional[str] = None  # solution unique name to add created components to
+    operationId: Optional[str] = None
+
+class DeployAllRequest(BaseModel):
+    deployment: str
+    environments: list[str]
+    modules: list[str] = []  # module names or category/module paths; all modules if empty
+    managed: bool = True
+    upgrade: bool = False
+    maxParallel: int = 4
+    maxPerEnvironment: int = 1  # concurrent imports per environment; raise only for environments that allow it
+    tiered: bool = True  # deploy shared modules before domain modules
+    operationId: Optional[str] = None
 
 class CancelRequest(BaseModel):
     operationId: str
@@ -196,6 +283,9 @@ class FieldTemplateRequest(BaseModel):
 class ReleaseValidationRequest(BaseModel):
     module_path: str
 
+class BatchValidationRequest(BaseModel):
+    module_paths: list[str] = []  # module names or category/module paths; all modules if empty
+
 class ReleaseExecutionRequest(BaseModel):
     module_path: str
     module_name: str
@@ -206,6 +296,8 @@ class ReleaseExecutionRequest(BaseModel):
     enabled_steps: list[str]
     sync_tenant: Optional[str] = None
     sync_environment: Optional[str] = None
+    resume: bool = True  # skip steps completed by an earlier run of this release
+    operationId: Optional[str] = None
 
 class StepExecutionRequest(BaseModel):
     module_path: str
@@ -222,8 +314,17 @@ class BuildPackagesRequest(BaseModel):
     module_path: str
     module_name: str
     version: str
+    force: bool = False  # build even if the source is unchanged since the cached build
     operationId: str
 
+class ComparePackagesRequest(BaseModel):
+    paths: list[str]  # package paths relative to .releases
+
+class BuildAllRequest(BaseModel):
+    modules: list[str] = []  # module names or category/module paths; all modules if empty
+    force: bool = False
+    operationId: Optional[str] = None
+
 @app.get("/api/config")
 async def get_config():
     """Get deployment configuration and available modules"""
@@ -232,20 +333,13 @@ async def get_config():
     with open(config_path, "r") as f:
         config = json.load(f)
     
-    # Get categories and modules
+    # Get categories and modules (category/module folders from the workspace index)
     categories = {}
-    exclude_folders = {"__pycache__", ".scripts", ".config", ".git", ".vscode", "bin", "obj", "ui-tools"}
-    
-    for item in PROJECT_ROOT.iterdir():
-        if item.is_dir() and item.name not in exclude_folders:
-            # Check if this directory has modules (subdirs with .cdsproj files)
-            modules = []
-            for module_dir in item.iterdir():
-                if module_dir.is_dir() and list(module_dir.glob("*.cdsproj")):
-                    modules.append(module_dir.name)
-            
-            if modules:
-                categories[item.name] = sorted(modules)
+    for module in await run_blocking(workspace_index.get_modules):
+        parts = Path(module["path"]).parts
+        if len(parts) == 2:
+            categories.setdefault(parts[0], []).append(parts[1])
+    categories = {name: sorted(modules) for name, modules in categories.items()}
     
     return {
         "deployments": config.get("Deployments", {}),
@@ -255,74 +349,53 @@ async def get_config():
     }
 
 @app.get("/api/modules")
-async def get_modules():
+async def get_modules(request: Request):
     """Get all modules with their metadata, source environments, and targets"""
     config_path = PROJECT_ROOT / ".config" / "deployments.json"
-    
-    with open(config_path, "r") as f:
-        config = json.load(f)
+    fingerprint = await run_blocking(workspace_index.fingerprint)
+    return await cached_json_response(request, f"{fingerprint}:{file_stamp(config_path)}", build_modules)
+
+async def build_modules() -> dict:
+    config = client_registry.load_config()
     
     deployments = config.get("Deployments", {})
     module_configs = config.get("Modules", {})
     default_config = config.get("DefaultModule", {})
     
     modules = []
-    exclude_folders = {"__pycache__", ".scripts", ".config", ".git", ".vscode", "bin", "obj", "ui-tools", "releases"}
-    
-    # Recursively scan for all modules (handles nested folder structures)
-    def scan_for_modules(base_path, relative_path=""):
-        for item in base_path.iterdir():
-            if item.is_dir() and item.name not in exclude_folders:
-                # Check if this directory contains a .cdsproj file (it's a module)
-                if list(item.glob("*.cdsproj")):
-                    module_name = item.name
-                    category = relative_path if relative_path else item.parent.name
-                    
-                    # Get module-specific config or use default
-                    mod_config = module_configs.get(module_name, default_config)
-                    
-                    if mod_config:
-                        deployment_name = mod_config.get("Tenant")
-                        source_env_key = mod_config.get("Environment")
-                        target_env_keys = mod_config.get("DeploymentTargets", [])
-                        
-                        # Resolve environment names
-                        deployment = deployments.get(deployment_name, {})
-                        tenant = deployment.get("Tenant", "")
-                        environments = deployment.get("Environments", {})
-                        
-                        source_env = environments.get(source_env_key, source_env_key)
-                        target_envs = [environments.get(key, key) for key in target_env_keys]
-                        
-                        # Read version and display name from Solution.xml
-                        version = read_solution_version(item)
-                        display_name = read_solution_display_name(item)
-                        
-                        # Calculate relative path from project root
-                        relative_module_path = str(item.relative_to(PROJECT_ROOT))
-                        
-                        modules.append({
-                            "name": module_name,
-                            "displayName": display_name,
-                            "category": category,
-                            "path": relative_module_path,
-                            "tenant": tenant,
-                            "deployment": deployment_name,
-                            "sourceEnvironment": source_env,
-                            "sourceEnvironmentKey": source_env_key,
-                            "targetEnvironments": target_envs,
-                            "targetEnvironmentKeys": target_env_keys,
-                            "version": version
-                        })
-                else:
-                    # Recursively scan subdirectories
-                    new_relative = f"{relative_path}/{item.name}" if relative_path else item.name
-                    scan_for_modules(item, new_relative)
-    
-    # Scan for all modules starting from project root
-    for category_dir in PROJECT_ROOT.iterdir():
-        if category_dir.is_dir() and category_dir.name not in exclude_folders:
-            scan_for_modules(category_dir, category_dir.name)
+    for indexed in await run_blocking(workspace_index.get_modules):
+        module_name = indexed["name"]
+        
+        # Get module-specific config or use default
+        mod_config = module_configs.get(module_name, default_config)
+        if not mod_config:
+            continue
+        
+        deployment_name = mod_config.get("Tenant")
+        source_env_key = mod_config.get("Environment")
+        target_env_keys = mod_config.get("DeploymentTargets", [])
+        
+        # Resolve environment names
+        deployment = deployments.get(deployment_name, {})
+        tenant = deployment.get("Tenant", "")
+        environments = deployment.get("Environments", {})
+        
+        source_env = environments.get(source_env_key, source_env_key)
+        target_envs = [environments.get(key, key) for key in target_env_keys]
+        
+        modules.append({
+            "name": module_name,
+            "displayName": indexed["displayName"],
+            "category": indexed["category"],
+            "path": indexed["path"],
+            "tenant": tenant,
+            "deployment": deployment_name,
+            "sourceEnvironment": source_env,
+            "sourceEnvironmentKey": source_env_key,
+            "targetEnvironments": target_envs,
+            "targetEnvironmentKeys": target_env_keys,
+            "version": indexed["version"]
+        })
     
     return {"modules": modules}
 
@@ -358,13 +431,276 @@ async def get_environments():
     
     return {"tenants": list(tenants.values())}
 
-async def stream_powershell_output(script_path: str, *args, operation_id: str = None):
-    """Stream PowerShell script output in real-time using subprocess with threading"""
-    import subprocess
-    import threading
-    from queue import Queue
+@app.get("/api/environments/health")
+async def get_environments_health():
+    """Get circuit breaker state and health score of every Dataverse environment contacted by the backend"""
+    config_path = PROJECT_ROOT / ".config" / "deployments.json"
     
+    # Map environment URLs back to deployment/environment keys for display
+    url_names = {}
+    try:
+        with open(config_path, "r") as f:
+            config = json.load(f)
+        for deployment_name, deployment_data in config.get("Deployments", {}).items():
+            env_urls = deployment_data.get("Auth", {}).get("EnvironmentUrls", {})
+            for env_key, env_url in env_urls.items():
+                url_names.setdefault(env_url.rstrip("/").lower(), []).append(
+                    {"deployment": deployment_name, "environment": env_key}
+                )
+    except Exception as e:
+        print(f"Error loading deployment config for health: {e}", file=sys.stderr)
+    
+    environments = []
+    for health in get_environment_health():
+        health["targets"] = url_names.get(health["environmentUrl"].lower(), [])
+        environments.append(health)
+    
+    return {"environments": environments}
+
+@app.get("/api/metrics")
+async def get_metrics(format: str = "json"):
+    """Backend metrics (JSON, or Prometheus text format with ?format=prometheus)"""
+    if format == "prometheus":
+        return PlainTextResponse(metrics.prometheus(), media_type="text/plain; version=0.0.4")
+    return metrics.to_dict()
+
+# Cross-module dependency graph (parsed files cached on disk, refreshed incrementally)
+dependency_graph = DependencyGraph(PROJECT_ROOT, cache_path=CACHE_DIR / "dependency_graph.json")
+
+def get_dependency_graph() -> DependencyGraph:
+    """Dependency graph of the current workspace modules (re-parses only changed files)"""
+    modules = workspace_index.get_modules()
+    started = time.perf_counter()
+    if dependency_graph.refresh(modules):
+        SCAN_DURATION.observe(time.perf_counter() - started, kind="dependencies")
+    return dependency_graph
+
+# Long operations run as jobs that survive client reconnects (history kept in the cache dir)
+job_manager = JobManager(CACHE_DIR / "jobs")
+
+# Completed release steps per module version, so a failed release resumes at the failed step
+release_states = ReleaseStateStore(CACHE_DIR / "releases")
+
+# Packages built per module source digest, so unchanged modules are not rebuilt
+build_cache = BuildCache(PROJECT_ROOT, CACHE_DIR / "builds")
+
+# Manifest, component counts and SHA-256 of release packages, cached by file stamp
+package_inspector = PackageInspector()
+
+# Section index of each module's CHANGELOG.md, re-parsed when the file changes
+changelog_index = ChangelogIndex(PROJECT_ROOT)
+
+# ----------------------------------------------------------------------------
+# Metrics
+# ----------------------------------------------------------------------------
+
+SCAN_DURATION = metrics.histogram("workspace_scan_duration_seconds", "Workspace index and dependency graph scans")
+SCAN_FILES_PARSED = metrics.counter("workspace_scan_files_parsed_total", "Files parsed by workspace scans")
+DATAVERSE_REQUEST_DURATION = metrics.histogram("dataverse_request_duration_seconds", "Dataverse Web API calls")
+DATAVERSE_AUTH_DURATION = metrics.histogram("dataverse_auth_duration_seconds", "Dataverse token acquisition")
+SCRIPT_DURATION = metrics.histogram("script_duration_seconds", "PowerShell script runs by script and exit code")
+
+def observe_workspace_scan(kind: str, seconds: float, parsed: int) -> None:
+    SCAN_DURATION.observe(seconds, kind=kind)
+    if parsed:
+        SCAN_FILES_PARSED.inc(parsed, kind=kind)
+
+def observe_dataverse_call(event: dict) -> None:
+    environment = event["environmentUrl"].split("://", 1)[-1]
+    status = event["status"]
+    outcome = f"{status // 100}xx" if status else "error"
+    if event["kind"] == "authenticate":
+        DATAVERSE_AUTH_DURATION.observe(event["seconds"], environment=environment, outcome=outcome)
+    else:
+        DATAVERSE_REQUEST_DURATION.observe(event["seconds"], environment=environment, method=event["method"], outcome=outcome)
+
+def collect_backend_stats():
+    """Cache hit rates, index sizes, job states and environment health at export time"""
+    caches = {
+        "http_response": {"hits": response_cache.stats["hits"] + response_cache.stats["notModified"],
+                          "misses": response_cache.stats["misses"]},
+        "dataverse_client": {"hits": client_registry.stats["reused"], "misses": client_registry.stats["created"]},
+        "build": {"hits": build_cache.stats["hits"] + build_cache.stats["restored"], "misses": build_cache.stats["misses"]},
+        "package_inspection": package_inspector.stats,
+        "changelog": changelog_index.stats,
+        "powershell_host": {"hits": powershell_hosts.stats["warm"], "misses": powershell_hosts.stats["cold"]}
+    }
+    yield ("backend_cache_hit_ratio", "Hit ratio per cache", "gauge", ratio_samples(caches))
+    yield ("backend_cache_lookups_total", "Cache lookups per cache and result", "counter", [
+        ({"cache": cache, "result": result}, values[result])
+        for cache, values in caches.items() for result in ("hits", "misses")
+    ])
+    yield ("http_not_modified_total", "Conditional GETs answered with 304", "counter",
+           [({}, response_cache.stats["notModified"])])
+
+    status = workspace_index.status()
+    yield ("workspace_index_items", "Indexed modules and option sets", "gauge",
+           [({"kind": "modules"}, status["modules"]), ({"kind": "optionSets"}, status["optionSets"])])
+
+    states = {}
+    for job in job_manager.list():
+        states[job["state"]] = states.get(job["state"], 0) + 1
+    yield ("jobs", "Jobs in history by state", "gauge", [({"state": state}, count) for state, count in states.items()])
+
+    yield ("dataverse_environment_health_score", "Circuit breaker health score (0-100)", "gauge", [
+        ({"environment": health["environmentUrl"].split("://", 1)[-1]}, health["healthScore"])
+        for health in get_environment_health()
+    ])
+
+workspace_index.on_scan = observe_workspace_scan
+DataverseClient.add_observer(observe_dataverse_call)
+metrics.add_collector(collect_backend_stats)
+
+def load_deployments_config() -> dict:
     try:
+        return client_registry.load_config()
+    except ClientConfigError:
+        return {}
+
+def module_environments(deployment: str, module: str, targets: bool = False) -> list:
+    """
+    Environment keys ("Deployment/Environment") a module operation touches
+
+    Args:
+        deployment: Deployment name
+        module: Module folder name
+        targets: Deployment targets of the module instead of its source environment
+    """
+    config = load_deployments_config()
+    mod_config = config.get("Modules", {}).get(module, config.get("DefaultModule", {}))
+    if targets:
+        keys = mod_config.get("DeploymentTargets", [])
+    else:
+        keys = [mod_config["Environment"]] if mod_config.get("Environment") else []
+    return [f"{deployment}/{key}" for key in keys]
+
+def job_response(job, last_event_id: int = 0) -> StreamingResponse:
+    """Stream a job's events (the job keeps running if the client disconnects)"""
+    return StreamingResponse(
+        job_manager.stream(job.id, last_event_id),
+        media_type="text/event-stream",
+        headers={"X-Job-Id": job.id}
+    )
+
+def start_script_job(kind: str, title: str, args: list, operation_id: Optional[str], environments=()) -> StreamingResponse:
+    """Run a PowerShell script (path followed by arguments) as a job and stream its output"""
+    job = job_manager.submit(
+        kind,
+        lambda job_id: stream_powershell_output(*args, operation_id=job_id),
+        title=title,
+        job_id=operation_id,
+        environments=environments
+    )
+    return job_response(job)
+
+# Script output is read in chunks of up to STREAM_READ_SIZE bytes. Every line already buffered
+# in the pipe is sent in one write (one SSE event per line, at most STREAM_MAX_BATCH_LINES per
+# frame), so fast output costs one send per chunk instead of one per line.
+STREAM_READ_SIZE = 64 * 1024
+STREAM_MAX_BATCH_LINES = 200
+
+_NEWLINE = re.compile(r"\r\n|\r|\n")
+
+class _LineSplitter:
+    """Incrementally decode process output and split it into lines (universal newlines)"""
+
+    def __init__(self):
+        encoding = locale.getpreferredencoding(False)
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._partial = ""
+
+    def feed(self, data: bytes, final: bool = False) -> list:
+        """Decode a chunk and return the complete lines it finished (without line endings)"""
+        parts = _NEWLINE.split(self._partial + self._decoder.decode(data, final))
+        self._partial = "" if final else parts.pop()
+        return [line.rstrip() for line in parts]
+
+def _output_frames(lines: list):
+    """SSE frames of output lines, at most STREAM_MAX_BATCH_LINES per frame"""
+    for start in range(0, len(lines), STREAM_MAX_BATCH_LINES):
+        frame = sse.output_frame(lines[start:start + STREAM_MAX_BATCH_LINES])
+        if frame:
+            yield frame
+
+async def _start_powershell(cmd: list):
+    """
+    Start a script with its output piped to the event loop.
+
+    Falls back to a plain Popen (read through the default executor) on event loops
+    without subprocess support, such as the Windows SelectorEventLoop.
+    """
+    try:
+        return await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,  # Merge stderr into stdout
+            cwd=str(PROJECT_ROOT)
+        )
+    except NotImplementedError:
+        return subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+            cwd=str(PROJECT_ROOT)
+        )
+
+async def _read_output(process) -> bytes:
+    """Read the next available chunk of output (b"" at end of stream)"""
+    if isinstance(process, asyncio.subprocess.Process):
+        return await process.stdout.read(STREAM_READ_SIZE)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, process.stdout.read, STREAM_READ_SIZE)
+
+async def _wait_process(process, timeout: Optional[float] = None) -> int:
+    """Wait for an asyncio or Popen process to exit (raises asyncio.TimeoutError on timeout)"""
+    if isinstance(process, asyncio.subprocess.Process):
+        return await asyncio.wait_for(process.wait(), timeout)
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(loop.run_in_executor(None, process.wait), timeout)
+
+async def terminate_process(process, timeout: float = 2.0) -> None:
+    """Terminate a script process, killing it if it does not exit within timeout seconds"""
+    if process.returncode is not None:
+        return
+    try:
+        process.terminate()
+        await _wait_process(process, timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+    except ProcessLookupError:
+        pass  # Exited in the meantime
+
+async def stream_powershell_output(script_path: str, *args, operation_id: str = None):
+    """
+    Stream PowerShell script output in real-time as server-sent events.
+
+    Scripts run on a warm worker of the PowerShell host pool when one is available, and
+    as a process of their own otherwise.
+
+    Output is read from the pipe only as fast as the consumer takes events, so a slow
+    consumer applies backpressure to the script instead of growing a buffer. If the
+    consumer stops (or is cancelled) before the script finishes, the script is terminated.
+    """
+    process = None
+    run = None
+    started = None
+    outcome = "error"
+    try:
+        run = await powershell_hosts.start(script_path, args)
+        if run is not None:
+            started = time.perf_counter()
+            if operation_id:
+                active_processes[operation_id] = run.process
+            
+            async for lines in run.output():
+                for frame in _output_frames(lines):
+                    yield frame
+            
+            outcome = str(run.exit_code)
+            yield sse.event("complete", exitCode=run.exit_code)
+            return
+        
         # Try pwsh first, fall back to powershell
         powershell_cmd = "pwsh"
         if not shutil.which("pwsh"):
@@ -373,76 +709,53 @@ async def stream_powershell_output(script_path: str, *args, operation_id: str =
         # Build PowerShell command
         cmd = [powershell_cmd, "-NoProfile", "-ExecutionPolicy", "Bypass", "-File", str(script_path)] + list(args)
         
-        # print(f"[DEBUG] Running command: {' '.join(cmd)}")
-        
-        # Use synchronous subprocess (Windows-compatible)
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,  # Merge stderr into stdout
-            text=True,
-            bufsize=1,
-            cwd=str(PROJECT_ROOT)
-        )
+        process = await _start_powershell(cmd)
+        started = time.perf_counter()
         
         # Track process for cancellation if operation_id provided
         if operation_id:
             active_processes[operation_id] = process
         
-        # Use a queue to communicate between threads
-        output_queue = Queue()
-        
-        def read_output():
-            """Read output in a separate thread"""
-            try:
-                for line in process.stdout:
-                    output_queue.put(('line', line.rstrip()))
-            except Exception as e:
-                output_queue.put(('error', str(e)))
-            finally:
-                output_queue.put(('done', None))
-        
-        # Start reading thread
-        reader_thread = threading.Thread(target=read_output, daemon=True)
-        reader_thread.start()
-        
-        # Stream output from queue
+        splitter = _LineSplitter()
         while True:
-            # Check queue with timeout to allow asyncio event loop to run
-            try:
-                import queue
-                msg_type, msg_data = output_queue.get(timeout=0.1)
-                
-                if msg_type == 'line':
-                    if msg_data:
-                        yield f"data: {json.dumps({'type': 'output', 'line': msg_data})}\n\n"
-                elif msg_type == 'error':
-                    yield f"data: {json.dumps({'type': 'error', 'message': msg_data})}\n\n"
-                    break
-                elif msg_type == 'done':
-                    break
-                    
-                await asyncio.sleep(0)  # Yield control to event loop
-            except:
-                # Timeout - continue loop to allow event loop to process
-                await asyncio.sleep(0.01)
+            chunk = await _read_output(process)
+            lines = splitter.feed(chunk, final=not chunk)
+            for frame in _output_frames(lines):
+                yield frame
+            if not chunk:
+                break
         
-        # Wait for process to complete
-        process.wait()
-        
-        # Remove from active processes
-        if operation_id and operation_id in active_processes:
-            del active_processes[operation_id]
+        exit_code = await _wait_process(process)
+        outcome = str(exit_code)
         
         # Send completion status
-        yield f"data: {json.dumps({'type': 'complete', 'exitCode': process.returncode})}\n\n"
+        yield sse.event("complete", exitCode=exit_code)
         
     except Exception as e:
         error_msg = str(e) if str(e) else f"{type(e).__name__}: {repr(e)}"
         print(f"[ERROR] Stream exception: {error_msg}")  # Debug logging
         import traceback
         traceback.print_exc()
-        yield f"data: {json.dumps({'type': 'error', 'message': error_msg})}\n\n"
+        yield sse.event("error", message=error_msg)
+    finally:
+        # Remove from active processes
+        if run is not None:
+            process = run.process
+        if operation_id and active_processes.get(operation_id) is process:
+            del active_processes[operation_id]
+        
+        # Consumer went away mid-run: nobody drains the pipe any more, so stop the script
+        # (a worker whose script did not finish is discarded by the pool)
+        if run is not None:
+            if not run.done:
+                outcome = "cancelled"
+            await powershell_hosts.finish(run)
+        elif process is not None and process.returncode is None:
+            outcome = "cancelled"
+            await terminate_process(process)
+        
+        if started is not None:
+            SCRIPT_DURATION.observe(time.perf_counter() - started, script=Path(script_path).name, exit_code=outcome)
 
 @app.post("/api/deploy")
 async def deploy_module(request: DeployRequest):
@@ -467,25 +780,99 @@ async def deploy_module(request: DeployRequest):
     
     # print(f"[DEBUG] Deploy args: {args}")  # Debug logging
     
-    return StreamingResponse(
-        stream_powershell_output(*args, operation_id=request.operationId),
-        media_type="text/event-stream"
+    if request.targetEnvironment:
+        environments = [f"{request.deployment}/{request.targetEnvironment}"]
+    else:
+        environments = module_environments(request.deployment, request.module, targets=True)
+    
+    return start_script_job(
+        "deploy", f"Deploy {request.module}", args, request.operationId, environments
+    )
+
+def build_deploy_graph(modules: list, tiered: bool) -> DeployGraph:
+    """Dependency DAG of the given modules (names or category/module paths; all if empty)"""
+    indexed = workspace_index.get_modules()
+    declared = get_dependency_graph().dependency_map()
+    graph = DeployGraph(module_dependencies(indexed, declared, tiered))
+    if not modules:
+        return graph
+    
+    by_name = {m["name"]: m["path"] for m in indexed}
+    paths = {m["path"] for m in indexed}
+    selected = []
+    for module in modules:
+        path = module if module in paths else by_name.get(module)
+        if not path:
+            raise HTTPException(status_code=400, detail=f"Module '{module}' not found")
+        selected.append(path)
+    return graph.restricted(selected)
+
+@app.post("/api/deploy/plan")
+async def plan_deploy_all(request: DeployAllRequest):
+    """Get the deploy waves and critical path of a multi-module deploy"""
+    try:
+        graph = await run_blocking(build_deploy_graph, request.modules, request.tiered)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return graph.plan()
+
+@app.post("/api/deploy/all")
+async def deploy_all_modules(request: DeployAllRequest):
+    """Deploy many modules to one or more environments in parallel, in dependency order"""
+    try:
+        graph = await run_blocking(build_deploy_graph, request.modules, request.tiered)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    script_path = PROJECT_ROOT / "ui-tools" / "scripts" / "Deploy-Module-UI.ps1"
+    
+    def run_deploy(module_path: str, environment: str):
+        category, module = module_path.split("/", 1)
+        args = [
+            str(script_path),
+            "-Deployment", request.deployment,
+            "-Category", category,
+            "-Module", module,
+            "-Environment", environment
+        ]
+        if request.managed:
+            args.append("-Managed")
+        if request.upgrade:
+            args.append("-Upgrade")
+        return stream_powershell_output(*args)
+    
+    orchestrator = DeployOrchestrator(
+        graph,
+        request.environments,
+        run_deploy,
+        max_parallel=request.maxParallel,
+        max_per_environment=request.maxPerEnvironment
     )
+    job = job_manager.submit(
+        "deploy-all",
+        lambda job_id: orchestrator.run(),
+        title=f"Deploy {len(graph.dependencies)} module(s) to {', '.join(request.environments)}",
+        job_id=request.operationId,
+        environments=[f"{request.deployment}/{env}" for env in request.environments]
+    )
+    return job_response(job)
 
 @app.post("/api/sync")
 async def sync_module(request: SyncRequest):
     """Sync a module from the selected environment"""
     script_path = PROJECT_ROOT / "ui-tools" / "scripts" / "Sync-Module-UI.ps1"
     
-    return StreamingResponse(
-        stream_powershell_output(
+    return start_script_job(
+        "sync",
+        f"Sync {request.module}",
+        [
             str(script_path),
             "-Deployment", request.deployment,
             "-Category", request.category,
-            "-Module", request.module,
-            operation_id=request.operationId
-        ),
-        media_type="text/event-stream"
+            "-Module", request.module
+        ],
+        request.operationId,
+        module_environments(request.deployment, request.module)
     )
 
 @app.post("/api/sync-from")
@@ -493,16 +880,18 @@ async def sync_module_from_environment(request: SyncFromRequest):
     """Sync a module FROM a specific environment (bidirectional sync for hotfixes)"""
     script_path = PROJECT_ROOT / "ui-tools" / "scripts" / "Sync-Module-From-Environment-UI.ps1"
     
-    return StreamingResponse(
-        stream_powershell_output(
+    return start_script_job(
+        "sync",
+        f"Sync {request.module} from {request.sourceEnvironment}",
+        [
             str(script_path),
             "-Deployment", request.deployment,
             "-Category", request.category,
             "-Module", request.module,
-            "-SourceEnvironment", request.sourceEnvironment,
-            operation_id=request.operationId
-        ),
-        media_type="text/event-stream"
+            "-SourceEnvironment", request.sourceEnvironment
+        ],
+        request.operationId,
+        [f"{request.deployment}/{request.sourceEnvironment}"]
     )
 
 @app.post("/api/version")
@@ -510,57 +899,159 @@ async def update_version(request: UpdateVersionRequest):
     """Update a module's version (online and local)"""
     script_path = PROJECT_ROOT / "ui-tools" / "scripts" / "Update-Version-UI.ps1"
     
-    return StreamingResponse(
-        stream_powershell_output(
+    return start_script_job(
+        "version",
+        f"Set {request.module} version to {request.version}",
+        [
             str(script_path),
             "-Deployment", request.deployment,
             "-Category", request.category,
             "-Module", request.module,
-            "-Version", request.version,
-            operation_id=request.operationId
-        ),
-        media_type="text/event-stream"
+            "-Version", request.version
+        ],
+        request.operationId,
+        module_environments(request.deployment, request.module)
     )
 
+async def build_module_packages(module_path: str, module_name: str, version: str, force: bool = False,
+                                operation_id: Optional[str] = None):
+    """
+    Build a module's packages unless the build cache has packages of the same source and version.
+    A successful build is added to the cache.
+    """
+    try:
+        digest = await run_blocking(build_cache.source_digest, module_path)
+    except FileNotFoundError as e:
+        yield sse.event("error", message=str(e))
+        return
+    
+    if not force:
+        cached = await run_blocking(build_cache.lookup, module_path, module_name, version, digest)
+        if cached:
+            how = f"restored {', '.join(cached['restored'])} from the build cache" if cached["restored"] else "packages are up to date"
+            yield sse.output(f"[OK] {module_name} v{version}: source unchanged since {cached['builtAt']}, {how}")
+            yield sse.event("build-cached", digest=digest, packages=[p["name"] for p in cached["packages"]],
+                            restored=cached["restored"])
+            yield sse.event("complete", exitCode=0)
+            return
+    
+    script_path = PROJECT_ROOT / "ui-tools" / "scripts" / "Build-Packages-UI.ps1"
+    async for frame in stream_powershell_output(
+        str(script_path),
+        "-ModulePath", module_path,
+        "-ModuleName", module_name,
+        "-Version", version,
+        operation_id=operation_id
+    ):
+        exit_codes = [event.get("exitCode") for event in sse.parse(frame) if event.get("type") == "complete"]
+        if exit_codes and exit_codes[0] == 0:
+            record = await run_blocking(build_cache.record, module_path, module_name, version, digest)
+            if record:
+                yield sse.output(f"Cached {len(record['packages'])} package(s) for source {digest[:12]}")
+        yield frame
+
 @app.post("/api/release/build")
 async def build_packages(request: BuildPackagesRequest):
-    """Build solution packages with streaming output"""
-    script_path = PROJECT_ROOT / "ui-tools" / "scripts" / "Build-Packages-UI.ps1"
-    
-    return StreamingResponse(
-        stream_powershell_output(
-            str(script_path),
-            "-ModulePath", request.module_path,
-            "-ModuleName", request.module_name,
-            "-Version", request.version,
-            operation_id=request.operationId
+    """Build solution packages with streaming output (skipped if the source is unchanged)"""
+    job = job_manager.submit(
+        "build",
+        lambda job_id: build_module_packages(
+            request.module_path, request.module_name, request.version, request.force, operation_id=job_id
         ),
-        media_type="text/event-stream"
+        title=f"Build {request.module_name} {request.version}",
+        job_id=request.operationId
     )
+    return job_response(job)
+
+def select_modules(names: list) -> list:
+    """Workspace modules by name or category/module path (all modules if names is empty)"""
+    indexed = workspace_index.get_modules()
+    if not names:
+        return indexed
+    by_key = {m["name"]: m for m in indexed}
+    by_key.update({m["path"]: m for m in indexed})
+    missing = [name for name in names if name not in by_key]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Module(s) not found: {', '.join(missing)}")
+    return [by_key[name] for name in names]
+
+@app.get("/api/release/build/status")
+async def build_status(modules: Optional[str] = None):
+    """Per module: whether its packages are current for its source and Solution.xml version"""
+    selected = await run_blocking(select_modules, modules.split(",") if modules else [])
+    
+    def statuses():
+        result = [build_cache.status(m["path"], m["name"], m["version"]) for m in selected]
+        build_cache.save()
+        return result
+    
+    return {"modules": await run_blocking(statuses)}
+
+@app.post("/api/release/build/all")
+async def build_all_packages(request: BuildAllRequest):
+    """Build the packages of many modules, skipping modules whose source is unchanged"""
+    selected = await run_blocking(select_modules, request.modules)
+    
+    async def run_builds(job_id: str):
+        counts = {"built": 0, "cached": 0, "failed": 0}
+        for module in selected:
+            exit_code = None
+            cached = False
+            async for frame in build_module_packages(
+                module["path"], module["name"], module["version"], request.force, operation_id=job_id
+            ):
+                tagged = []
+                for event in sse.parse(frame):
+                    if event.get("type") == "complete":
+                        exit_code = event.get("exitCode")
+                    elif event.get("type") == "error":
+                        tagged.append(sse.output(f"[{module['name']}] ✗ Error: {event.get('message')}"))
+                    elif event.get("type") == "build-cached":
+                        cached = True
+                        tagged.append(sse.event("build-cached", module=module["path"], **{
+                            key: value for key, value in event.items() if key != "type"
+                        }))
+                    elif event.get("type") == "output":
+                        tagged.append(sse.output(f"[{module['name']}] {event.get('line', '')}"))
+                if tagged:
+                    yield "".join(tagged)
+            
+            if exit_code != 0:
+                counts["failed"] += 1
+            else:
+                counts["cached" if cached else "built"] += 1
+        
+        yield sse.output("")
+        yield sse.output(f"=== Built {counts['built']}, unchanged {counts['cached']}, failed {counts['failed']} ===")
+        yield sse.event("complete", exitCode=1 if counts["failed"] else 0)
+    
+    job = job_manager.submit(
+        "build",
+        run_builds,
+        title=f"Build {len(selected)} module(s)",
+        job_id=request.operationId
+    )
+    return job_response(job)
 
 @app.post("/api/cancel")
 async def cancel_operation(request: CancelRequest):
     """Cancel a running operation"""
     operation_id = request.operationId
     
+    if job_manager.get(operation_id):
+        if await job_manager.cancel(operation_id):
+            return {"success": True, "message": "Operation cancelled"}
+        return {"success": False, "message": "Operation already completed"}
+    
     if operation_id not in active_processes:
         return {"success": False, "message": "Operation not found or already completed"}
     
     try:
-        process = active_processes[operation_id]
+        process = active_processes.pop(operation_id)
         
-        # Terminate the process (on Windows, this is like SIGTERM)
-        process.terminate()
-        
-        # Wait a bit for graceful termination
-        try:
-            process.wait(timeout=2)
-        except:
-            # If it doesn't terminate, kill it
-            process.kill()
-        
-        # Remove from active processes
-        del active_processes[operation_id]
+        # Terminate the process (on Windows, this is like SIGTERM), killing it if it
+        # does not exit within 2 seconds
+        await terminate_process(process, timeout=2)
         
         return {"success": True, "message": "Operation cancelled"}
     except Exception as e:
@@ -588,9 +1079,12 @@ async def ship_module(request: ShipRequest):
     # print(f"[DEBUG] Ship args: {args}")  # Debug logging
     # print(f"[DEBUG] request.managed: {request.managed}, request.upgrade: {request.upgrade}")
     
-    return StreamingResponse(
-        stream_powershell_output(*args, operation_id=request.operationId),
-        media_type="text/event-stream"
+    return start_script_job(
+        "ship",
+        f"Ship {request.module} to {request.tenant}/{request.environment}",
+        args,
+        request.operationId,
+        [f"{request.tenant}/{request.environment}"]
     )
 
 @app.post("/api/modules/create")
@@ -656,9 +1150,12 @@ async def create_module(request: CreateModuleRequest):
         args.extend(["-Deployment", request.deployment])
         args.extend(["-Environment", request.sourceEnvironment])
     
-    return StreamingResponse(
-        stream_powershell_output(*args, operation_id=request.operationId),
-        media_type="text/event-stream"
+    return start_script_job(
+        "create-module",
+        f"Create module {request.moduleName}",
+        args,
+        request.operationId,
+        [f"{request.deployment}/{request.sourceEnvironment}"] if request.deploy else []
     )
 
 @app.post("/api/modules/release")
@@ -666,92 +1163,61 @@ async def create_release(request: ReleaseRequest):
     """Create a release for a module"""
     script_path = PROJECT_ROOT / "ui-tools" / "scripts" / "Release-Module-UI.ps1"
     
-    return StreamingResponse(
-        stream_powershell_output(
+    return start_script_job(
+        "release",
+        f"Release {request.module}",
+        [
             str(script_path),
             "-Category", request.category,
-            "-Module", request.module,
-            operation_id=request.operationId
-        ),
-        media_type="text/event-stream"
+            "-Module", request.module
+        ],
+        request.operationId
     )
 @app.post("/api/helpers/create-fields")
 async def create_fields(request: CreateFieldsRequest):
     """Mass create fields on a Dataverse table using Python Dataverse client"""
     
     async def stream_field_creation():
+        # Dataverse calls (and request budget waits) run on the scan pool, never on the event loop
+        client = None
         try:
-            # Load deployment configuration
-            config_path = PROJECT_ROOT / ".config" / "deployments.json"
-            if not config_path.exists():
-                yield f"data: {{\"type\": \"error\", \"message\": \"Configuration not found at {config_path}\"}}\n\n"
-                return
-            
-            with open(config_path) as f:
-                config = json.load(f)
-            
-            # Get the deployment configuration
-            if request.deployment not in config.get("Deployments", {}):
-                yield f"data: {{\"type\": \"error\", \"message\": \"Deployment '{request.deployment}' not found in configuration\"}}\n\n"
-                return
-            
-            deployment_config = config["Deployments"][request.deployment]
-            
-            # Get authentication configuration from deployment
-            if "Auth" not in deployment_config:
-                yield f"data: {{\"type\": \"error\", \"message\": \"Auth configuration missing for deployment '{request.deployment}'. Please add Auth section with TenantId, ClientId, ClientSecret, and EnvironmentUrls.\"}}\n\n"
-                return
-            
-            auth_config = deployment_config["Auth"]
-            tenant_id = auth_config.get("TenantId")
-            client_id = auth_config.get("ClientId")
-            client_secret = auth_config.get("ClientSecret")
-            
-            if not all([tenant_id, client_id, client_secret]):
-                yield f"data: {{\"type\": \"error\", \"message\": \"Incomplete auth configuration for deployment '{request.deployment}'. TenantId, ClientId, and ClientSecret are required.\"}}\n\n"
-                return
-            
-            # Get environment URL from auth configuration
-            environment_url = auth_config.get("EnvironmentUrls", {}).get(request.environment)
-            if not environment_url:
-                yield f"data: {{\"type\": \"error\", \"message\": \"Environment URL not configured for '{request.environment}' in deployment '{request.deployment}'\"}}\n\n"
+            # Check the deployment's auth configuration for the environment
+            try:
+                client_registry.resolve(request.deployment, request.environment)
+            except ClientConfigError as e:
+                yield sse.event("error", message=str(e))
                 return
             
             # Initialize message
-            yield f"data: {{\"type\": \"output\", \"line\": \"=== Create Fields on Table: {request.tableName} ===\"}}\n\n"
-            yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
-            yield f"data: {{\"type\": \"output\", \"line\": \"Deployment: {request.deployment}\"}}\n\n"
-            yield f"data: {{\"type\": \"output\", \"line\": \"Environment: {request.environment}\"}}\n\n"
-            yield f"data: {{\"type\": \"output\", \"line\": \"Table: {request.tableName}\"}}\n\n"
-            yield f"data: {{\"type\": \"output\", \"line\": \"Fields to create: {len(request.fields)}\"}}\n\n"
-            yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
+            yield sse.output(f"=== Create Fields on Table: {request.tableName} ===")
+            yield sse.output("")
+            yield sse.output(f"Deployment: {request.deployment}")
+            yield sse.output(f"Environment: {request.environment}")
+            yield sse.output(f"Table: {request.tableName}")
+            yield sse.output(f"Fields to create: {len(request.fields)}")
+            yield sse.output("")
             
             # Create Dataverse client
-            yield f"data: {{\"type\": \"output\", \"line\": \"Connecting to Dataverse...\"}}\n\n"
-            client = DataverseClient(
-                environment_url=environment_url,
-                tenant_id=tenant_id,
-                client_id=client_id,
-                client_secret=client_secret
-            )
+            yield sse.output("Connecting to Dataverse...")
+            client = await run_blocking(client_registry.acquire, request.deployment, request.environment)
+            yield sse.output("✓ Connected successfully")
+            yield sse.output("")
             
-            # Authenticate
-            client.authenticate()
-            yield f"data: {{\"type\": \"output\", \"line\": \"✓ Connected successfully\"}}\n\n"
-            yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
+            # Collect created attributes and relationships for the target solution
+            if request.targetSolution:
+                client.track_solution_components(request.targetSolution)
             
             # Validate choice fields have existing option sets
             choice_fields = [f for f in request.fields if f.get("type") in ["Choice", "Picklist"]]
             if choice_fields:
-                yield f"data: {{\"type\": \"output\", \"line\": \"Validating choice fields...\"}}\n\n"
+                yield sse.output("Validating choice fields...")
                 
                 # Get option sets from Dataverse (primary source)
-                yield f"data: {{\"type\": \"output\", \"line\": \"  Querying Dataverse for global option sets...\"}}\n\n"
-                dataverse_option_sets = client.get_global_optionset_definitions()
+                yield sse.output("  Querying Dataverse for global option sets...")
+                dataverse_option_sets = await run_blocking(client.get_global_optionset_definitions)
                 
                 # Also scan local workspace option sets
-                option_sets_response = await scan_option_sets()
-                local_option_sets = option_sets_response.get("optionSets", [])
+                local_option_sets = await run_blocking(workspace_index.get_option_sets)
                 
                 # Merge: Dataverse option sets + local option sets (deduplicate by schema name)
                 all_option_sets = {os["schemaName"]: os for os in dataverse_option_sets}
@@ -760,7 +1226,7 @@ async def create_fields(request: CreateFieldsRequest):
                         all_option_sets[os["schemaName"]] = os
                 
                 all_option_sets_list = list(all_option_sets.values())
-                yield f"data: {{\"type\": \"output\", \"line\": \"  Found {len(dataverse_option_sets)} option sets in Dataverse, {len(local_option_sets)} local\"}}\n\n"
+                yield sse.output(f"  Found {len(dataverse_option_sets)} option sets in Dataverse, {len(local_option_sets)} local")
                 
                 # Build lookup maps: schema name -> schema name, display name -> schema name
                 option_set_by_schema = {os["schemaName"]: os["schemaName"] for os in all_option_sets_list}
@@ -781,31 +1247,30 @@ async def create_fields(request: CreateFieldsRequest):
                             # Convert display name to schema name
                             schema_name = option_set_by_display[option_set_name]
                             field["optionSetSchemaName"] = schema_name
-                            yield f"data: {{\"type\": \"output\", \"line\": \"  ℹ Resolved '{option_set_name}' to '{schema_name}'\"}}\n\n"
+                            yield sse.output(f"  ℹ Resolved '{option_set_name}' to '{schema_name}'")
                         else:
                             # Not found by either name
                             missing_option_sets.append(f"{field.get('schemaName', 'unknown')} - option set '{option_set_name}' not found")
                 
                 if missing_option_sets:
-                    yield f"data: {{\"type\": \"output\", \"line\": \"✗ Validation failed:\"}}\n\n"
+                    yield sse.output("✗ Validation failed:")
                     for error in missing_option_sets:
-                        error_escaped = error.replace('"', '\\"')
-                        yield f"data: {{\"type\": \"output\", \"line\": \"  - {error_escaped}\"}}\n\n"
-                    yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
-                    yield f"data: {{\"type\": \"output\", \"line\": \"Please ensure all referenced option sets exist (use Choice Creator to create them)\"}}\n\n"
-                    yield f"data: {{\"type\": \"complete\", \"exitCode\": 1}}\n\n"
+                        yield sse.output(f"  - {error}")
+                    yield sse.output("")
+                    yield sse.output("Please ensure all referenced option sets exist (use Choice Creator to create them)")
+                    yield sse.event("complete", exitCode=1)
                     return
                 
-                yield f"data: {{\"type\": \"output\", \"line\": \"✓ All choice field option sets found\"}}\n\n"
-                yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
+                yield sse.output("✓ All choice field option sets found")
+                yield sse.output("")
             
             # Validate lookup fields have existing target tables
             lookup_fields = [f for f in request.fields if f.get("type") in ["Lookup", "Reference"]]
             if lookup_fields:
-                yield f"data: {{\"type\": \"output\", \"line\": \"Validating lookup fields...\"}}\n\n"
+                yield sse.output("Validating lookup fields...")
                 
                 # Get all tables from Dataverse
-                all_tables = client.get_entity_definitions()
+                all_tables = await run_blocking(client.get_entity_definitions)
                 
                 # Build lookup maps: logical name -> logical name, display name -> logical name
                 table_by_logical = {t["logicalName"]: t["logicalName"] for t in all_tables}
@@ -826,26 +1291,25 @@ async def create_fields(request: CreateFieldsRequest):
                             # Convert display name to logical name
                             logical_name = table_by_display[target_table]
                             field["targetTableLogicalName"] = logical_name
-                            yield f"data: {{\"type\": \"output\", \"line\": \"  ℹ Resolved '{target_table}' to '{logical_name}'\"}}\n\n"
+                            yield sse.output(f"  ℹ Resolved '{target_table}' to '{logical_name}'")
                         else:
                             # Not found by either name
                             missing_tables.append(f"{field.get('schemaName', 'unknown')} - target table '{target_table}' not found")
                 
                 if missing_tables:
-                    yield f"data: {{\"type\": \"output\", \"line\": \"✗ Validation failed:\"}}\n\n"
+                    yield sse.output("✗ Validation failed:")
                     for error in missing_tables:
-                        error_escaped = error.replace('"', '\\"')
-                        yield f"data: {{\"type\": \"output\", \"line\": \"  - {error_escaped}\"}}\n\n"
-                    yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
-                    yield f"data: {{\"type\": \"output\", \"line\": \"Please ensure all referenced tables exist\"}}\n\n"
-                    yield f"data: {{\"type\": \"complete\", \"exitCode\": 1}}\n\n"
+                        yield sse.output(f"  - {error}")
+                    yield sse.output("")
+                    yield sse.output("Please ensure all referenced tables exist")
+                    yield sse.event("complete", exitCode=1)
                     return
                 
-                yield f"data: {{\"type\": \"output\", \"line\": \"✓ All lookup field target tables found\"}}\n\n"
-                yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
+                yield sse.output("✓ All lookup field target tables found")
+                yield sse.output("")
             
             # Resolve table name to logical name
-            all_tables = client.get_entity_definitions()
+            all_tables = await run_blocking(client.get_entity_definitions)
             table_by_logical = {t["logicalName"]: t["logicalName"] for t in all_tables}
             table_by_display = {t["displayName"]: t["logicalName"] for t in all_tables}
             
@@ -855,7 +1319,7 @@ async def create_fields(request: CreateFieldsRequest):
                 table_logical_name = table_by_display[request.tableName]
             elif request.tableName not in table_by_logical:
                 # Table not found
-                yield f"data: {{\"type\": \"error\", \"message\": \"Table '{request.tableName}' not found in Dataverse\"}}\n\n"
+                yield sse.event("error", message=f"Table '{request.tableName}' not found in Dataverse")
                 return
             
             # Separate Name field renames from regular field creations
@@ -865,7 +1329,7 @@ async def create_fields(request: CreateFieldsRequest):
             for field in request.fields:
                 if field.get('operation') == 'rename_name_field':
                     if name_field:
-                        yield f"data: {{\"type\": \"error\", \"message\": \"Multiple Name fields specified - only one allowed per table\"}}\n\n"
+                        yield sse.event("error", message="Multiple Name fields specified - only one allowed per table")
                         return
                     name_field = field
                 else:
@@ -877,27 +1341,28 @@ async def create_fields(request: CreateFieldsRequest):
             # Process Name field rename first (if specified)
             name_rename_success = False
             if name_field:
-                yield f"data: {{\"type\": \"output\", \"line\": \"Renaming table Name field...\"}}\n\n"
-                yield f"data: {{\"type\": \"output\", \"line\": \"  New display name: {name_field['displayName']}\"}}\n\n"
+                yield sse.output("Renaming table Name field...")
+                yield sse.output(f"  New display name: {name_field['displayName']}")
                 
-                result = client.update_name_field_display_name(
+                result = await run_blocking(
+                    client.update_name_field_display_name,
                     table_logical_name=table_logical_name,
                     new_display_name=name_field['displayName']
                 )
                 
                 if result.get('success'):
-                    yield f"data: {{\"type\": \"output\", \"line\": \"  ✓ Name field renamed successfully\"}}\n\n"
-                    yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
+                    yield sse.output("  ✓ Name field renamed successfully")
+                    yield sse.output("")
                     name_rename_success = True
                 else:
-                    error_msg = result.get('error', 'Unknown error').replace('\"', '\\\\\"')
-                    yield f"data: {{\"type\": \"output\", \"line\": \"  ✗ Failed: {error_msg}\"}}\n\n"
-                    yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
+                    error_msg = result.get('error', 'Unknown error')
+                    yield sse.output(f"  ✗ Failed: {error_msg}")
+                    yield sse.output("")
             
             # Now create regular fields
             if fields_to_create:
-                yield f"data: {{\"type\": \"output\", \"line\": \"Creating fields...\"}}\n\n"
-                yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
+                yield sse.output("Creating fields...")
+                yield sse.output("")
             
             # Create fields
             success_count = 0
@@ -913,44 +1378,61 @@ async def create_fields(request: CreateFieldsRequest):
                 display_name = field.get("displayName")
                 field_type = field.get("type")
                 
-                yield f"data: {{\"type\": \"output\", \"line\": \"[{i}/{len(fields_to_create)}] Creating: {schema_name} ({display_name})\"}}\n\n"
-                yield f"data: {{\"type\": \"output\", \"line\": \"  Type: {field_type}\"}}\n\n"
+                yield sse.output(f"[{i}/{len(fields_to_create)}] Creating: {schema_name} ({display_name})")
+                yield sse.output(f"  Type: {field_type}")
                 
                 # Create the field using the resolved logical table name
-                result = client.create_field(table_logical_name, field)
+                result = await run_blocking(client.create_field, table_logical_name, field)
                 
                 if result.get("success"):
-                    yield f"data: {{\"type\": \"output\", \"line\": \"  ✓ Field created successfully\"}}\n\n"
+                    yield sse.output("  ✓ Field created successfully")
                     success_count += 1
                 else:
                     error_msg = result.get("error", "Unknown error")
-                    yield f"data: {{\"type\": \"output\", \"line\": \"  ✗ Failed: {error_msg}\"}}\n\n"
+                    yield sse.output(f"  ✗ Failed: {error_msg}")
                     fail_count += 1
                 
-                yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
+                yield sse.output("")
+            
+            # Add created components to the target solution in batched calls
+            if request.targetSolution and client.component_buffer:
+                yield sse.output(f"Adding {len(client.component_buffer)} component(s) to solution {request.targetSolution}...")
+                solution_result = await run_blocking(client.flush_solution_components)
+                yield sse.output(f"  ✓ Added: {solution_result['added']}, already in solution: {solution_result['skipped']}")
+                for failed in solution_result.get("failed", []):
+                    yield sse.output(f"  ✗ {failed['name']}: {failed.get('error', 'Unknown error')}")
+                if solution_result.get("error"):
+                    yield sse.output(f"  ✗ {solution_result['error']}")
+                yield sse.output("")
             
             # Summary
-            yield f"data: {{\"type\": \"output\", \"line\": \"=== Summary ===\"}}\n\n"
-            yield f"data: {{\"type\": \"output\", \"line\": \"Total operations: {total_operations}\"}}\n\n"
-            yield f"data: {{\"type\": \"output\", \"line\": \"✓ Successful: {success_count}\"}}\n\n"
+            yield sse.output("=== Summary ===")
+            yield sse.output(f"Total operations: {total_operations}")
+            yield sse.output(f"✓ Successful: {success_count}")
             if fail_count > 0:
-                yield f"data: {{\"type\": \"output\", \"line\": \"✗ Failed: {fail_count}\"}}\n\n"
-            yield f"data: {{\"type\": \"output\", \"line\": \"\"}}\n\n"
+                yield sse.output(f"✗ Failed: {fail_count}")
+            yield sse.output("")
             
             # Complete
             exit_code = 0 if fail_count == 0 else 1
-            yield f"data: {{\"type\": \"complete\", \"exitCode\": {exit_code}}}\n\n"
+            yield sse.event("complete", exitCode=exit_code)
             
         except Exception as e:
             import traceback
-            error_msg = str(e).replace('"', '\\"').replace('\n', ' ')
-            yield f"data: {{\"type\": \"error\", \"message\": \"{error_msg}\"}}\n\n"
+            yield sse.event("error", message=str(e) or type(e).__name__)
             traceback.print_exc()
-    
-    return StreamingResponse(
-        stream_field_creation(),
-        media_type="text/event-stream"
+        finally:
+            if client is not None:
+                await run_blocking(client_registry.release, client)
+    
+    job = job_manager.submit(
+        "create-fields",
+        lambda job_id: stream_field_creation(),
+        title=f"Create {len(request.fields)} field(s) on {request.tableName}",
+        job_id=request.operationId,
+        environments=[f"{request.deployment}/{request.environment}"]
     )
+    return job_response(job)
 
 @app.get("/api/helpers/field-templates")
 async def get_field_templates():
@@ -1042,115 +1524,31 @@ async def get_field_template(name: str):
 # ============================================================================
 
 @app.get("/api/helpers/solutions/list")
-async def list_solutions():
-    """Scan all modules for Solution.xml files and extract solution information"""
-    solutions = []
+async def list_solutions(request: Request, prefix: Optional[str] = None, optionValuePrefix: Optional[str] = None):
+    """List solution information of all modules, optionally filtered by publisher or option value prefix"""
+    async def build():
+        if prefix or optionValuePrefix:
+            return {"solutions": await run_blocking(workspace_index.query_solutions, prefix, optionValuePrefix)}
+        return {"solutions": await run_blocking(workspace_index.get_solutions)}
     
-    # Scan all category/module folders
-    exclude_folders = {"__pycache__", ".scripts", ".config", ".git", ".vscode", "bin", "obj", "ui-tools"}
-    
-    for category_dir in PROJECT_ROOT.iterdir():
-        if not category_dir.is_dir() or category_dir.name in exclude_folders:
-            continue
-        
-        for module_dir in category_dir.iterdir():
-            if not module_dir.is_dir():
-                continue
-            
-            solution_xml = module_dir / "src" / "Other" / "Solution.xml"
-            if solution_xml.exists():
-                try:
-                    tree = ET.parse(solution_xml)
-                    root = tree.getroot()
-                    
-                    # Extract solution details
-                    manifest = root.find(".//SolutionManifest")
-                    if manifest is not None:
-                        unique_name = manifest.find("UniqueName")
-                        localized_name = manifest.find(".//LocalizedName")
-                        publisher = manifest.find(".//Publisher")
-                        
-                        solution_info = {
-                            "uniqueName": unique_name.text if unique_name is not None else "",
-                            "displayName": localized_name.get("description") if localized_name is not None else "",
-                            "category": category_dir.name,
-                            "module": module_dir.name,
-                            "path": str(module_dir.relative_to(PROJECT_ROOT))
-                        }
-                        
-                        # Extract publisher prefix and option value prefix
-                        if publisher is not None:
-                            prefix_elem = publisher.find("CustomizationPrefix")
-                            option_prefix_elem = publisher.find("CustomizationOptionValuePrefix")
-                            solution_info["prefix"] = prefix_elem.text if prefix_elem is not None else ""
-                            solution_info["optionValuePrefix"] = option_prefix_elem.text if option_prefix_elem is not None else ""
-                        
-                        solutions.append(solution_info)
-                        
-                except Exception as e:
-                    print(f"Error parsing solution XML {solution_xml}: {e}", file=sys.stderr)
-    
-    return {"solutions": sorted(solutions, key=lambda s: (s.get("category", ""), s.get("module", "")))}
+    return await cached_json_response(request, await run_blocking(workspace_index.fingerprint), build)
 
 @app.get("/api/helpers/option-sets/scan")
-async def scan_option_sets():
-    """Scan all modules for existing global option sets"""
-    option_sets = []
-    
-    # Scan all OptionSets folders
-    exclude_folders = {"__pycache__", ".scripts", ".config", ".git", ".vscode", "bin", "obj", "ui-tools"}
-    
-    # print(f"[DEBUG] Starting option sets scan in {PROJECT_ROOT}")
-    
-    for category_dir in PROJECT_ROOT.iterdir():
-        if not category_dir.is_dir() or category_dir.name in exclude_folders:
-            continue
-        
-        for module_dir in category_dir.iterdir():
-            if not module_dir.is_dir():
-                continue
-            
-            option_sets_dir = module_dir / "src" / "OptionSets"
-            if option_sets_dir.exists():
-                # print(f"[DEBUG] Found OptionSets dir: {option_sets_dir}")
-                for optionset_xml in option_sets_dir.glob("*.xml"):
-                    try:
-                        tree = ET.parse(optionset_xml)
-                        root = tree.getroot()
-                        
-                        # Extract option set details
-                        schema_name = root.get("Name", "")
-                        display_name = root.get("localizedName", "")
-                        
-                        # Extract options
-                        options = []
-                        for option_elem in root.findall(".//option"):
-                            value = option_elem.get("value", "")
-                            label_elem = option_elem.find(".//label")
-                            label = label_elem.get("description", "") if label_elem is not None else ""
-                            
-                            if label:  # Only include options with labels
-                                options.append({
-                                    "value": value,
-                                    "label": label
-                                })
-                        
-                        option_set_info = {
-                            "schemaName": schema_name,
-                            "displayName": display_name,
-                            "options": options,
-                            "category": category_dir.name,
-                            "module": module_dir.name,
-                            "filePath": str(optionset_xml.relative_to(PROJECT_ROOT))
-                        }
-                        option_sets.append(option_set_info)
-                        # print(f"[DEBUG] Parsed option set: {display_name} ({schema_name}) with {len(options)} options")
-                        
-                    except Exception as e:
-                        print(f"Error parsing option set XML {optionset_xml}: {e}", file=sys.stderr)
-    
-    # print(f"[DEBUG] Scan complete. Found {len(option_sets)} option sets")
-    return {"optionSets": sorted(option_sets, key=lambda o: (o.get("category", ""), o.get("module", ""), o.get("displayName", "")))}
+async def scan_option_sets(
+    request: Request,
+    module: Optional[str] = None,
+    category: Optional[str] = None,
+    prefix: Optional[str] = None,
+    valueMin: Optional[int] = None,
+    valueMax: Optional[int] = None
+):
+    """List existing global option sets, optionally filtered by module, category, publisher prefix or value range"""
+    async def build():
+        if module or category or prefix or valueMin is not None or valueMax is not None:
+            return {"optionSets": await run_blocking(workspace_index.query_option_sets, module, category, prefix, valueMin, valueMax)}
+        return {"optionSets": await run_blocking(workspace_index.get_option_sets)}
+    
+    return await cached_json_response(request, await run_blocking(workspace_index.fingerprint), build)
 
 class TableScanRequest(BaseModel):
     deployment: str
@@ -1160,48 +1558,15 @@ class TableScanRequest(BaseModel):
 async def scan_tables(request: TableScanRequest):
     """Scan all tables from Dataverse environment"""
     try:
-        # Load deployment configuration
-        config_path = PROJECT_ROOT / ".config" / "deployments.json"
-        if not config_path.exists():
-            return {"error": f"Configuration not found at {config_path}", "tables": []}
-        
-        with open(config_path) as f:
-            config = json.load(f)
-        
-        # Get the deployment configuration
-        if request.deployment not in config.get("Deployments", {}):
-            return {"error": f"Deployment '{request.deployment}' not found", "tables": []}
-        
-        deployment_config = config["Deployments"][request.deployment]
-        
-        # Get authentication configuration
-        if "Auth" not in deployment_config:
-            return {"error": "Auth configuration missing", "tables": []}
-        
-        auth_config = deployment_config["Auth"]
-        tenant_id = auth_config.get("TenantId")
-        client_id = auth_config.get("ClientId")
-        client_secret = auth_config.get("ClientSecret")
-        
-        if not all([tenant_id, client_id, client_secret]):
-            return {"error": "Incomplete auth configuration", "tables": []}
+        def fetch_tables():
+            with client_registry.lease(request.deployment, request.environment) as client:
+                return client.get_entity_definitions()
         
-        # Get environment URL
-        environment_url = auth_config.get("EnvironmentUrls", {}).get(request.environment)
-        if not environment_url:
-            return {"error": f"Environment URL not configured for '{request.environment}'", "tables": []}
-        
-        # Create Dataverse client and get entity definitions
-        # print(f"[DEBUG] Scanning tables from {environment_url}")
-        client = DataverseClient(
-            environment_url=environment_url,
-            tenant_id=tenant_id,
-            client_id=client_id,
-            client_secret=client_secret
-        )
-        
-        client.authenticate()
-        tables = client.get_entity_definitions()
+        # Pooled client: no config parsing, authentication or TLS setup on repeat scans
+        try:
+            tables = await run_blocking(fetch_tables)
+        except ClientConfigError as e:
+            return {"error": str(e), "tables": []}
         
         # print(f"[DEBUG] Scan complete. Found {len(tables)} tables")
         return {"tables": sorted(tables, key=lambda t: t.get("displayName", ""))}
@@ -1213,111 +1578,19 @@ async def scan_tables(request: TableScanRequest):
 class OptionSetSearchRequest(BaseModel):
     displayName: Optional[str] = None
     optionLabels: Optional[list[str]] = None
+    limit: Optional[int] = None  # top-k; all matches if not set
+    minScore: int = 1
 
 @app.post("/api/helpers/option-sets/search")
 async def search_option_sets(request: OptionSetSearchRequest):
     """Search for similar option sets based on name or option values"""
-    # print(f"[DEBUG] Search request: displayName={request.displayName}, optionLabels={request.optionLabels}")
-    
-    # First, get all option sets
-    all_option_sets_response = await scan_option_sets()
-    all_option_sets = all_option_sets_response["optionSets"]
-    
-    # print(f"[DEBUG] Searching through {len(all_option_sets)} option sets")
-    
-    matches = []
-    
-    for option_set in all_option_sets:
-        match_score = 0
-        match_reasons = []
-        matched_count = 0  # Initialize here for use across all matching logic
-        
-        # Name matching
-        if request.displayName:
-            search_name = request.displayName.lower()
-            display_name = option_set.get("displayName", "").lower()
-            schema_name = option_set.get("schemaName", "").lower()
-            
-            # Exact match
-            if search_name == display_name or search_name == schema_name:
-                match_score += 100
-                match_reasons.append("Exact name match")
-            # Contains match
-            elif search_name in display_name or search_name in schema_name:
-                match_score += 50
-                match_reasons.append("Partial name match")
-            # Word match (exclude common noise words)
-            else:
-                noise_words = {"status", "type", "category"}
-                search_words = [w for w in search_name.split() if w not in noise_words and len(w) > 2]
-                if search_words and any(word in display_name or word in schema_name for word in search_words):
-                    match_score += 25
-                    match_reasons.append("Word match")
-        
-        # Option label matching
-        if request.optionLabels and len(request.optionLabels) > 0:
-            # Exclude common noise values that don't indicate real similarity
-            noise_values = {"active", "inactive", "completed"}
-            
-            existing_labels = [opt["label"].lower() for opt in option_set.get("options", []) if opt["label"].lower() not in noise_values]
-            search_terms = [label.lower() for label in request.optionLabels if label.lower() not in noise_values]
-            
-            # print(f"[DEBUG] Matching option set '{option_set.get('displayName')}' - search terms: {search_terms}, existing labels: {existing_labels}")
-            
-            # Check for exact matches AND partial matches (for multi-word labels)
-            matched_count = 0
-            matched_labels = []
-            
-            for search_term in search_terms:
-                # Check if search term matches any label exactly or partially
-                for existing_label in existing_labels:
-                    # Exact match
-                    if search_term == existing_label:
-                        matched_count += 1
-                        matched_labels.append(existing_label)
-                        # print(f"[DEBUG]   Exact match: '{search_term}' == '{existing_label}'")
-                        break
-                    # Partial match (search term appears in label, e.g., "Progress" matches "In Progress")
-                    elif search_term in existing_label or existing_label in search_term:
-                        matched_count += 1
-                        matched_labels.append(existing_label)
-                        # print(f"[DEBUG]   Partial match: '{search_term}' <-> '{existing_label}'")
-                        break
-            
-            # print(f"[DEBUG]   Matched {matched_count}/{len(search_terms)} terms")
-            
-            overlap_percentage = (matched_count / len(search_terms) * 100) if search_terms else 0
-            
-            if overlap_percentage >= 75:
-                match_score += 80
-                match_reasons.append(f"{int(overlap_percentage)}% option values match ({matched_count}/{len(search_terms)})")
-            elif overlap_percentage >= 50:
-                match_score += 50
-                match_reasons.append(f"{int(overlap_percentage)}% option values match ({matched_count}/{len(search_terms)})")
-            elif overlap_percentage >= 25:
-                match_score += 25
-                match_reasons.append(f"{int(overlap_percentage)}% option values match ({matched_count}/{len(search_terms)})")
-            elif matched_count > 0:
-                # Even a single match should show up with a small score
-                match_score += 15
-                match_reasons.append(f"Partial match ({matched_count}/{len(search_terms)} values)")
-        
-        # Only include results that actually matched something
-        if match_score > 0 or matched_count > 0:
-            if match_score == 0 and matched_count > 0:
-                match_score = 1  # Give minimal score for sorting
-                
-            matches.append({
-                **option_set,
-                "matchScore": match_score,
-                "matchReasons": match_reasons if match_reasons else ["Result"]
-            })
-    
-    # Sort by match score descending
-    matches.sort(key=lambda m: m["matchScore"], reverse=True)
-    
-    # print(f"[DEBUG] Search complete. Found {len(matches)} matches")
-    
+    search_index = await run_blocking(get_optionset_search_index)
+    matches = search_index.search(
+        display_name=request.displayName,
+        option_labels=request.optionLabels,
+        limit=request.limit,
+        min_score=request.minScore
+    )
     return {"matches": matches}
 
 class OptionSetCreateRequest(BaseModel):
@@ -1334,10 +1607,9 @@ async def create_option_set(request: OptionSetCreateRequest):
     """Create a new global option set in Dataverse"""
     try:
         # Find the target solution
-        solutions_response = await list_solutions()
         target_solution = None
         
-        for solution in solutions_response["solutions"]:
+        for solution in await run_blocking(workspace_index.get_solutions):
             if solution["uniqueName"] == request.targetSolution:
                 target_solution = solution
                 break
@@ -1349,58 +1621,18 @@ async def create_option_set(request: OptionSetCreateRequest):
         if not request.schemaName or not request.schemaName.replace('_', '').isalnum():
             return {"success": False, "error": "Invalid schema name. Use only letters, numbers, and underscores."}
         
-        # Load deployment configuration
-        config_path = PROJECT_ROOT / ".config" / "deployments.json"
-        if not config_path.exists():
-            return {"success": False, "error": f"Configuration not found at {config_path}"}
-        
-        with open(config_path) as f:
-            config = json.load(f)
-        
-        # Get the deployment configuration
-        if request.deployment not in config.get("Deployments", {}):
-            return {"success": False, "error": f"Deployment '{request.deployment}' not found in configuration"}
-        
-        deployment_config = config["Deployments"][request.deployment]
-        
-        # Get authentication configuration
-        if "Auth" not in deployment_config:
-            return {"success": False, "error": f"Auth configuration missing for deployment '{request.deployment}'"}
-        
-        auth_config = deployment_config["Auth"]
-        tenant_id = auth_config.get("TenantId")
-        client_id = auth_config.get("ClientId")
-        client_secret = auth_config.get("ClientSecret")
-        
-        if not all([tenant_id, client_id, client_secret]):
-            return {"success": False, "error": "Incomplete auth configuration. TenantId, ClientId, and ClientSecret are required."}
-        
-        # Get environment URL
-        environment_url = auth_config.get("EnvironmentUrls", {}).get(request.environment)
-        if not environment_url:
-            return {"success": False, "error": f"Environment URL not configured for '{request.environment}'"}
+        # Check the deployment's auth configuration for the environment
+        try:
+            client_registry.resolve(request.deployment, request.environment)
+        except ClientConfigError as e:
+            return {"success": False, "error": str(e)}
         
         # Get option value prefix and find next available value
         option_value_prefix = target_solution.get("optionValuePrefix", "14713")
         solution_path = PROJECT_ROOT / target_solution["path"]
-        option_sets_dir = solution_path / "src" / "OptionSets"
         
-        # Scan existing option sets to find max value
-        max_value = 0
-        if option_sets_dir.exists():
-            for existing_xml in option_sets_dir.glob("*.xml"):
-                try:
-                    tree = ET.parse(existing_xml)
-                    for option_elem in tree.findall(".//option"):
-                        value_str = option_elem.get("value", "0")
-                        try:
-                            value_int = int(value_str)
-                            if value_int > max_value:
-                                max_value = value_int
-                        except ValueError:
-                            pass
-                except Exception:
-                    pass
+        # Highest option value already used by the module's option sets
+        max_value = await run_blocking(workspace_index.max_option_value, solution_path)
         
         # Generate values for options
         next_value = max_value + 1 if max_value >= int(option_value_prefix + "0000") else int(option_value_prefix + "0000")
@@ -1426,26 +1658,18 @@ async def create_option_set(request: OptionSetCreateRequest):
                 })
                 next_value += 1
         
-        # Create Dataverse client and create the option set
-        # print(f"[DEBUG] Creating global option set '{request.schemaName}' in Dataverse")
-        client = DataverseClient(
-            environment_url=environment_url,
-            tenant_id=tenant_id,
-            client_id=client_id,
-            client_secret=client_secret
-        )
-        
-        # Authenticate
-        client.authenticate()
+        # Create the global option set with a pooled client for the environment
+        def create():
+            with client_registry.lease(request.deployment, request.environment) as client:
+                return client.create_global_optionset(
+                    schema_name=request.schemaName,
+                    display_name=request.displayName,
+                    description=request.description,
+                    options=options_with_values,
+                    solution_unique_name=request.targetSolution
+                )
         
-        # Create the global option set
-        result = client.create_global_optionset(
-            schema_name=request.schemaName,
-            display_name=request.displayName,
-            description=request.description,
-            options=options_with_values,
-            solution_unique_name=request.targetSolution
-        )
+        result = await run_blocking(create)
         
         if result["success"]:
             # Return complete information for caching
@@ -1476,44 +1700,9 @@ async def create_option_set(request: OptionSetCreateRequest):
 async def get_pending_optionsets():
     """Get all pending option sets from cache"""
     try:
-        pending = load_pending_optionsets()
-        
-        # Clean up any that now exist in filesystem
-        if pending:
-            # Scan filesystem for existing option sets
-            all_scanned = []
-            exclude_folders = {"__pycache__", ".scripts", ".config", ".git", ".vscode", "bin", "obj", "ui-tools"}
-            
-            for category_dir in PROJECT_ROOT.iterdir():
-                if not category_dir.is_dir() or category_dir.name in exclude_folders:
-                    continue
-                
-                for module_dir in category_dir.iterdir():
-                    if not module_dir.is_dir():
-                        continue
-                    
-                    option_sets_dir = module_dir / "src" / "OptionSets"
-                    if option_sets_dir.exists():
-                        for xml_file in option_sets_dir.glob("*.xml"):
-                            try:
-                                tree = ET.parse(xml_file)
-                                root = tree.getroot()
-                                schema_name = root.get("Name")
-                                if schema_name:
-                                    all_scanned.append(schema_name)
-                            except Exception:
-                                pass
-            
-            # Filter out pending items that now exist
-            scanned_set = set(all_scanned)
-            original_count = len(pending)
-            pending = [p for p in pending if p.get("schemaName") not in scanned_set]
-            
-            if len(pending) != original_count:
-                save_pending_optionsets(pending)
-                # print(f"[DEBUG] Cleaned up {original_count - len(pending)} synced items from pending cache")
-        
-        return {"pending": pending}
+        # Picks up newly synced option set files; the index reports them to the pending store
+        await run_blocking(workspace_index.refresh)
+        return {"pending": await run_blocking(pending_optionsets.list)}
     except Exception as e:
         print(f"Error getting pending option sets: {e}", file=sys.stderr)
         return {"pending": []}
@@ -1533,16 +1722,11 @@ class PendingOptionSetRequest(BaseModel):
 async def add_pending_optionset(request: PendingOptionSetRequest):
     """Add a pending option set to cache"""
     try:
-        pending = load_pending_optionsets()
-        
-        # Check if already exists
-        for item in pending:
-            if item.get("schemaName") == request.schemaName:
-                return {"success": False, "error": "Option set already in pending cache"}
-        
-        # Add new item
-        from datetime import datetime
-        pending.append({
+        # Already synced: it would never be reported as a new file again
+        if request.schemaName in await run_blocking(workspace_index.get_option_set_names):
+            return {"success": False, "error": "Option set already exists in the workspace"}
+
+        added = await run_blocking(pending_optionsets.add, {
             "schemaName": request.schemaName,
             "displayName": request.displayName,
             "description": request.description,
@@ -1551,12 +1735,10 @@ async def add_pending_optionset(request: PendingOptionSetRequest):
             "path": request.path,
             "options": request.options,
             "deployment": request.deployment,
-            "environment": request.environment,
-            "createdAt": datetime.utcnow().isoformat(),
-            "isPending": True
+            "environment": request.environment
         })
-        
-        save_pending_optionsets(pending)
+        if not added:
+            return {"success": False, "error": "Option set already in pending cache"}
         
         return {"success": True, "message": f"Added '{request.displayName}' to pending cache"}
     except Exception as e:
@@ -1567,16 +1749,9 @@ async def add_pending_optionset(request: PendingOptionSetRequest):
 async def delete_pending_optionset(schema_name: str):
     """Remove a specific pending option set from cache"""
     try:
-        pending = load_pending_optionsets()
-        original_count = len(pending)
-        
-        pending = [p for p in pending if p.get("schemaName") != schema_name]
-        
-        if len(pending) == original_count:
+        if not await run_blocking(pending_optionsets.remove, schema_name):
             return {"success": False, "error": "Option set not found in pending cache"}
         
-        save_pending_optionsets(pending)
-        
         return {"success": True, "message": f"Removed '{schema_name}' from pending cache"}
     except Exception as e:
         print(f"Error deleting pending option set: {e}", file=sys.stderr)
@@ -1586,7 +1761,7 @@ async def delete_pending_optionset(schema_name: str):
 async def clear_pending_optionsets():
     """Clear all pending option sets from cache"""
     try:
-        save_pending_optionsets([])
+        await run_blocking(pending_optionsets.clear)
         return {"success": True, "message": "Cleared all pending option sets"}
     except Exception as e:
         print(f"Error clearing pending option sets: {e}", file=sys.stderr)
@@ -1627,22 +1802,24 @@ async def validate_release(request: ReleaseValidationRequest):
             errors.append("Repository has uncommitted changes. Please commit or stash changes before creating a release.")
         
         # Check for CHANGELOG.md with Unreleased section
-        changelog_path = PROJECT_ROOT / request.module_path / "CHANGELOG.md"
-        if not changelog_path.exists():
-            errors.append(f"CHANGELOG.md not found at {changelog_path}")
-        else:
-            with open(changelog_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                if "## Unreleased" not in content:
-                    errors.append("CHANGELOG.md does not contain an '## Unreleased' section")
-                else:
-                    # Check if Unreleased section has content
-                    import re
-                    unreleased_section = re.search(r'## Unreleased\s*(.*?)(?=\n##|\Z)', content, re.DOTALL)
-                    if unreleased_section:
-                        section_content = unreleased_section.group(1).strip()
-                        if not section_content or len(section_content) < 10:
-                            warnings.append("Unreleased section appears to be empty")
+        changelog = await run_blocking(changelog_index.get, request.module_path)
+        if changelog is None:
+            errors.append(f"CHANGELOG.md not found at {PROJECT_ROOT / request.module_path / 'CHANGELOG.md'}")
+        elif changelog.unreleased is None:
+            errors.append("CHANGELOG.md does not contain an '## Unreleased' section")
+        elif changelog.unreleased_is_empty():
+            warnings.append("Unreleased section appears to be empty")
+        
+        # Point out modules that have to be compatible with this release
+        module_key = Path(request.module_path).as_posix().strip("/")
+        graph = await run_blocking(get_dependency_graph)
+        try:
+            dependents = graph.dependents(module_key)
+        except KeyError:
+            dependents = {}
+        if dependents:
+            names = ", ".join(path.split("/")[-1] for path in dependents)
+            warnings.append(f"{len(dependents)} module(s) depend on this module: {names}")
         
         return {
             "success": True,
@@ -1661,19 +1838,132 @@ async def validate_release(request: ReleaseValidationRequest):
             "warnings": []
         }
 
+def git_changed_paths(pathspecs: list) -> Optional[list]:
+    """
+    Paths with uncommitted changes (staged, unstaged or untracked) below the pathspecs,
+    from a single git status call; None if git is unavailable
+    """
+    try:
+        result = subprocess.run(
+            ["git", "status", "--porcelain", "-z", "--untracked-files=all", "--", *pathspecs],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            timeout=30
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    
+    paths = []
+    entries = iter(result.stdout.decode("utf-8", errors="replace").split("\0"))
+    for entry in entries:
+        if len(entry) < 4:
+            continue
+        status, path = entry[:2], entry[3:]
+        paths.append(path)
+        if "R" in status or "C" in status:
+            next(entries, None)  # Renames and copies are followed by their original path
+    return paths
+
+def git_tags() -> set:
+    """All tag names of the repository (empty if git is unavailable)"""
+    try:
+        result = subprocess.run(["git", "tag", "--list"], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return set()
+    return set(result.stdout.split()) if result.returncode == 0 else set()
+
+def release_readiness(module: dict, changed: Optional[list], tags: set, graph: DependencyGraph) -> dict:
+    """Release pre-flight checks of one module (the same checks as /api/release/validate, per module)"""
+    errors = []
+    warnings = []
+    prefix = module["path"].rstrip("/") + "/"
+    
+    if changed is None:
+        uncommitted = None
+        warnings.append("Could not read git status")
+    else:
+        uncommitted = [path for path in changed if path.startswith(prefix)]
+        if uncommitted:
+            errors.append(f"{len(uncommitted)} uncommitted change(s) in the module")
+    
+    changelog = changelog_index.get(module["path"])
+    if changelog is None:
+        changelog_state = "missing"
+        errors.append("CHANGELOG.md not found")
+    elif changelog.unreleased is None:
+        changelog_state = "no-unreleased"
+        errors.append("CHANGELOG.md does not contain an '## Unreleased' section")
+    elif changelog.unreleased_is_empty():
+        changelog_state = "empty"
+        warnings.append("Unreleased section appears to be empty")
+    else:
+        changelog_state = "ok"
+    
+    tag = f"{module['name']}/v{module['version']}"
+    if tag not in tags:
+        warnings.append(f"Current version {module['version']} has no tag {tag}")
+    
+    build = build_cache.status(module["path"], module["name"], module["version"])
+    releases_path = PROJECT_ROOT / ".releases" / module["name"]
+    packages = sorted(p.name for p in releases_path.glob(f"*-v{module['version']}.zip")) if releases_path.is_dir() else []
+    
+    try:
+        dependents = sorted(graph.dependents(module["path"]))
+    except KeyError:
+        dependents = []
+    if dependents:
+        warnings.append(f"{len(dependents)} module(s) depend on this module: {', '.join(p.split('/')[-1] for p in dependents)}")
+    
+    return {
+        "modulePath": module["path"],
+        "name": module["name"],
+        "version": module["version"],
+        "ready": not errors,
+        "errors": errors,
+        "warnings": warnings,
+        "checks": {
+            "uncommittedChanges": uncommitted,
+            "changelog": changelog_state,
+            "versionTagged": tag in tags,
+            "packages": packages,
+            "packagesCurrent": build["upToDate"],
+            "dependents": dependents
+        }
+    }
+
+@app.post("/api/release/validate/batch")
+async def validate_release_batch(request: BatchValidationRequest):
+    """
+    Release readiness of many modules in one call: one git status query over all module paths,
+    then the changelog, Solution.xml version and package checks of every module in parallel
+    """
+    modules = await run_blocking(select_modules, request.module_paths)
+    changed, tags, graph = await asyncio.gather(
+        run_blocking(git_changed_paths, [m["path"] for m in modules]),
+        run_blocking(git_tags),
+        run_blocking(get_dependency_graph)
+    )
+    results = await asyncio.gather(*(
+        run_blocking(release_readiness, module, changed, tags, graph) for module in modules
+    ))
+    await run_blocking(build_cache.save)
+    return {
+        "success": True,
+        "ready": sum(1 for result in results if result["ready"]),
+        "total": len(results),
+        "modules": list(results)
+    }
+
 @app.get("/api/release/get-changelog")
 async def get_changelog(module_path: str):
-    """Get the full CHANGELOG.md content"""
+    """Get the full CHANGELOG.md content and its section index"""
     try:
-        changelog_path = PROJECT_ROOT / module_path / "CHANGELOG.md"
-        
-        if not changelog_path.exists():
+        changelog = await run_blocking(changelog_index.get, module_path)
+        if changelog is None:
             return {"success": False, "error": "CHANGELOG.md not found", "content": ""}
-        
-        with open(changelog_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        return {"success": True, "content": content}
+        return {"success": True, "content": changelog.text, "sections": changelog.to_dict()}
     except Exception as e:
         print(f"Error reading changelog: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "content": ""}
@@ -1683,39 +1973,23 @@ async def preview_changelog(request: dict):
     """Preview the changelog transformation (before/after)"""
     try:
         from datetime import datetime
-        import re
-        
-        module_path = request.get("module_path")
-        new_version = request.get("new_version")
         
-        changelog_path = PROJECT_ROOT / module_path / "CHANGELOG.md"
-        
-        if not changelog_path.exists():
+        changelog = await run_blocking(changelog_index.get, request.get("module_path"))
+        if changelog is None:
             return {"success": False, "error": "CHANGELOG.md not found"}
         
-        with open(changelog_path, 'r', encoding='utf-8') as f:
-            original_content = f.read()
-        
         # Check if there's an Unreleased section
-        if '## Unreleased' not in original_content:
+        if changelog.unreleased is None:
             return {
                 "success": False, 
                 "error": "CHANGELOG.md does not contain an '## Unreleased' section. Please add one before creating a release."
             }
         
-        # Transform the changelog
         current_date = datetime.now().strftime("%Y-%m-%d")
-        transformed_content = re.sub(
-            r'## Unreleased',
-            f'## [{new_version}] - {current_date}',
-            original_content,
-            count=1
-        )
-        
         return {
             "success": True,
-            "before": original_content,
-            "after": transformed_content
+            "before": changelog.text,
+            "after": changelog.release(request.get("new_version"), current_date)
         }
     except Exception as e:
         print(f"Error previewing changelog: {e}", file=sys.stderr)
@@ -1725,187 +1999,156 @@ async def preview_changelog(request: dict):
 async def extract_changelog(module_path: str, version: str = None):
     """Extract release notes from CHANGELOG.md - either Unreleased or specific version"""
     try:
-        changelog_path = PROJECT_ROOT / module_path / "CHANGELOG.md"
-        
-        if not changelog_path.exists():
+        changelog = await run_blocking(changelog_index.get, module_path)
+        if changelog is None:
             return {"success": False, "error": "CHANGELOG.md not found", "content": ""}
         
-        with open(changelog_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        import re
-        
-        if version:
-            # Try versioned section first, fall back to Unreleased if not found
-            # Extract from versioned section like ## [1.0.0.0] - 2026-02-26
-            escaped_version = version.replace('.', r'\.')
-            # Match the version header, then capture everything until the next ## header (not ###)
-            version_section = re.search(rf'## \[{escaped_version}\][^\n]*\n+(.*?)(?=\n## (?:\[|\w)|\Z)', content, re.DOTALL)
-            
-            if version_section:
-                section_content = version_section.group(1).strip()
-                return {"success": True, "content": section_content, "source": "versioned"}
-            
-            # Fall back to Unreleased if version section not found
-            unreleased_section = re.search(r'## Unreleased\s+(.*?)(?=\n## (?:\[|\w)|\Z)', content, re.DOTALL)
-            
-            if unreleased_section:
-                section_content = unreleased_section.group(1).strip()
-                return {"success": True, "content": section_content, "source": "unreleased"}
-            else:
-                return {"success": True, "content": "", "source": "none"}
-        else:
-            # Extract Unreleased section
-            unreleased_section = re.search(r'## Unreleased\s+(.*?)(?=\n## (?:\[|\w)|\Z)', content, re.DOTALL)
-            
-            if unreleased_section:
-                section_content = unreleased_section.group(1).strip()
-                return {"success": True, "content": section_content, "source": "unreleased"}
-            else:
-                return {"success": True, "content": "", "source": "none"}
+        # Versioned section like ## [1.0.0.0] - 2026-02-26, falling back to Unreleased
+        content, source = changelog.notes(version)
+        return {"success": True, "content": content, "source": source}
     except Exception as e:
         print(f"Error extracting changelog: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "content": ""}
 
+@app.get("/api/release/aggregate-changelog")
+async def aggregate_changelog(module_paths: str, version: Optional[str] = None):
+    """
+    Release notes of several modules (comma separated module paths) combined into one
+    Markdown document: the given version's section of each changelog, or Unreleased
+    """
+    paths = [path.strip() for path in module_paths.split(",") if path.strip()]
+    return {"success": True, **await run_blocking(changelog_index.aggregate, paths, version)}
+
+def list_release_packages(module_path: str, inspect: bool = False) -> dict:
+    """
+    List built solution packages in the .releases folder of a module with their metadata
+    (and, with inspect, the manifest and component counts read from each package)
+    """
+    from datetime import datetime
+    
+    # Extract module name from path (e.g., "shared/core" -> "core")
+    module_name = Path(module_path).name
+    
+    # Check .releases/<module> folder instead of bin/Release
+    releases_path = PROJECT_ROOT / ".releases" / module_name
+    
+    if not releases_path.exists():
+        return {"success": True, "packages": [], "message": "No .releases folder found yet"}
+    
+    # Find .zip files in the .releases/<module> folder
+    packages = []
+    for file_path in releases_path.glob("*.zip"):
+        stat_info = file_path.stat()
+        modified_dt = datetime.fromtimestamp(stat_info.st_mtime)
+        created_dt = datetime.fromtimestamp(stat_info.st_ctime)
+        
+        # Format: "Thu Feb-26, 2026 2:30 PM"
+        modified_formatted = modified_dt.strftime("%a %b-") + str(modified_dt.day) + modified_dt.strftime(", %Y %I:%M %p")
+        created_formatted = created_dt.strftime("%a %b-") + str(created_dt.day) + created_dt.strftime(", %Y %I:%M %p")
+        
+        package = {
+            "name": file_path.name,
+            "size": stat_info.st_size,
+            "size_mb": round(stat_info.st_size / (1024 * 1024), 2),
+            "created": created_formatted,
+            "modified": modified_formatted,
+            "modified_timestamp": stat_info.st_mtime
+        }
+        if inspect:
+            try:
+                package["inspection"] = package_inspector.inspect(file_path)
+            except (FileNotFoundError, PackageError) as e:
+                package["inspection"] = {"error": str(e)}
+        packages.append(package)
+    
+    # Sort by modification time (newest first)
+    packages.sort(key=lambda x: x["modified_timestamp"], reverse=True)
+    
+    return {
+        "success": True,
+        "packages": packages,
+        "count": len(packages),
+        "folder": str(releases_path.relative_to(PROJECT_ROOT))
+    }
+
 @app.get("/api/release/check-packages")
-async def check_packages(module_path: str):
+async def check_packages(module_path: str, inspect: bool = False):
     """Check for built solution packages in .releases folder and return their metadata"""
     try:
-        from datetime import datetime
-        import os
-        
-        # Extract module name from path (e.g., "shared/core" -> "core")
-        module_name = Path(module_path).name
-        
-        # Check .releases/<module> folder instead of bin/Release
-        releases_path = PROJECT_ROOT / ".releases" / module_name
-        
-        if not releases_path.exists():
-            return {"success": True, "packages": [], "message": "No .releases folder found yet"}
-        
-        # Find .zip files in the .releases/<module> folder
-        packages = []
-        for file_path in releases_path.glob("*.zip"):
-            stat_info = file_path.stat()
-            modified_dt = datetime.fromtimestamp(stat_info.st_mtime)
-            created_dt = datetime.fromtimestamp(stat_info.st_ctime)
-            
-            # Format: "Thu Feb-26, 2026 2:30 PM"
-            modified_formatted = modified_dt.strftime("%a %b-") + str(modified_dt.day) + modified_dt.strftime(", %Y %I:%M %p")
-            created_formatted = created_dt.strftime("%a %b-") + str(created_dt.day) + created_dt.strftime(", %Y %I:%M %p")
-            
-            packages.append({
-                "name": file_path.name,
-                "size": stat_info.st_size,
-                "size_mb": round(stat_info.st_size / (1024 * 1024), 2),
-                "created": created_formatted,
-                "modified": modified_formatted,
-                "modified_timestamp": stat_info.st_mtime
-            })
-        
-        # Sort by modification time (newest first)
-        packages.sort(key=lambda x: x["modified_timestamp"], reverse=True)
-        
-        return {
-            "success": True,
-            "packages": packages,
-            "count": len(packages),
-            "folder": str(releases_path.relative_to(PROJECT_ROOT))
-        }
+        return await run_blocking(list_release_packages, module_path, inspect)
     except Exception as e:
         print(f"Error checking packages: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "packages": []}
 
+def release_package_path(relative_path: str) -> Path:
+    """A package path relative to .releases (e.g. "core/App-Base-Core-v1.0.0.1.zip"), kept inside it"""
+    releases = (PROJECT_ROOT / ".releases").resolve()
+    path = (releases / relative_path).resolve()
+    if releases not in path.parents or path.suffix.lower() != ".zip":
+        raise HTTPException(status_code=400, detail=f"Not a package in .releases: {relative_path}")
+    return path
+
+@app.get("/api/release/packages/inspect")
+async def inspect_package(path: str):
+    """Version, managed flag, component counts and SHA-256 of a release package (read without extracting)"""
+    package_path = release_package_path(path)
+    try:
+        return await run_blocking(package_inspector.inspect, package_path)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PackageError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.post("/api/release/packages/compare")
+async def compare_packages(request: ComparePackagesRequest):
+    """Inspect several release packages and report the fields that differ and identical files"""
+    paths = [release_package_path(path) for path in request.paths]
+    return await run_blocking(package_inspector.compare, paths)
+
 @app.post("/api/release/execute")
 async def execute_release(request: ReleaseExecutionRequest):
-    """Execute the full release workflow"""
-    try:
-        from datetime import datetime
-        
-        # Build the script path
-        script_path = PROJECT_ROOT / "ui-tools" / "scripts" / "Full-Release-UI.ps1"
-        
-        if not script_path.exists():
-            return {
-                "success": False,
-                "error": f"Release script not found: {script_path}",
-                "steps": []
-            }
-        
-        # Build PowerShell command
-        ps_command = [
-            "powershell.exe",
-            "-NoProfile",
-            "-ExecutionPolicy", "Bypass",
-            "-File", str(script_path),
+    """
+    Execute the release workflow as a job of concurrent steps with streaming output.
+    Steps completed by an earlier run of the same module version are not run again.
+    """
+    script_path = PROJECT_ROOT / "ui-tools" / "scripts" / "Full-Release-UI.ps1"
+    if not script_path.exists():
+        raise HTTPException(status_code=404, detail=f"Release script not found: {script_path}")
+    
+    def run_step(step: str):
+        args = [
+            str(script_path),
             "-ModulePath", request.module_path,
             "-ModuleName", request.module_name,
             "-ReleaseType", request.release_type,
             "-NewVersion", request.new_version,
             "-ReleaseNotes", request.release_notes,
-            "-EnabledSteps", ",".join(request.enabled_steps)
+            "-EnabledSteps", step
         ]
-        
-        # Add optional display name if provided
         if request.module_display_name:
-            ps_command.extend(["-ModuleFriendlyName", request.module_display_name])
-        
-        print(f"Executing release command: {' '.join(ps_command)}", file=sys.stderr)
-        
-        # Execute the PowerShell script
-        result = subprocess.run(
-            ps_command,
-            cwd=PROJECT_ROOT,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
-        
-        print(f"PowerShell stdout: {result.stdout}", file=sys.stderr)
-        print(f"PowerShell stderr: {result.stderr}", file=sys.stderr)
-        print(f"PowerShell return code: {result.returncode}", file=sys.stderr)
-        
-        # Try to parse JSON output from the script
-        try:
-            output_data = json.loads(result.stdout)
-            return output_data
-        except json.JSONDecodeError:
-            # If not JSON, return a structured error
-            if result.returncode == 0:
-                return {
-                    "success": True,
-                    "steps": [{
-                        "label": "Release execution",
-                        "status": "success",
-                        "message": result.stdout
-                    }],
-                    "github_release_url": ""
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": result.stderr or result.stdout or "Unknown error",
-                    "steps": [{
-                        "label": "Release execution",
-                        "status": "error",
-                        "message": result.stderr or "Failed to execute release"
-                    }]
-                }
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "error": "Release execution timed out after 5 minutes",
-            "steps": []
-        }
-    except Exception as e:
-        print(f"Error executing release: {e}", file=sys.stderr)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
-        return {
-            "success": False,
-            "error": str(e),
-            "steps": []
-        }
+            args.extend(["-ModuleFriendlyName", request.module_display_name])
+        return stream_powershell_output(*args)
+    
+    pipeline = ReleasePipeline(
+        request.module_path,
+        request.new_version,
+        request.enabled_steps,
+        run_step,
+        release_states,
+        resume=request.resume
+    )
+    environments = []
+    if request.sync_tenant and request.sync_environment:
+        environments.append(f"{request.sync_tenant}/{request.sync_environment}")
+    
+    job = job_manager.submit(
+        "release",
+        lambda job_id: pipeline.run(),
+        title=f"Release {request.module_name} v{request.new_version}",
+        job_id=request.operationId,
+        environments=environments
+    )
+    return job_response(job)
 
 @app.post("/api/release/execute-step")
 async def execute_single_step(request: StepExecutionRequest):
@@ -1926,11 +2169,71 @@ async def execute_single_step(request: StepExecutionRequest):
     if request.module_display_name:
         args.extend(["-ModuleFriendlyName", request.module_display_name])
     
-    return StreamingResponse(
-        stream_powershell_output(str(script_path), *args, operation_id=request.operationId),
-        media_type="text/event-stream"
+    environments = []
+    if request.sync_tenant and request.sync_environment:
+        environments.append(f"{request.sync_tenant}/{request.sync_environment}")
+    
+    return start_script_job(
+        "release-step",
+        f"Release step {request.step} for {request.module_name}",
+        [str(script_path)] + args,
+        request.operationId,
+        environments
     )
 
+@app.get("/api/dependencies")
+async def get_dependencies():
+    """Get the cross-module dependency graph with install waves and cycles"""
+    graph = await run_blocking(get_dependency_graph)
+    return graph.to_dict()
+
+@app.get("/api/dependencies/{category}/{module}")
+async def get_module_dependencies(category: str, module: str, transitive: bool = False):
+    """Get what a module depends on and what depends on it (with reasons)"""
+    graph = await run_blocking(get_dependency_graph)
+    module_key = f"{category}/{module}"
+    try:
+        return {
+            "module": module_key,
+            "dependencies": graph.dependencies(module_key, transitive),
+            "dependents": graph.dependents(module_key, transitive)
+        }
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Module '{module_key}' not found")
+
+@app.get("/api/jobs")
+async def list_jobs(state: Optional[str] = None, limit: int = 50):
+    """List jobs (newest first), optionally filtered by state"""
+    return {"jobs": job_manager.list(state=state, limit=limit)}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get the status of a job"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.summary()
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    lastEventId: Optional[int] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Reattach to a job's output (Server-Sent Events). Events after the Last-Event-ID header
+    (or lastEventId query parameter) are replayed from the job's buffer, then live output
+    follows until the job finishes.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    
+    last_event_id = lastEventId
+    if last_event_id is None and last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+    return job_response(job, last_event_id or 0)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
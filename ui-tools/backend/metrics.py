@@ -0,0 +1,292 @@
+"""
+Backend Metrics
+
+In-process counters and latency histograms for the backend: HTTP requests per
+route, workspace scans, Dataverse calls and authentication per environment,
+and PowerShell script runs per script. Observations are a dictionary lookup
+and a few additions under a lock, so metrics stay enabled in production.
+
+Values are exported in the Prometheus text format or as JSON (with estimated
+percentiles). Statistics kept elsewhere (cache hit counters, index stats) are
+added at export time by registered collectors.
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Latency buckets in seconds, from fast cache hits to long imports
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# A collector returns (metric name, help text, type, [(labels, value), ...]) tuples
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    parts = []
+    for name, value in labels:
+        escaped = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * (bucket_count + 1)  # last slot: above the largest bucket
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+class Histogram:
+    """Latency histogram with one series per label combination"""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[index] += 1
+            series.count += 1
+            series.sum += value
+            if value > series.max:
+                series.max = value
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[Dict[str, object]]:
+        """
+        Time a block; labels can be completed inside the block through the yielded dict
+
+        Example::
+
+            with histogram.time(script="Deploy") as labels:
+                labels["exit_code"] = run()
+        """
+        labels = dict(labels)
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _snapshot(self) -> List[Tuple[LabelKey, List[int], int, float, float]]:
+        with self._lock:
+            return [(key, list(s.counts), s.count, s.sum, s.max) for key, s in self._series.items()]
+
+    def _quantile(self, counts: List[int], count: int, maximum: float, q: float) -> float:
+        """Estimate a quantile by linear interpolation within its bucket"""
+        rank = q * count
+        seen = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(counts):
+            upper = self.buckets[index] if index < len(self.buckets) else maximum
+            if bucket_count and seen + bucket_count >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, maximum)
+            seen += bucket_count
+            lower = upper
+        return maximum
+
+    def prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, counts, count, total, _ in sorted(self._snapshot()):
+            cumulative = 0
+            for index, bound in enumerate(self.buckets + (math.inf,)):
+                cumulative += counts[index]
+                labels = _format_labels(key + (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+    def to_dict(self) -> List[Dict[str, object]]:
+        series = []
+        for key, counts, count, total, maximum in sorted(self._snapshot()):
+            series.append({
+                "labels": dict(key),
+                "count": count,
+                "sum": round(total, 6),
+                "mean": round(total / count, 6) if count else 0.0,
+                "p50": round(self._quantile(counts, count, maximum, 0.5), 6),
+                "p95": round(self._quantile(counts, count, maximum, 0.95), 6),
+                "p99": round(self._quantile(counts, count, maximum, 0.99), 6),
+                "max": round(maximum, 6)
+            })
+        return series
+
+
+class Counter:
+    """Monotonic counter with one value per label combination"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _snapshot(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+    def prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in self._snapshot())
+        return lines
+
+    def to_dict(self) -> List[Dict[str, object]]:
+        return [{"labels": dict(key), "value": value} for key, value in self._snapshot()]
+
+
+class MetricsRegistry:
+    """Named histograms and counters plus collectors evaluated at export time"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, help_text, buckets)
+            return self._metrics[name]
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        """Get or create a counter"""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter(name, help_text)
+            return self._metrics[name]
+
+    def add_collector(self, collector: Collector) -> None:
+        """Register a callable reporting externally kept values (e.g. cache statistics)"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def _collected(self) -> List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]:
+        families = []
+        for collector in list(self._collectors):
+            try:
+                families.extend(collector())
+            except Exception:
+                continue  # A failing collector must not break the export
+        return families
+
+    def prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP process_start_time_seconds Start time of the backend since the epoch",
+            "# TYPE process_start_time_seconds gauge",
+            f"process_start_time_seconds {_format_value(round(self.started, 3))}"
+        ]
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.prometheus())
+        for name, help_text, kind, samples in self._collected():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(
+                f"{name}{_format_labels(_label_key(labels))} {_format_value(value)}"
+                for labels, value in samples
+            )
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict[str, object]:
+        """All metrics as JSON-serializable data"""
+        result: Dict[str, object] = {"uptimeSeconds": round(time.time() - self.started, 1)}
+        for metric in list(self._metrics.values()):
+            result[metric.name] = metric.to_dict()
+        for name, _, _, samples in self._collected():
+            result[name] = [{"labels": labels, "value": value} for labels, value in samples]
+        return result
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request until its response starts
+
+    Requests are labelled with the route template (not the raw path), so path
+    parameters do not create new series. For streaming responses the time to
+    the first byte is recorded, not the length of the stream.
+    """
+
+    def __init__(self, app, histogram: Histogram):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        recorded = False
+
+        def record(status: int) -> None:
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            route = scope.get("route")
+            self.histogram.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status
+            )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                record(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            record(500)
+            raise
+
+
+def ratio_samples(stats: Dict[str, Dict[str, float]], hits_key: str = "hits", misses_key: str = "misses"):
+    """Hit ratio per cache from {cache: {hits, misses}} statistics (caches without lookups omitted)"""
+    samples = []
+    for cache, values in stats.items():
+        lookups = values.get(hits_key, 0) + values.get(misses_key, 0)
+        if lookups:
+            samples.append(({"cache": cache}, round(values.get(hits_key, 0) / lookups, 4)))
+    return samples
+
+
+# Process-wide registry used by the backend
+registry = MetricsRegistry()
@@ -0,0 +1,304 @@
+"""
+Option Set Search Index
+
+Similarity search over global option sets for the Choice Creator. Names and
+option labels are indexed with inverted indexes (exact values and character
+trigrams), so finding exact, partial (substring) and similar matches only
+touches candidate option sets instead of scoring every label of every set.
+
+Scoring follows the original rules of the search endpoint (exact/partial/word
+name matches and option label overlap tiers), extended with trigram name
+similarity and Jaccard similarity of label sets for ranking near-duplicates.
+"""
+
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Values too common to indicate real similarity
+NOISE_LABELS = {"active", "inactive", "completed"}
+NOISE_NAME_WORDS = {"status", "type", "category"}
+
+# Trigram similarity above which a name counts as similar
+SIMILAR_NAME_THRESHOLD = 0.5
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a string (empty for strings shorter than 3 characters)"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _strip_prefix(schema_name: str) -> str:
+    """Drop the publisher prefix of a schema name (appbase_shifttype -> shifttype)"""
+    return schema_name.split("_", 1)[1] if "_" in schema_name else schema_name
+
+
+def _jaccard(a: Set[Any], b: Set[Any]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _SubstringIndex:
+    """
+    Trigram index over a set of strings answering exact, "contains" and
+    "contained in" lookups without scanning every string.
+    """
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.grams: Dict[str, Set[int]] = defaultdict(set)
+        self.gram_counts: List[int] = []
+        self.short: Set[int] = set()  # values too short to have trigrams
+
+    def add(self, value: str) -> int:
+        value_id = self.ids.get(value)
+        if value_id is not None:
+            return value_id
+
+        value_id = len(self.values)
+        self.values.append(value)
+        self.ids[value] = value_id
+        grams = trigrams(value)
+        self.gram_counts.append(len(grams))
+        if grams:
+            for gram in grams:
+                self.grams[gram].add(value_id)
+        else:
+            self.short.add(value_id)
+        return value_id
+
+    def containing(self, term: str) -> Set[int]:
+        """Ids of values that contain term"""
+        grams = trigrams(term)
+        if not grams:
+            return {i for i, v in enumerate(self.values) if term in v}
+
+        postings = sorted((self.grams.get(g, set()) for g in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return {i for i in candidates if term in self.values[i]}
+
+    def contained_in(self, term: str) -> Set[int]:
+        """Ids of values that are substrings of term"""
+        counts: Dict[int, int] = defaultdict(int)
+        for gram in trigrams(term):
+            for value_id in self.grams.get(gram, ()):
+                counts[value_id] += 1
+
+        candidates = {i for i, n in counts.items() if n == self.gram_counts[i]}
+        candidates |= self.short
+        return {i for i in candidates if self.values[i] in term}
+
+    def similar(self, term: str, threshold: float) -> Dict[int, float]:
+        """Ids of values whose trigram Jaccard similarity to term is at least threshold"""
+        term_grams = trigrams(term)
+        if not term_grams:
+            return {}
+
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in term_grams:
+            for value_id in self.grams.get(gram, ()):
+                shared[value_id] += 1
+
+        result = {}
+        for value_id, n in shared.items():
+            score = n / (len(term_grams) + self.gram_counts[value_id] - n)
+            if score >= threshold:
+                result[value_id] = score
+        return result
+
+
+class OptionSetSearchIndex:
+    """
+    Search index over option sets, rebuilt when the workspace index changes.
+
+    Option sets are plain dictionaries in the scan_option_sets format.
+    """
+
+    def __init__(self):
+        self.generation: Optional[int] = None
+        self._docs: List[Dict[str, Any]] = []
+        self._doc_labels: List[Set[str]] = []
+        self._names = _SubstringIndex()
+        self._name_docs: Dict[int, Set[int]] = defaultdict(set)
+        self._bare_names = _SubstringIndex()  # schema names without the publisher prefix
+        self._bare_name_docs: Dict[int, Set[int]] = defaultdict(set)
+        self._labels = _SubstringIndex()
+        self._label_docs: Dict[int, Set[int]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def build(self, option_sets: Iterable[Dict[str, Any]], generation: Optional[int] = None) -> None:
+        """Replace the indexed option sets"""
+        names, bare_names, labels = _SubstringIndex(), _SubstringIndex(), _SubstringIndex()
+        name_docs: Dict[int, Set[int]] = defaultdict(set)
+        bare_name_docs: Dict[int, Set[int]] = defaultdict(set)
+        label_docs: Dict[int, Set[int]] = defaultdict(set)
+        docs, doc_labels = [], []
+
+        for doc_id, option_set in enumerate(option_sets):
+            docs.append(option_set)
+            display_name = option_set.get("displayName", "").lower()
+            compact_name = re.sub(r"[^a-z0-9]", "", display_name)
+            schema_name = option_set.get("schemaName", "").lower()
+            for name in (display_name, compact_name, schema_name):
+                if name:
+                    name_docs[names.add(name)].add(doc_id)
+            bare_name = re.sub(r"[^a-z0-9]", "", _strip_prefix(schema_name))
+            if bare_name:
+                bare_name_docs[bare_names.add(bare_name)].add(doc_id)
+
+            label_set = {
+                opt["label"].lower() for opt in option_set.get("options", [])
+                if opt.get("label") and opt["label"].lower() not in NOISE_LABELS
+            }
+            doc_labels.append(label_set)
+            for label in label_set:
+                label_docs[labels.add(label)].add(doc_id)
+
+        with self._lock:
+            self._docs, self._doc_labels = docs, doc_labels
+            self._names, self._name_docs = names, name_docs
+            self._bare_names, self._bare_name_docs = bare_names, bare_name_docs
+            self._labels, self._label_docs = labels, label_docs
+            self.generation = generation
+
+    def _docs_for(self, value_ids: Iterable[int], postings: Dict[int, Set[int]]) -> Set[int]:
+        docs: Set[int] = set()
+        for value_id in value_ids:
+            docs |= postings.get(value_id, set())
+        return docs
+
+    def _name_matches(self, display_name: str) -> Dict[int, tuple]:
+        """doc id -> (score, reason, similarity) for a name query"""
+        search_name = display_name.lower()
+        matches: Dict[int, tuple] = {}
+
+        exact_id = self._names.ids.get(search_name)
+        if exact_id is not None:
+            for doc_id in self._name_docs[exact_id]:
+                matches[doc_id] = (100, "Exact name match", 1.0)
+
+        for doc_id in self._docs_for(self._names.containing(search_name), self._name_docs):
+            matches.setdefault(doc_id, (50, "Partial name match", 0.0))
+
+        search_words = [w for w in search_name.split() if w not in NOISE_NAME_WORDS and len(w) > 2]
+        for word in search_words:
+            for doc_id in self._docs_for(self._names.containing(word), self._name_docs):
+                matches.setdefault(doc_id, (25, "Word match", 0.0))
+
+        # Near-duplicate names that are not substrings of each other (typos, word order)
+        # Schema names are compared without the publisher prefix as well, on both sides, so
+        # "shifttype" finds appbase_shifttype and "other_shifttype" finds it too
+        compact = re.sub(r"[^a-z0-9]", "", search_name)
+        bare = re.sub(r"[^a-z0-9]", "", _strip_prefix(search_name))
+        for index, postings, term in (
+            (self._names, self._name_docs, compact),
+            (self._bare_names, self._bare_name_docs, bare)
+        ):
+            for value_id, similarity in index.similar(term, SIMILAR_NAME_THRESHOLD).items():
+                for doc_id in postings[value_id]:
+                    score, reason, best = matches.get(doc_id, (20, f"Similar name ({int(similarity * 100)}%)", 0.0))
+                    matches[doc_id] = (score, reason, max(best, similarity))
+
+        return matches
+
+    def _label_matches(self, search_terms: List[str]) -> Dict[int, int]:
+        """doc id -> number of search terms matching one of its labels exactly or partially"""
+        counts: Dict[int, int] = defaultdict(int)
+        for term in search_terms:
+            label_ids = set(self._labels.containing(term)) | self._labels.contained_in(term)
+            for doc_id in self._docs_for(label_ids, self._label_docs):
+                counts[doc_id] += 1
+        return counts
+
+    def search(
+        self,
+        display_name: Optional[str] = None,
+        option_labels: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        min_score: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank option sets similar to a name and/or a list of option labels
+
+        Args:
+            display_name: Name to match against display and schema names
+            option_labels: Option labels to match against existing labels
+            limit: Maximum number of results (top-k); all matches if None
+            min_score: Minimum matchScore to include
+
+        Returns:
+            Option sets with matchScore, matchReasons, labelSimilarity and nameSimilarity,
+            best first
+        """
+        with self._lock:
+            name_matches = self._name_matches(display_name) if display_name else {}
+
+            search_terms = [
+                label.lower() for label in (option_labels or [])
+                if label and label.lower() not in NOISE_LABELS
+            ]
+            label_counts = self._label_matches(search_terms) if search_terms else {}
+            search_set = set(search_terms)
+
+            results = []
+            for doc_id in set(name_matches) | set(label_counts):
+                match_score = 0
+                match_reasons = []
+                name_similarity = 0.0
+
+                if doc_id in name_matches:
+                    score, reason, name_similarity = name_matches[doc_id]
+                    match_score += score
+                    match_reasons.append(reason)
+
+                matched_count = label_counts.get(doc_id, 0)
+                if matched_count:
+                    overlap_percentage = matched_count / len(search_terms) * 100
+                    if overlap_percentage >= 75:
+                        match_score += 80
+                    elif overlap_percentage >= 50:
+                        match_score += 50
+                    elif overlap_percentage >= 25:
+                        match_score += 25
+                    else:
+                        match_score += 15
+
+                    if overlap_percentage >= 25:
+                        match_reasons.append(
+                            f"{int(overlap_percentage)}% option values match ({matched_count}/{len(search_terms)})"
+                        )
+                    else:
+                        match_reasons.append(f"Partial match ({matched_count}/{len(search_terms)} values)")
+
+                if match_score < min_score:
+                    continue
+
+                results.append((
+                    match_score,
+                    _jaccard(search_set, self._doc_labels[doc_id]),
+                    name_similarity,
+                    doc_id,
+                    match_reasons
+                ))
+
+            results.sort(key=lambda r: (-r[0], -r[1], -r[2], r[3]))
+            if limit is not None:
+                results = results[:limit]
+
+            return [
+                {
+                    **self._docs[doc_id],
+                    "matchScore": score,
+                    "matchReasons": reasons or ["Result"],
+                    "labelSimilarity": round(label_similarity, 3),
+                    "nameSimilarity": round(name_similarity, 3)
+                }
+                for score, label_similarity, name_similarity, doc_id, reasons in results
+            ]
@@ -0,0 +1,219 @@
+"""
+Package Inspector
+
+Reads what is inside a solution package without extracting it: the zip
+central directory, the manifest in solution.xml (version, managed flag,
+publisher, root components) and the number of components per section of
+customizations.xml. The XML entries are decompressed as a stream and parsed
+incrementally, and each component is discarded once counted.
+
+Inspections, including the package's SHA-256, are cached by (path, size,
+mtime). A package is read once, and later lookups and comparisons of the same
+files cost a stat per file.
+"""
+
+import hashlib
+import threading
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .workspace_index import file_stamp
+except ImportError:
+    from workspace_index import file_stamp
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Root component types of solution.xml (most common ones)
+ROOT_COMPONENT_TYPES = {
+    "1": "entities",
+    "9": "optionSets",
+    "20": "roles",
+    "29": "workflows",
+    "60": "forms",
+    "61": "webResources",
+    "62": "siteMaps",
+    "80": "appModules",
+    "300": "canvasApps",
+}
+
+# Fields compared between packages
+COMPARED_FIELDS = ("uniqueName", "version", "managed", "rootComponents", "components")
+
+
+class PackageError(ValueError):
+    """The file is not a readable solution package"""
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_manifest(package: zipfile.ZipFile) -> Dict[str, Any]:
+    """Manifest fields from solution.xml, parsed incrementally up to the end of SolutionManifest"""
+    manifest: Dict[str, Any] = {}
+    root_components: Dict[str, int] = {}
+    path: List[str] = []
+
+    with package.open("solution.xml") as stream:
+        for event, element in ET.iterparse(stream, events=("start", "end")):
+            tag = _local_name(element.tag)
+            if event == "start":
+                path.append(tag)
+                continue
+            parent = path[-2] if len(path) > 1 else ""
+            if parent == "SolutionManifest":
+                if tag in ("UniqueName", "Version", "Managed"):
+                    manifest[tag] = (element.text or "").strip()
+                elif tag == "LocalizedNames":
+                    names = element.findall("LocalizedName")
+                    english = next((n for n in names if n.get("languagecode") == "1033"), names[0] if names else None)
+                    if english is not None:
+                        manifest["displayName"] = english.get("description")
+            elif parent == "Publisher" and tag == "UniqueName":
+                manifest["publisher"] = (element.text or "").strip()
+            elif parent == "RootComponents" and tag == "RootComponent":
+                kind = ROOT_COMPONENT_TYPES.get(element.get("type"), f"type{element.get('type')}")
+                root_components[kind] = root_components.get(kind, 0) + 1
+            path.pop()
+            if tag == "SolutionManifest":
+                break
+
+    if "Version" not in manifest:
+        raise PackageError("solution.xml has no SolutionManifest version")
+    return {
+        "uniqueName": manifest.get("UniqueName"),
+        "displayName": manifest.get("displayName"),
+        "version": manifest["Version"],
+        "managed": manifest.get("Managed") == "1",
+        "publisher": manifest.get("publisher"),
+        "rootComponents": dict(sorted(root_components.items()))
+    }
+
+
+def _count_components(package: zipfile.ZipFile) -> Dict[str, int]:
+    """Number of components per non-empty section of customizations.xml (streamed)"""
+    counts: Dict[str, int] = {}
+    depth = 0
+    section = ""
+    with package.open("customizations.xml") as stream:
+        for event, element in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 2:
+                    section = _local_name(element.tag)
+                continue
+            if depth == 3:
+                counts[section] = counts.get(section, 0) + 1
+                element.clear()  # Components are only counted; free them as we go
+            elif depth == 2:
+                element.clear()
+            depth -= 1
+    counts.pop("Languages", None)
+    return dict(sorted(counts.items()))
+
+
+class PackageInspector:
+    """Cached manifest and component introspection of solution zip files"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, int], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def inspect(self, path: Path) -> Dict[str, Any]:
+        """
+        Version, managed flag, component counts, zip statistics and SHA-256 of a package
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            PackageError: If the file is not a solution zip
+        """
+        path = Path(path)
+        key = str(path.resolve())
+        stamp = file_stamp(path)
+        if stamp is None:
+            raise FileNotFoundError(f"Package not found: {path}")
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return cached[1]
+            self.stats["misses"] += 1
+
+        result = self._read(path, stamp)
+        with self._lock:
+            self._cache[key] = (stamp, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def _read(self, path: Path, stamp: Tuple[int, int]) -> Dict[str, Any]:
+        try:
+            with zipfile.ZipFile(path) as package:
+                entries = package.infolist()
+                names = {entry.filename for entry in entries}
+                missing = [name for name in ("solution.xml", "customizations.xml") if name not in names]
+                if missing:
+                    raise PackageError(f"{path.name} is not a solution package (missing {', '.join(missing)})")
+                manifest = _read_manifest(package)
+                components = _count_components(package)
+        except zipfile.BadZipFile as e:
+            raise PackageError(f"{path.name} is not a valid zip file: {e}") from e
+        except ET.ParseError as e:
+            raise PackageError(f"Malformed XML in {path.name}: {e}") from e
+
+        return {
+            "name": path.name,
+            "size": stamp[1],
+            "sha256": _sha256(path),
+            **manifest,
+            "components": components,
+            "entries": len(entries),
+            "uncompressedSize": sum(entry.file_size for entry in entries)
+        }
+
+    def compare(self, paths: List[Path]) -> Dict[str, Any]:
+        """
+        Inspect several packages and list the fields that differ between them
+
+        Packages that cannot be read are reported with an error instead of failing the comparison.
+        """
+        packages = []
+        for path in paths:
+            try:
+                packages.append(self.inspect(path))
+            except (FileNotFoundError, PackageError) as e:
+                packages.append({"name": Path(path).name, "error": str(e)})
+
+        readable = [p for p in packages if "error" not in p]
+        differences = {}
+        for field in COMPARED_FIELDS:
+            values = [p.get(field) for p in readable]
+            if any(value != values[0] for value in values[1:]):
+                differences[field] = {p["name"]: p.get(field) for p in readable}
+
+        duplicates: Dict[str, List[str]] = {}
+        for package in readable:
+            duplicates.setdefault(package["sha256"], []).append(package["name"])
+
+        return {
+            "packages": packages,
+            "differences": differences,
+            "identical": [names for names in duplicates.values() if len(names) > 1]
+        }
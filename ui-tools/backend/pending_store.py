@@ -0,0 +1,120 @@
+"""
+Pending Option Set Store
+
+Option sets created in Dataverse from the Choice Creator stay "pending" until
+the module is synced and their XML appears in the workspace. They are kept in
+a small SQLite database so concurrent adds and deletes are atomic (no
+read-modify-write of a JSON file), and they are reconciled from workspace
+index change events: when an option set file with a pending schema name is
+parsed, the pending entry is dropped.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_option_sets (
+    schema_name TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_pending_created ON pending_option_sets(created_at);
+"""
+
+
+class PendingOptionSetStore:
+    """SQLite store of option sets created in Dataverse but not yet synced to the workspace"""
+
+    def __init__(self, db_path: Path, legacy_path: Optional[Path] = None):
+        """
+        Open (or create) the store
+
+        Args:
+            db_path: SQLite database file
+            legacy_path: pending_optionsets.json written by older versions; imported
+                         once and removed
+        """
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        if legacy_path is not None and Path(legacy_path).exists():
+            self._import_legacy(Path(legacy_path))
+
+    def _import_legacy(self, path: Path) -> None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                items = json.load(f).get("pending", [])
+            for item in items:
+                if item.get("schemaName"):
+                    self.add(item)
+            path.unlink()
+            logger.info(f"Imported {len(items)} pending option set(s) from {path}")
+        except Exception as e:
+            logger.warning(f"Could not import pending option sets from {path}: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Pending option sets, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM pending_option_sets ORDER BY created_at, schema_name"
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def add(self, item: Dict[str, Any]) -> bool:
+        """
+        Add a pending option set
+
+        Returns:
+            False if an option set with the same schema name is already pending
+        """
+        item = {"createdAt": datetime.utcnow().isoformat(), **item, "isPending": True}
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO pending_option_sets (schema_name, created_at, data) VALUES (?, ?, ?)",
+                (item["schemaName"], item["createdAt"], json.dumps(item))
+            )
+        return cursor.rowcount == 1
+
+    def remove(self, schema_name: str) -> bool:
+        """Remove a pending option set; False if it was not pending"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM pending_option_sets WHERE schema_name = ?", (schema_name,))
+        return cursor.rowcount > 0
+
+    def clear(self) -> int:
+        """Remove every pending option set; returns the number removed"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM pending_option_sets")
+        return cursor.rowcount
+
+    def discard_synced(self, schema_names: Iterable[str]) -> int:
+        """Remove pending option sets that now exist in the workspace; returns the number removed"""
+        names = [(name,) for name in schema_names]
+        if not names:
+            return 0
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany("DELETE FROM pending_option_sets WHERE schema_name = ?", names)
+            removed = self._conn.total_changes - before
+        if removed:
+            logger.info(f"Removed {removed} synced option set(s) from the pending store")
+        return removed
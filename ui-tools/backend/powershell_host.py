@@ -0,0 +1,350 @@
+"""
+PowerShell Host Pool
+
+Keeps PowerShell worker processes (scripts/PowerShell-Worker.ps1) running
+between operations. Starting pwsh, dot-sourcing Util.ps1 and importing modules
+costs seconds, while the script itself often takes less. A worker pays this
+once. It then runs one UI script per command sent on stdin and streams the
+output back on stdout, ending each run with a marker line that carries the
+exit code.
+
+Workers are recycled after a fixed number of runs, and discarded when they
+exit, their script fails (non-zero exit code) or a run is abandoned
+(cancelled or the consumer went away). Idle
+workers are replaced in the background, so the next operation finds a warm
+one. When no worker can be started (no PowerShell, an event loop without
+subprocess support, or a worker that fails to load), `start` returns None
+and the caller spawns the script as a process of its own.
+"""
+
+import asyncio
+import codecs
+import json
+import logging
+import os
+import re
+import secrets
+import shutil
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 1024
+
+_NEWLINE = re.compile(r"\r\n|\r|\n")
+_PARAMETER = re.compile(r"^-([A-Za-z_]\w*)$")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+def script_parameters(args: Sequence[str]) -> Dict[str, Any]:
+    """
+    Named parameters of a script command line ("-Name", "value", "-Switch", ...)
+
+    A "-Name" followed by another "-Name" (or nothing) is a switch and becomes True.
+
+    Raises:
+        ValueError: If an argument is not preceded by a parameter name
+    """
+    parameters: Dict[str, Any] = {}
+    name = None
+    for arg in args:
+        match = _PARAMETER.match(arg) if isinstance(arg, str) else None
+        if match:
+            if name is not None:
+                parameters[name] = True
+            name = match.group(1)
+        elif name is not None:
+            parameters[name] = arg
+            name = None
+        else:
+            raise ValueError(f"Positional script argument not supported: {arg!r}")
+    if name is not None:
+        parameters[name] = True
+    return parameters
+
+
+class PowerShellWorker:
+    """One worker process and the undecoded rest of its output"""
+
+    def __init__(self, process: asyncio.subprocess.Process, marker: str):
+        self.process = process
+        self.marker = marker
+        self.uses = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def read_lines(self) -> Optional[List[str]]:
+        """Complete lines of the next output chunk (None at end of stream)"""
+        chunk = await self.process.stdout.read(READ_SIZE)
+        parts = _NEWLINE.split(self._partial + self._decoder.decode(chunk, not chunk))
+        self._partial = parts.pop()
+        if not chunk:
+            if self._partial:
+                parts.append(self._partial)
+                self._partial = ""
+            return [line.rstrip() for line in parts] or None
+        return [line.rstrip() for line in parts]
+
+    async def send(self, command: Dict[str, Any]) -> None:
+        self.process.stdin.write((json.dumps(command) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+
+    async def close(self, timeout: float = 2.0) -> None:
+        """Close stdin so the worker exits; kill it if it does not"""
+        if not self.alive:
+            return
+        try:
+            self.process.stdin.close()
+            await asyncio.wait_for(self.process.wait(), timeout)
+        except (asyncio.TimeoutError, OSError):
+            try:
+                self.process.kill()
+                await self.process.wait()
+            except ProcessLookupError:
+                pass
+
+
+class HostRun:
+    """A script running on a worker; iterate `output()` and then read `exit_code`"""
+
+    def __init__(self, worker: PowerShellWorker, command_id: str):
+        self.worker = worker
+        self.command_id = command_id
+        self.exit_code: Optional[int] = None
+        self.done = False
+
+    @property
+    def process(self) -> asyncio.subprocess.Process:
+        """The worker process (terminating it cancels the run)"""
+        return self.worker.process
+
+    async def output(self) -> AsyncIterator[List[str]]:
+        """
+        Batches of output lines until the script's end marker
+
+        If the worker exits first (it crashed or was terminated), the run ends with the
+        worker's exit code, as a script process of its own would.
+        """
+        prefix = f"{self.worker.marker} {self.command_id} "
+        while True:
+            lines = await self.worker.read_lines()
+            if lines is None:
+                self.exit_code = await self.worker.process.wait()
+                self.done = True
+                return
+            for index, line in enumerate(lines):
+                if line.startswith(prefix):
+                    if index:
+                        yield lines[:index]
+                    try:
+                        self.exit_code = int(line[len(prefix):])
+                    except ValueError:
+                        self.exit_code = 1
+                    self.done = True
+                    return
+            if lines:
+                yield lines
+
+
+class PowerShellHostPool:
+    """Warm PowerShell workers that run UI scripts without starting a process per operation"""
+
+    def __init__(self, worker_script: Path, cwd: Path, size: Optional[int] = None,
+                 max_uses: Optional[int] = None, startup_timeout: float = 60.0):
+        """
+        Args:
+            worker_script: Path to PowerShell-Worker.ps1
+            cwd: Working directory of the workers (the project root)
+            size: Idle workers kept warm (POWERSHELL_HOST_WORKERS, default 2; 0 disables the pool)
+            max_uses: Script runs after which a worker is replaced (POWERSHELL_HOST_MAX_USES, default 20)
+            startup_timeout: Seconds a new worker may take to load Util.ps1
+        """
+        self.worker_script = Path(worker_script)
+        self.cwd = Path(cwd)
+        self.size = _env_int("POWERSHELL_HOST_WORKERS", 2) if size is None else size
+        self.max_uses = max(1, _env_int("POWERSHELL_HOST_MAX_USES", 20) if max_uses is None else max_uses)
+        self.startup_timeout = startup_timeout
+
+        self.executable = shutil.which("pwsh") or shutil.which("powershell")
+        self.disabled_reason: Optional[str] = None
+        if self.size == 0:
+            self.disabled_reason = "disabled by POWERSHELL_HOST_WORKERS=0"
+        elif not self.executable:
+            self.disabled_reason = "PowerShell not found"
+        elif not self.worker_script.exists():
+            self.disabled_reason = f"{self.worker_script.name} not found"
+
+        self._idle: List[PowerShellWorker] = []
+        self._starting = 0
+        self._tasks: set = set()
+        self._closed = False
+        self.stats = {"warm": 0, "cold": 0, "started": 0, "recycled": 0, "discarded": 0}
+
+    @property
+    def available(self) -> bool:
+        return self.disabled_reason is None and not self._closed
+
+    def _command(self, marker: str) -> List[str]:
+        return [self.executable, "-NoProfile", "-NoLogo", "-ExecutionPolicy", "Bypass",
+                "-File", str(self.worker_script), "-Marker", marker]
+
+    def _disable(self, reason: str) -> None:
+        if self.disabled_reason is None:
+            self.disabled_reason = reason
+            logger.warning(f"PowerShell host pool disabled, running scripts as processes: {reason}")
+
+    async def _spawn(self) -> Optional[PowerShellWorker]:
+        """Start a worker and wait until it has loaded Util.ps1 (None if it cannot be started)"""
+        marker = f"##pshost-{secrets.token_hex(8)}"
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self._command(marker),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,  # Native commands write errors to the worker's stderr
+                cwd=str(self.cwd)
+            )
+        except NotImplementedError:
+            self._disable("the event loop does not support subprocesses")
+            return None
+        except OSError as e:
+            self._disable(str(e))
+            return None
+
+        worker = PowerShellWorker(process, marker)
+        output: List[str] = []
+
+        async def wait_ready() -> bool:
+            while True:
+                lines = await worker.read_lines()
+                if lines is None:
+                    return False
+                if f"{marker} ready" in lines:
+                    return True
+                output.extend(lines)
+
+        try:
+            if await asyncio.wait_for(wait_ready(), self.startup_timeout):
+                self.stats["started"] += 1
+                return worker
+        except asyncio.TimeoutError:
+            output.append(f"(no ready signal after {self.startup_timeout:.0f}s)")
+        await worker.close(timeout=0)
+        self._disable("worker did not start: " + " | ".join(line for line in output[-5:] if line))
+        return None
+
+    async def _replenish(self) -> None:
+        while self.available and len(self._idle) + self._starting < self.size:
+            self._starting += 1
+            try:
+                worker = await self._spawn()
+            finally:
+                self._starting -= 1
+            if worker is None:
+                return
+            if self._closed or len(self._idle) >= self.size:
+                # Closed, or finished runs refilled the pool while this worker started
+                await worker.close()
+                return
+            self._idle.append(worker)
+
+    def warm_up(self) -> None:
+        """Start the idle workers in the background"""
+        if not self.available:
+            return
+        task = asyncio.get_running_loop().create_task(self._replenish())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def start(self, script_path: str, args: Sequence[str]) -> Optional[HostRun]:
+        """
+        Run a script on a worker (an idle one, or a new one if all are busy)
+
+        Returns:
+            The run, or None if the pool is unavailable or the arguments cannot be
+            passed as named parameters (run the script as a process instead)
+        """
+        if not self.available:
+            return None
+        try:
+            parameters = script_parameters(args)
+        except ValueError:
+            return None
+
+        worker = None
+        while self._idle:
+            candidate = self._idle.pop()
+            if candidate.alive:
+                worker = candidate
+                self.stats["warm"] += 1
+                break
+            self.stats["discarded"] += 1
+        if worker is None:
+            worker = await self._spawn()
+            if worker is None:
+                return None
+            self.stats["cold"] += 1
+        self.warm_up()
+
+        command_id = secrets.token_hex(8)
+        worker.uses += 1
+        try:
+            await worker.send({"id": command_id, "script": str(script_path), "parameters": parameters})
+        except (OSError, ConnectionError) as e:
+            logger.warning(f"PowerShell worker {worker.process.pid} did not accept a command: {e}")
+            self.stats["discarded"] += 1
+            await worker.close(timeout=0)
+            return None
+        return HostRun(worker, command_id)
+
+    async def finish(self, run: HostRun) -> None:
+        """
+        Return a run's worker to the pool
+
+        Workers of unfinished runs (the consumer stopped reading) are terminated, since
+        the script is still running in them. Workers whose script failed are replaced as
+        well, so state a failed script left behind (globals, imported modules, preference
+        variables) never reaches the next operation. So are workers that reached max_uses.
+        """
+        worker = run.worker
+        if not run.done or not worker.alive:
+            self.stats["discarded"] += 1
+            await worker.close(timeout=0)
+        elif run.exit_code != 0:
+            self.stats["discarded"] += 1
+            await worker.close()
+        elif worker.uses >= self.max_uses or self._closed or len(self._idle) >= self.size:
+            self.stats["recycled"] += 1
+            await worker.close()
+        else:
+            self._idle.append(worker)
+        self.warm_up()
+
+    async def close(self) -> None:
+        """Stop all idle workers (running scripts end with their consumers)"""
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(worker.close() for worker in idle), return_exceptions=True)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.available,
+            "disabledReason": self.disabled_reason,
+            "idle": len(self._idle),
+            "size": self.size,
+            "maxUses": self.max_uses,
+            **self.stats
+        }
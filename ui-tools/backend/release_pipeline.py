@@ -0,0 +1,317 @@
+"""
+Release Pipeline
+
+Runs a module release (Full-Release-UI.ps1) as a graph of steps instead of one
+blocking script call. Every step is a separate script run; steps whose
+prerequisites are done run concurrently (the CHANGELOG update does not wait for
+the version bump and sync), and the output of running steps is interleaved into
+one event stream with every line tagged with its step.
+
+Completed steps are recorded per module and version. Running the same release
+again resumes at the step that failed instead of repeating the version bump,
+build or tag.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from . import sse
+except ImportError:
+    import sse
+
+logger = logging.getLogger(__name__)
+
+STEP_PENDING = "pending"
+STEP_RUNNING = "running"
+STEP_SUCCEEDED = "success"
+STEP_FAILED = "error"
+STEP_SKIPPED = "skipped"
+
+# Step key -> (label, steps it has to run after). Labels match the script's step results.
+RELEASE_STEPS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "updateVersion": ("Update version and sync", ()),
+    "updateChangelog": ("Update CHANGELOG.md", ()),
+    "buildPackages": ("Build solution packages", ("updateVersion",)),
+    "gitCommit": ("Git commit", ("updateVersion", "updateChangelog", "buildPackages")),
+    "gitTag": ("Create git tag", ("gitCommit",)),
+    "githubRelease": ("Create GitHub release", ("gitTag", "buildPackages")),
+}
+
+
+def step_dependencies(enabled: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Ordering constraints between the enabled steps
+
+    Steps that are not script steps (e.g. the UI-only release notes checkpoint) are
+    ignored. Ordering through a disabled step is kept: with the build disabled, the
+    commit still runs after the version bump.
+    """
+    selected = [step for step in RELEASE_STEPS if step in set(enabled)]
+
+    def ancestors(step: str) -> set:
+        result = set()
+        for dep in RELEASE_STEPS[step][1]:
+            result.add(dep)
+            result |= ancestors(dep)
+        return result
+
+    return {step: [dep for dep in selected if dep in ancestors(step)] for step in selected}
+
+
+def _parse_result(line: str) -> Optional[Dict[str, Any]]:
+    """The JSON result object the release script prints last (None for other lines)"""
+    text = line.strip()
+    if not (text.startswith("{") and text.endswith("}")):
+        return None
+    try:
+        result = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(result, dict) and "success" in result and "steps" in result:
+        return result
+    return None
+
+
+class ReleaseStateStore:
+    """Completed release steps per (module, version), kept as small JSON files"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, module_path: str, version: str) -> Path:
+        name = re.sub(r"[^A-Za-z0-9._-]+", "_", f"{module_path}-{version}")
+        return self.directory / f"{name}.json"
+
+    def load(self, module_path: str, version: str) -> Dict[str, Any]:
+        """Recorded state ({"steps": {step: {...}}, "githubReleaseUrl": ...}); empty if none"""
+        try:
+            with open(self._path(module_path, version), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {"steps": {}}
+        state.setdefault("steps", {})
+        return state
+
+    def save(self, module_path: str, version: str, state: Dict[str, Any]) -> None:
+        path = self._path(module_path, version)
+        tmp_path = path.with_suffix(".json.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"modulePath": module_path, "version": version, **state}, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save release state for {module_path} v{version}: {e}")
+
+    def clear(self, module_path: str, version: str) -> None:
+        try:
+            self._path(module_path, version).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ReleasePipeline:
+    """
+    Runs the enabled release steps of one module version.
+
+    A step starts as soon as the steps it depends on have succeeded (or were
+    completed by an earlier run). When a step fails, the steps depending on it are
+    skipped while independent steps finish; the completed steps are kept so the
+    next run starts at the failed step.
+    """
+
+    def __init__(
+        self,
+        module_path: str,
+        version: str,
+        enabled_steps: Iterable[str],
+        run_step: Callable[[str], AsyncIterable[str]],
+        store: ReleaseStateStore,
+        resume: bool = True
+    ):
+        """
+        Args:
+            module_path: Module path relative to the project root (category/module)
+            version: Version being released
+            enabled_steps: Step keys selected in the Release Manager
+            run_step: Called with a step key; returns the SSE frames of the script run
+            store: Where completed steps are recorded
+            resume: Skip steps completed by an earlier run of this release
+        """
+        self.module_path = module_path
+        self.version = version
+        self.dependencies = step_dependencies(enabled_steps)
+        self.run_step = run_step
+        self.store = store
+
+        self.state = store.load(module_path, version) if resume else {"steps": {}}
+        self.status: Dict[str, str] = {step: STEP_PENDING for step in self.dependencies}
+        self.messages: Dict[str, str] = {}
+        self.durations: Dict[str, float] = {}
+
+    def _step_event(self, step: str, **extra: Any) -> str:
+        return sse.event(
+            "release-step",
+            step=step,
+            label=RELEASE_STEPS[step][0],
+            status=self.status[step],
+            message=self.messages.get(step, ""),
+            **extra
+        )
+
+    def _ready(self) -> List[str]:
+        return [
+            step for step, state in self.status.items()
+            if state == STEP_PENDING and all(self.status[dep] == STEP_SUCCEEDED for dep in self.dependencies[step])
+        ]
+
+    def _skip_dependents(self, failed: str) -> List[str]:
+        skipped = []
+        for step, deps in self.dependencies.items():
+            if self.status[step] == STEP_PENDING and failed in deps:
+                self.status[step] = STEP_SKIPPED
+                self.messages[step] = f"Skipped ({RELEASE_STEPS[failed][0]} failed)"
+                skipped.append(step)
+        return skipped
+
+    async def _run(self, step: str, output: asyncio.Queue) -> None:
+        """Run one step, forwarding its output tagged with the step name"""
+        tag = f"[{step}]"
+        exit_code = None
+        error = None
+        result = None
+        started = time.monotonic()
+        try:
+            async for frame in self.run_step(step):
+                tagged = []
+                for line in frame.split("\n"):
+                    if not line.startswith("data: "):
+                        continue
+                    try:
+                        event = json.loads(line[6:])
+                    except ValueError:
+                        continue
+                    kind = event.get("type")
+                    if kind == "complete":
+                        exit_code = event.get("exitCode")
+                    elif kind == "error":
+                        error = event.get("message") or "Unknown error"
+                        tagged.append(sse.output(f"{tag} ✗ Error: {error}"))
+                    elif kind == "output":
+                        parsed = _parse_result(event.get("line", ""))
+                        if parsed is not None:
+                            result = parsed
+                        else:
+                            tagged.append(sse.output(f"{tag} {event.get('line', '')}"))
+                if tagged:
+                    await output.put("".join(tagged))
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        # The script reports failures in its result object (it exits with 0 either way)
+        message = ""
+        if result is not None:
+            entries = [s for s in result.get("steps", []) if s.get("status") != "running"]
+            if entries:
+                message = entries[-1].get("message", "")
+            if not result.get("success") and error is None:
+                error = result.get("error") or message or "Step failed"
+            if result.get("github_release_url"):
+                self.state["githubReleaseUrl"] = result["github_release_url"]
+        if error is None and exit_code != 0:
+            error = f"Exit code {exit_code}"
+
+        self.durations[step] = time.monotonic() - started
+        await output.put((step, error is None, error or message))
+
+    async def run(self) -> AsyncIterator[str]:
+        """Run the release, yielding SSE frames; ends with a release-result and a complete event"""
+        started = time.monotonic()
+        yield sse.output(f"=== Release {self.module_path} v{self.version} ===")
+
+        done_before = [step for step in self.dependencies if step in self.state["steps"]]
+        for step in done_before:
+            self.status[step] = STEP_SUCCEEDED
+            self.messages[step] = self.state["steps"][step].get("message") or "Completed in a previous run"
+        if done_before:
+            yield sse.output(f"Resuming: {', '.join(done_before)} completed in a previous run")
+        for step in self.dependencies:
+            yield self._step_event(step)
+
+        output: asyncio.Queue = asyncio.Queue(maxsize=64)
+        tasks: Dict[str, asyncio.Task] = {}
+        try:
+            while True:
+                for step in self._ready():
+                    self.status[step] = STEP_RUNNING
+                    tasks[step] = asyncio.create_task(self._run(step, output))
+                    yield self._step_event(step)
+
+                if not tasks:
+                    break
+
+                item = await output.get()
+                if isinstance(item, str):
+                    yield item
+                    continue
+
+                step, succeeded, message = item
+                del tasks[step]
+                elapsed = self.durations[step]
+                self.status[step] = STEP_SUCCEEDED if succeeded else STEP_FAILED
+                self.messages[step] = message
+                yield self._step_event(step, elapsed=round(elapsed, 1))
+
+                if succeeded:
+                    self.state["steps"][step] = {"message": message, "completedAt": datetime.now().isoformat()}
+                    self.store.save(self.module_path, self.version, self.state)
+                    yield sse.output(f"✓ {RELEASE_STEPS[step][0]} ({elapsed:.0f}s)")
+                else:
+                    yield sse.output(f"✗ {RELEASE_STEPS[step][0]} failed: {message}")
+                    for skipped in self._skip_dependents(step):
+                        yield self._step_event(skipped)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        failed = [step for step, state in self.status.items() if state == STEP_FAILED]
+        success = not failed and all(state == STEP_SUCCEEDED for state in self.status.values())
+        if success:
+            # Nothing left to resume; running this version again starts from scratch
+            self.store.clear(self.module_path, self.version)
+
+        total_elapsed = time.monotonic() - started
+        sequential = sum(self.durations.values())
+        yield sse.output("")
+        if success:
+            yield sse.output(f"=== Release Complete ({total_elapsed:.0f}s, sequential steps would take {sequential:.0f}s) ===")
+        else:
+            yield sse.output("=== Release Failed: run the release again to resume at the failed step ===")
+
+        logger.info(
+            f"Release {self.module_path} v{self.version} {'completed' if success else 'failed'} "
+            f"in {total_elapsed:.0f}s (sequential: {sequential:.0f}s)"
+        )
+        result: Dict[str, Any] = {
+            "success": success,
+            "steps": [
+                {"step": step, "label": RELEASE_STEPS[step][0], "status": self.status[step],
+                 "message": self.messages.get(step, "")}
+                for step in self.dependencies
+            ],
+            "github_release_url": self.state.get("githubReleaseUrl", "")
+        }
+        if failed:
+            result["error"] = self.messages.get(failed[0]) or "Release failed"
+        yield sse.event("release-result", **result)
+        yield sse.event("complete", exitCode=0 if success else 1)
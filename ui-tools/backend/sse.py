@@ -0,0 +1,118 @@
+"""
+Server-Sent Events
+
+Shared encoder for the event streams sent to the frontend. Events are JSON
+objects in `data:` lines (serialized with orjson when it is installed), so
+messages containing quotes, backslashes or newlines always produce valid
+events. `coalesce` merges frames produced in quick succession into one write
+and `HEARTBEAT` is a comment frame that keeps idle connections open.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library encoder is used instead
+    orjson = None
+
+# Comment frame ignored by EventSource and the frontend parsers
+HEARTBEAT = ": heartbeat\n\n"
+
+# Frames arriving within this many seconds of the first are sent together...
+COALESCE_WINDOW = 0.025
+# ...up to this many bytes per write
+COALESCE_MAX_BYTES = 64 * 1024
+
+
+def dumps(obj: Any) -> str:
+    """Serialize an event payload to compact JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def event(event_type: str, **fields: Any) -> str:
+    """A single event frame, e.g. event("complete", exitCode=0)"""
+    return f"data: {dumps({'type': event_type, **fields})}\n\n"
+
+
+def output(line: str) -> str:
+    """An output line event (blank lines included)"""
+    return f"data: {dumps({'type': 'output', 'line': line})}\n\n"
+
+
+def output_frame(lines: Iterable[str]) -> str:
+    """One frame with an output event per non-blank line (empty string if there are none)"""
+    return "".join(f"data: {dumps({'type': 'output', 'line': line})}\n\n" for line in lines if line)
+
+
+def parse(frame: str) -> List[Dict[str, Any]]:
+    """Events in a frame (or several coalesced frames); comments and invalid data are skipped"""
+    events = []
+    for line in frame.split("\n"):
+        if line.startswith("data: "):
+            try:
+                events.append(json.loads(line[6:]))
+            except ValueError:
+                continue
+    return events
+
+
+async def coalesce(
+    frames: AsyncIterable[str],
+    window: float = COALESCE_WINDOW,
+    max_bytes: int = COALESCE_MAX_BYTES
+) -> AsyncIterator[str]:
+    """
+    Merge frames that follow each other within a time window into single writes.
+
+    The first frame of a batch is held for at most `window` seconds while later
+    frames are collected, so a producer emitting one event per line costs one
+    write per window instead of one per line. Closing the coalescer (or
+    cancelling its consumer) closes the source as well.
+    """
+    iterator = frames.__aiter__()
+    loop = asyncio.get_running_loop()
+    pending = None
+    exhausted = False
+    try:
+        batch, size, deadline = [], 0, 0.0
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = max(0.0, deadline - loop.time()) if batch else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+            if done:
+                pending = None
+                try:
+                    frame = done.pop().result()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                except Exception:
+                    exhausted = True
+                    if batch:
+                        yield "".join(batch)
+                    raise
+                if not batch:
+                    deadline = loop.time() + window
+                batch.append(frame)
+                size += len(frame)
+                if size < max_bytes:
+                    continue
+
+            # Window elapsed (the next frame is still being produced) or batch full
+            yield "".join(batch)
+            batch, size = [], 0
+
+        if batch:
+            yield "".join(batch)
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.wait({pending})
+        elif not exhausted and hasattr(iterator, "aclose"):
+            await iterator.aclose()
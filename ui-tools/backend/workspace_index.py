@@ -0,0 +1,769 @@
+"""
+Workspace Index
+
+In-memory index of the modules, solutions and global option sets in the
+repository. The index is built once and then kept current incrementally:
+filesystem events (watchdog, when installed) mark changed paths dirty and
+only those files are re-parsed on the next read. Without watchdog the index
+re-verifies file stamps at most once per poll interval.
+
+Parsed files are cached by (mtime, size) stamp, so a structural rescan after
+modules are added or removed only re-parses files that actually changed. With
+a WorkspaceCatalog attached, the parse cache is persisted to SQLite so a cold
+start only re-parses files changed since the last run, and filtered queries
+run as indexed SQL. When many files need parsing at once (a cold scan), they
+are parsed per module in a process pool so every core is used.
+"""
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+import threading
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog is optional; fall back to stamp polling
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+EXCLUDE_FOLDERS = {
+    "__pycache__", ".scripts", ".config", ".git", ".vscode", "bin", "obj",
+    "ui-tools", "releases", "node_modules"
+}
+
+Stamp = Tuple[int, int]
+
+
+def file_stamp(path: Path) -> Optional[Stamp]:
+    """(mtime_ns, size) of a file, or None if it does not exist"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def normalize_version(version: Optional[str]) -> str:
+    """Normalize a solution version to four parts (1.0.0.0 if missing)"""
+    if not version:
+        return "1.0.0.0"
+    parts = version.strip().split(".")
+    while len(parts) < 4:
+        parts.append("0")
+    return ".".join(parts[:4])
+
+
+def parse_solution_xml(path: Path) -> Dict[str, Any]:
+    """
+    Parse the solution details used by the UI from a Solution.xml file
+
+    Returns:
+        Dictionary with uniqueName, localizedName, displayName (1033, without the
+        "App Base - " prefix), version, prefix and optionValuePrefix
+    """
+    root = ET.parse(path).getroot()
+    manifest = root.find(".//SolutionManifest")
+    if manifest is None:
+        manifest = root
+
+    unique_name = manifest.find("UniqueName")
+    localized_name = manifest.find(".//LocalizedName")
+
+    display_name = None
+    localized_1033 = root.find(".//LocalizedName[@languagecode='1033']")
+    if localized_1033 is not None and localized_1033.get("description"):
+        display_name = localized_1033.get("description").strip()
+        if display_name.startswith("App Base - "):
+            display_name = display_name[11:]
+
+    version_elem = root.find(".//Version")
+    publisher = manifest.find(".//Publisher")
+    prefix = option_prefix = ""
+    if publisher is not None:
+        prefix_elem = publisher.find("CustomizationPrefix")
+        option_prefix_elem = publisher.find("CustomizationOptionValuePrefix")
+        prefix = prefix_elem.text if prefix_elem is not None else ""
+        option_prefix = option_prefix_elem.text if option_prefix_elem is not None else ""
+
+    return {
+        "uniqueName": unique_name.text if unique_name is not None else "",
+        "localizedName": localized_name.get("description") if localized_name is not None else "",
+        "displayName": display_name,
+        "version": normalize_version(version_elem.text if version_elem is not None else None),
+        "prefix": prefix or "",
+        "optionValuePrefix": option_prefix or ""
+    }
+
+
+def parse_optionset_xml(path: Path) -> Dict[str, Any]:
+    """
+    Parse a global option set definition (src/OptionSets/*.xml)
+
+    Returns:
+        Dictionary with schemaName, displayName and options (label is "" for unlabelled options)
+    """
+    root = ET.parse(path).getroot()
+
+    options = []
+    for option_elem in root.findall(".//option"):
+        label_elem = option_elem.find(".//label")
+        label = label_elem.get("description", "") if label_elem is not None else ""
+        options.append({"value": option_elem.get("value", ""), "label": label})
+
+    return {
+        "schemaName": root.get("Name", ""),
+        "displayName": root.get("localizedName", ""),
+        "options": options
+    }
+
+
+def _parse_module_files(files: List[Tuple[str, str]]) -> List[Tuple[str, Optional[Stamp], Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Parse the XML files of one module (runs in a worker process)
+
+    Args:
+        files: List of (path, kind) where kind is "solution" or "optionset"
+
+    Returns:
+        List of (path, stamp, parsed data, error)
+    """
+    results = []
+    for raw_path, kind in files:
+        path = Path(raw_path)
+        stamp = file_stamp(path)
+        if stamp is None:
+            results.append((raw_path, None, None, None))
+            continue
+        try:
+            parser = parse_solution_xml if kind == "solution" else parse_optionset_xml
+            results.append((raw_path, stamp, parser(path), None))
+        except Exception as e:
+            results.append((raw_path, stamp, None, str(e)))
+    return results
+
+
+class _ModuleEntry:
+    """A module folder (directory containing a .cdsproj) and its parsed files"""
+
+    def __init__(self, path: Path, project_root: Path):
+        self.path = path
+        self.name = path.name
+        relative = path.relative_to(project_root)
+        self.relative_path = str(relative)
+        # Parent folders relative to the project root ("category" or "category/sub")
+        self.category = "/".join(relative.parts[:-1]) or path.parent.name
+        self.top_category = relative.parts[0] if len(relative.parts) > 1 else path.parent.name
+        self.solution_xml = path / "src" / "Other" / "Solution.xml"
+        self.optionsets_dir = path / "src" / "OptionSets"
+        self.solution: Optional[Dict[str, Any]] = None
+        self.option_sets: Dict[Path, Dict[str, Any]] = {}
+
+
+class _WatchHandler(FileSystemEventHandler):
+    """Forwards relevant filesystem events to the index as dirty paths"""
+
+    def __init__(self, index: "WorkspaceIndex"):
+        super().__init__()
+        self.index = index
+
+    def on_any_event(self, event) -> None:
+        if event.event_type in ("opened", "closed", "closed_no_write"):
+            return
+        paths = [event.src_path]
+        if getattr(event, "dest_path", None):
+            paths.append(event.dest_path)
+        self.index.mark_dirty(paths, is_directory=event.is_directory)
+
+
+class WorkspaceIndex:
+    """
+    In-memory index of modules, solutions and option sets under a project root.
+
+    All read methods are thread safe and return copies, so callers may freely
+    decorate the returned dictionaries.
+    """
+
+    def __init__(
+        self,
+        project_root: Path,
+        poll_interval: float = 2.0,
+        catalog: Optional[Any] = None,
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = 64
+    ):
+        """
+        Initialize the index (call build() or start() before reading)
+
+        Args:
+            project_root: Repository root containing category/module folders
+            poll_interval: Seconds between stamp verifications when watchdog is unavailable
+            catalog: Optional WorkspaceCatalog persisting parse results between runs
+            max_workers: Worker processes for parallel parsing (defaults to the CPU count)
+            parallel_threshold: Minimum number of files to parse before using worker processes
+        """
+        self.project_root = Path(project_root).resolve()
+        self.poll_interval = poll_interval
+        self.catalog = catalog
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self._modules: Dict[Path, _ModuleEntry] = {}
+        self._parsed: Dict[Path, Tuple[Stamp, Optional[Dict[str, Any]]]] = {}
+        self._dirty: Set[Path] = set()
+        self._dirty_modules: Set[Path] = set()
+        self._changed: Set[Path] = set()
+        # Option set files parsed since listeners were last notified (None: report all)
+        self._unreported: Optional[Set[Path]] = None
+        self._option_set_listeners: List[Callable[[Set[str]], None]] = []
+        self._structure_dirty = True
+        # Incremented whenever indexed content changes (lets derived indexes detect staleness)
+        self.generation = 0
+        self._fingerprint: Optional[Tuple[int, str]] = None
+        self._last_verified = 0.0
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._observer = None
+        self._build_thread: Optional[threading.Thread] = None
+        self.stats = {"builds": 0, "parsed": 0, "refreshes": 0, "events": 0}
+        # Optional callback(kind, seconds, files parsed) for build/rescan/incremental scans
+        self.on_scan: Optional[Callable[[str, float, int], None]] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def watching(self) -> bool:
+        return self._observer is not None
+
+    def start(self, background: bool = True) -> None:
+        """Build the index and start watching the project root for changes"""
+        if Observer is not None and self._observer is None:
+            try:
+                observer = Observer()
+                observer.schedule(_WatchHandler(self), str(self.project_root), recursive=True)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+            except Exception as e:
+                logger.warning(f"Filesystem watcher unavailable ({e}); falling back to polling")
+
+        if background:
+            self._build_thread = threading.Thread(target=self.build, name="workspace-index-build", daemon=True)
+            self._build_thread.start()
+        else:
+            self.build()
+
+    def stop(self) -> None:
+        """Stop the filesystem watcher"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+
+    def build(self) -> None:
+        """(Re)build the index from disk, reusing parsed files whose stamps are unchanged"""
+        started = time.perf_counter()
+        with self._lock:
+            parsed_before = self.stats["parsed"]
+            if self.catalog is not None and not self._parsed:
+                try:
+                    self._parsed = self.catalog.load_parsed()
+                except Exception as e:
+                    logger.warning(f"Could not load workspace catalog: {e}")
+            self._rescan_structure()
+            self._dirty.clear()
+            self._dirty_modules.clear()
+            self._last_verified = time.monotonic()
+            self.stats["builds"] += 1
+            parsed = self.stats["parsed"] - parsed_before
+        self._ready.set()
+        self._report_scan("build", time.perf_counter() - started, parsed)
+        logger.info(
+            f"Workspace index built in {time.perf_counter() - started:.2f}s: "
+            f"{len(self._modules)} modules, {sum(len(m.option_sets) for m in self._modules.values())} option sets"
+        )
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def _is_excluded(self, path: Path) -> bool:
+        try:
+            parts = path.relative_to(self.project_root).parts
+        except ValueError:
+            return True
+        return any(part in EXCLUDE_FOLDERS for part in parts)
+
+    def mark_dirty(self, paths: Iterable[str], is_directory: bool = False) -> None:
+        """
+        Mark paths as changed; they are re-read on the next access.
+
+        Args:
+            paths: Changed file or directory paths
+            is_directory: Whether the paths are directories (structure may have changed)
+        """
+        with self._lock:
+            for raw in paths:
+                path = Path(os.fsdecode(raw))
+                if self._is_excluded(path):
+                    continue
+                self.stats["events"] += 1
+
+                if path.suffix.lower() == ".cdsproj":
+                    self._structure_dirty = True
+                    continue
+
+                module = self._owning_module(path)
+                if module is None or path == module.path:
+                    # Category or module folders may have been added, removed or renamed
+                    if is_directory or module is not None:
+                        self._structure_dirty = True
+                elif is_directory:
+                    if path in (module.optionsets_dir, module.solution_xml.parent, module.path / "src"):
+                        self._dirty_modules.add(module.path)
+                elif path.suffix.lower() == ".xml":
+                    self._dirty.add(path)
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """Force a path (or the whole workspace, if None) to be re-read on next access"""
+        with self._lock:
+            if path is None:
+                self._structure_dirty = True
+            else:
+                self.mark_dirty([str(path)], is_directory=Path(path).is_dir())
+
+    def _owning_module(self, path: Path) -> Optional[_ModuleEntry]:
+        for parent in (path,) + tuple(path.parents):
+            module = self._modules.get(parent)
+            if module is not None:
+                return module
+            if parent == self.project_root:
+                break
+        return None
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    def _load(self, path: Path, parser: Callable[[Path], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Parse a file, or return the cached result if its stamp is unchanged"""
+        stamp = file_stamp(path)
+        if stamp is None:
+            if self._parsed.pop(path, None) is not None:
+                self._changed.add(path)
+                self.generation += 1
+            return None
+
+        cached = self._parsed.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        try:
+            data = parser(path)
+        except Exception as e:
+            logger.warning(f"Error parsing {path}: {e}")
+            data = None
+        self._parsed[path] = (stamp, data)
+        self._changed.add(path)
+        if self._unreported is not None:
+            self._unreported.add(path)
+        self.generation += 1
+        self.stats["parsed"] += 1
+        return data
+
+    def _find_module_dirs(self) -> List[Path]:
+        """Module folders: directories containing a .cdsproj (nested folders are searched)"""
+        found = []
+
+        def walk(directory: Path) -> None:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                return
+            if any(e.is_file() and e.name.endswith(".cdsproj") for e in entries):
+                found.append(directory)
+                return
+            for entry in entries:
+                if entry.is_dir() and entry.name not in EXCLUDE_FOLDERS:
+                    walk(Path(entry.path))
+
+        for entry in os.scandir(self.project_root):
+            if entry.is_dir() and entry.name not in EXCLUDE_FOLDERS:
+                walk(Path(entry.path))
+        return found
+
+    def _refresh_module(self, module: _ModuleEntry) -> None:
+        module.solution = self._load(module.solution_xml, parse_solution_xml)
+        option_sets = {}
+        if module.optionsets_dir.is_dir():
+            for xml_file in module.optionsets_dir.glob("*.xml"):
+                data = self._load(xml_file, parse_optionset_xml)
+                if data is not None:
+                    option_sets[xml_file] = data
+        module.option_sets = option_sets
+
+    def _prefetch_parallel(self, module_dirs: List[Path]) -> None:
+        """Parse every stale file of the given modules in worker processes (one task per module)"""
+        tasks = []
+        for module_dir in module_dirs:
+            files = []
+            candidates = [(module_dir / "src" / "Other" / "Solution.xml", "solution")]
+            optionsets_dir = module_dir / "src" / "OptionSets"
+            if optionsets_dir.is_dir():
+                candidates.extend((xml_file, "optionset") for xml_file in optionsets_dir.glob("*.xml"))
+            for path, kind in candidates:
+                stamp = file_stamp(path)
+                cached = self._parsed.get(path)
+                if stamp is not None and (cached is None or cached[0] != stamp):
+                    files.append((str(path), kind))
+            if files:
+                tasks.append(files)
+
+        stale = sum(len(files) for files in tasks)
+        if stale < self.parallel_threshold or self.max_workers < 2 or len(tasks) < 2:
+            return
+
+        started = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+                for results in executor.map(_parse_module_files, tasks):
+                    for raw_path, stamp, data, error in results:
+                        if stamp is None:
+                            continue
+                        if error:
+                            logger.warning(f"Error parsing {raw_path}: {error}")
+                        path = Path(raw_path)
+                        self._parsed[path] = (stamp, data)
+                        self._changed.add(path)
+                        if self._unreported is not None:
+                            self._unreported.add(path)
+                        self.generation += 1
+                        self.stats["parsed"] += 1
+        except Exception as e:
+            # Files not parsed here are parsed serially by the caller
+            logger.warning(f"Parallel parsing unavailable ({e}); parsing serially")
+            return
+
+        logger.info(
+            f"Parsed {stale} files from {len(tasks)} modules in {time.perf_counter() - started:.2f}s "
+            f"using {min(self.max_workers, len(tasks))} processes"
+        )
+
+    def _rescan_structure(self) -> None:
+        modules = {}
+        module_dirs = self._find_module_dirs()
+        self._prefetch_parallel(module_dirs)
+        for module_dir in module_dirs:
+            module = self._modules.get(module_dir) or _ModuleEntry(module_dir, self.project_root)
+            self._refresh_module(module)
+            modules[module_dir] = module
+        modules_changed = modules.keys() != self._modules.keys() or not self.stats["builds"]
+        if modules_changed:
+            self.generation += 1
+        self._modules = modules
+
+        # Drop parse results of files that no longer belong to any module
+        live = set()
+        for module in modules.values():
+            live.add(module.solution_xml)
+            live.update(module.option_sets)
+        self._changed.update(p for p in self._parsed if p not in live)
+        self._parsed = {p: v for p, v in self._parsed.items() if p in live}
+        self._structure_dirty = False
+        self._persist(force=modules_changed)
+        self._notify_option_sets()
+
+    def _apply_dirty(self) -> None:
+        for module_path in self._dirty_modules:
+            module = self._modules.get(module_path)
+            if module is not None:
+                self._refresh_module(module)
+
+        for path in self._dirty:
+            module = self._owning_module(path)
+            if module is None:
+                continue
+            if path == module.solution_xml:
+                module.solution = self._load(path, parse_solution_xml)
+            elif path.parent == module.optionsets_dir:
+                data = self._load(path, parse_optionset_xml)
+                if data is None:
+                    module.option_sets.pop(path, None)
+                else:
+                    module.option_sets[path] = data
+        self._dirty.clear()
+        self._dirty_modules.clear()
+        self._persist()
+        self._notify_option_sets()
+
+    def add_option_set_listener(self, callback: Callable[[Set[str]], None]) -> None:
+        """
+        Call back with the schema names of option set files that appear or change.
+
+        The first notification after the initial build reports every option set in
+        the workspace; later ones only the files parsed since (e.g. newly synced).
+        """
+        with self._lock:
+            self._option_set_listeners.append(callback)
+
+    def _notify_option_sets(self) -> None:
+        if self._unreported is None:
+            paths = [p for module in self._modules.values() for p in module.option_sets]
+            self._unreported = set()
+        else:
+            paths, self._unreported = self._unreported, set()
+
+        names = set()
+        for path in paths:
+            module = self._owning_module(path)
+            data = module.option_sets.get(path) if module is not None else None
+            if data and data.get("schemaName"):
+                names.add(data["schemaName"])
+
+        if names:
+            for callback in self._option_set_listeners:
+                try:
+                    callback(names)
+                except Exception as e:
+                    logger.warning(f"Option set listener failed: {e}")
+
+    def _persist(self, force: bool = False) -> None:
+        """Write changed parse results (and the module list) to the catalog"""
+        if self.catalog is None or not (self._changed or force):
+            return
+
+        upserts, deletes = {}, []
+        for path in self._changed:
+            module = self._owning_module(path)
+            cached = self._parsed.get(path)
+            if module is None or cached is None or cached[1] is None:
+                deletes.append(path)
+            elif path == module.solution_xml:
+                upserts[path] = ("solution", module.path, cached[0], cached[1])
+            elif path in module.option_sets:
+                upserts[path] = ("optionset", module.path, cached[0], cached[1])
+            else:
+                deletes.append(path)
+
+        try:
+            self.catalog.sync(self._modules.values(), upserts, deletes)
+            self._changed.clear()
+        except Exception as e:
+            logger.warning(f"Could not update workspace catalog: {e}")
+
+    def refresh(self) -> None:
+        """Bring the index up to date before a read"""
+        if not self._ready.is_set():
+            if self._build_thread is None:
+                self.build()
+            else:
+                self._ready.wait()
+
+        with self._lock:
+            if self._observer is None and time.monotonic() - self._last_verified >= self.poll_interval:
+                # No watcher: re-verify stamps (only changed files are re-parsed)
+                self._structure_dirty = True
+
+            started = time.perf_counter()
+            parsed_before = self.stats["parsed"]
+            kind = None
+            if self._structure_dirty:
+                self._rescan_structure()
+                self._dirty.clear()
+                self._dirty_modules.clear()
+                self.stats["refreshes"] += 1
+                kind = "rescan"
+            elif self._dirty or self._dirty_modules:
+                self._apply_dirty()
+                self.stats["refreshes"] += 1
+                kind = "incremental"
+            self._last_verified = time.monotonic()
+            parsed = self.stats["parsed"] - parsed_before
+
+        if kind is not None:
+            self._report_scan(kind, time.perf_counter() - started, parsed)
+
+    def _report_scan(self, kind: str, seconds: float, parsed: int) -> None:
+        if self.on_scan is not None:
+            try:
+                self.on_scan(kind, seconds, parsed)
+            except Exception as e:
+                logger.warning(f"Scan observer failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get_modules(self) -> List[Dict[str, Any]]:
+        """
+        All modules with path, category and Solution.xml metadata
+
+        Returns:
+            List of {name, displayName, category, path, version, uniqueName}
+        """
+        self.refresh()
+        with self._lock:
+            modules = []
+            for module in self._modules.values():
+                solution = module.solution or {}
+                modules.append({
+                    "name": module.name,
+                    "displayName": solution.get("displayName"),
+                    "category": module.category,
+                    "path": module.relative_path,
+                    "version": solution.get("version", "1.0.0.0"),
+                    "uniqueName": solution.get("uniqueName", "")
+                })
+        return sorted(modules, key=lambda m: m["path"])
+
+    def get_solutions(self) -> List[Dict[str, Any]]:
+        """Solution information of every module with a Solution.xml (list_solutions format)"""
+        self.refresh()
+        with self._lock:
+            solutions = []
+            for module in self._modules.values():
+                if module.solution is None:
+                    continue
+                solutions.append({
+                    "uniqueName": module.solution["uniqueName"],
+                    "displayName": module.solution["localizedName"],
+                    "category": module.top_category,
+                    "module": module.name,
+                    "path": module.relative_path,
+                    "prefix": module.solution["prefix"],
+                    "optionValuePrefix": module.solution["optionValuePrefix"]
+                })
+        return sorted(solutions, key=lambda s: (s.get("category", ""), s.get("module", "")))
+
+    def get_option_sets(self) -> List[Dict[str, Any]]:
+        """Global option sets of every module (scan_option_sets format)"""
+        self.refresh()
+        with self._lock:
+            option_sets = []
+            for module in self._modules.values():
+                for xml_file, data in module.option_sets.items():
+                    option_sets.append({
+                        "schemaName": data["schemaName"],
+                        "displayName": data["displayName"],
+                        "options": [dict(o) for o in data["options"] if o["label"]],
+                        "category": module.top_category,
+                        "module": module.name,
+                        "filePath": str(xml_file.relative_to(self.project_root))
+                    })
+        return sorted(option_sets, key=lambda o: (o.get("category", ""), o.get("module", ""), o.get("displayName", "")))
+
+    def get_option_set_names(self) -> Set[str]:
+        """Schema names of all option sets in the workspace"""
+        self.refresh()
+        with self._lock:
+            return {
+                data["schemaName"]
+                for module in self._modules.values()
+                for data in module.option_sets.values()
+                if data.get("schemaName")
+            }
+
+    def query_option_sets(
+        self,
+        module: Optional[str] = None,
+        category: Optional[str] = None,
+        prefix: Optional[str] = None,
+        value_min: Optional[int] = None,
+        value_max: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Option sets filtered by module, category, publisher prefix or option value range
+
+        Runs as an indexed SQL query when a catalog is attached, otherwise filters in memory.
+        """
+        self.refresh()
+        if self.catalog is not None:
+            with self._lock:
+                return self.catalog.query_option_sets(module, category, prefix, value_min, value_max)
+
+        low = value_min if value_min is not None else float("-inf")
+        high = value_max if value_max is not None else float("inf")
+        results = []
+        for option_set in self.get_option_sets():
+            if module and option_set["module"] != module:
+                continue
+            if category and option_set["category"] != category:
+                continue
+            if prefix and not option_set["schemaName"].startswith(f"{prefix}_"):
+                continue
+            if value_min is not None or value_max is not None:
+                path = self.project_root / option_set["filePath"]
+                values = [o["value"] for o in self._parsed.get(path, (None, {"options": []}))[1]["options"]]
+                if not any(v.lstrip("-").isdigit() and low <= int(v) <= high for v in values):
+                    continue
+            results.append(option_set)
+        return results
+
+    def query_solutions(self, prefix: Optional[str] = None, option_value_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Solutions filtered by publisher prefix or option value prefix"""
+        self.refresh()
+        if self.catalog is not None:
+            with self._lock:
+                return self.catalog.query_solutions(prefix, option_value_prefix)
+
+        return [
+            s for s in self.get_solutions()
+            if (not prefix or s["prefix"] == prefix)
+            and (not option_value_prefix or s["optionValuePrefix"] == option_value_prefix)
+        ]
+
+    def max_option_value(self, module_path: Path) -> int:
+        """Highest option value used by the option sets of a module (0 if none)"""
+        self.refresh()
+        module_path = Path(module_path).resolve()
+        if self.catalog is not None:
+            with self._lock:
+                return self.catalog.max_option_value(module_path) or 0
+
+        with self._lock:
+            module = self._modules.get(module_path)
+            values = [
+                int(o["value"])
+                for data in (module.option_sets.values() if module else [])
+                for o in data["options"]
+                if o["value"].lstrip("-").isdigit()
+            ]
+        return max(values, default=0)
+
+    def fingerprint(self) -> str:
+        """
+        Hash of the indexed module folders and the stamps of their parsed files.
+
+        Stable across restarts while the files are unchanged, so it can be used
+        as a validator (e.g. an HTTP ETag) for anything derived from the index.
+        """
+        self.refresh()
+        with self._lock:
+            if self._fingerprint is None or self._fingerprint[0] != self.generation:
+                digest = hashlib.blake2b(digest_size=16)
+                for module_path in sorted(self._modules):
+                    digest.update(f"{module_path}\n".encode())
+                for path in sorted(self._parsed):
+                    digest.update(f"{path}\0{self._parsed[path][0]}\n".encode())
+                self._fingerprint = (self.generation, digest.hexdigest())
+            return self._fingerprint[1]
+
+    def status(self) -> Dict[str, Any]:
+        """Index statistics"""
+        with self._lock:
+            return {
+                "ready": self._ready.is_set(),
+                "watching": self.watching,
+                "catalog": str(self.catalog.db_path) if self.catalog is not None else None,
+                "modules": len(self._modules),
+                "optionSets": sum(len(m.option_sets) for m in self._modules.values()),
+                **self.stats
+            }
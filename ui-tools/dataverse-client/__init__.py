@@ -5,7 +5,7 @@ Shared library for interacting with Microsoft Dataverse Web API.
 Used by both build-automation CLI tools and ui-tools backend API.
 """
 
-from .client import DataverseClient
+from .client import DataverseClient, DataverseQueryError
 from .config import (
     load_deployment_config, 
     get_deployment_auth, 
@@ -17,9 +17,15 @@ from .config import (
 from .buildmd_parser import parse_field_line, parse_buildmd
 from .buildmd_updater import update_buildmd, update_choice_buildmd
 from .schema_helpers import generate_schema_name, validate_schema_name
+from .solution_components import SolutionComponentBuffer
+from .lookup_resolver import LookupResolver
+from .request_budget import RequestBudget
+from .cassette import CassetteRecorder, CassetteReplayTransport
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, get_environment_health
 
 __all__ = [
     'DataverseClient',
+    'DataverseQueryError',
     'load_deployment_config',
     'get_deployment_auth',
     'scan_solutions',
@@ -32,4 +38,12 @@ __all__ = [
     'update_choice_buildmd',
     'generate_schema_name',
     'validate_schema_name',
+    'SolutionComponentBuffer',
+    'LookupResolver',
+    'RequestBudget',
+    'CassetteRecorder',
+    'CassetteReplayTransport',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'get_environment_health',
 ]
@@ -0,0 +1,297 @@
+"""
+HTTP Record/Replay Cassettes
+
+Captures the Web API traffic of a DataverseClient session to a compact JSON
+lines cassette (with credentials redacted) and serves it back offline through
+an httpx transport. Replayed sessions exercise all client-side work (payload
+building, JSON encoding, result parsing) without touching an environment,
+which makes them suitable for benchmarks and profiling.
+
+Recording a session:
+
+    client = DataverseClient(url, tenant_id, client_id, secret,
+                             transport=CassetteRecorder("session.jsonl", url))
+
+Replaying it:
+
+    client = DataverseClient.from_cassette("session.jsonl", latency="recorded")
+"""
+
+import base64
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+REDACTED = "***"
+
+# Headers never written to a cassette
+_SENSITIVE_HEADERS = {"authorization", "cookie", "set-cookie", "proxy-authorization"}
+
+# Transport-level headers; bodies are stored decoded and replay is host independent
+_TRANSPORT_HEADERS = {
+    "content-encoding", "content-length", "transfer-encoding",
+    "accept-encoding", "connection", "host", "user-agent"
+}
+
+_SENSITIVE_KEY = re.compile(r"secret|password|token|credential", re.IGNORECASE)
+
+
+def _redact(value: Any) -> Any:
+    """Recursively redact values of credential-like keys in a JSON document"""
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if _SENSITIVE_KEY.search(k) else _redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(v) for v in value]
+    return value
+
+
+def _encode_body(content: bytes, content_type: str) -> Dict[str, Any]:
+    """Store a body as JSON, text or base64 (in that order of preference)"""
+    if not content:
+        return {}
+    if "json" in content_type:
+        try:
+            return {"json": _redact(json.loads(content))}
+        except ValueError:
+            pass
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(entry: Dict[str, Any]) -> bytes:
+    if "json" in entry:
+        return json.dumps(entry["json"], separators=(",", ":")).encode("utf-8")
+    if "text" in entry:
+        return entry["text"].encode("utf-8")
+    if "base64" in entry:
+        return base64.b64decode(entry["base64"])
+    return b""
+
+
+def _request_key(method: str, url: Union[str, httpx.URL]) -> Tuple[str, str]:
+    """Match requests on method and path + query, independent of the environment host"""
+    parts = urlsplit(str(url))
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    return method.upper(), target
+
+
+def load_cassette(path: Union[str, Path]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Load a cassette file
+
+    Args:
+        path: Path to the cassette
+
+    Returns:
+        Tuple of (header, interactions)
+    """
+    header: Dict[str, Any] = {}
+    interactions: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if entry.get("cassette"):
+                header = entry
+            else:
+                interactions.append(entry)
+    return header, interactions
+
+
+class CassetteRecorder(httpx.BaseTransport):
+    """
+    httpx transport that forwards requests and appends each interaction to a cassette.
+
+    Interactions are written as they complete, so a cassette is usable even if the
+    session that recorded it crashed. The recorder outlives the per-request httpx
+    clients that use it, so closing one of them leaves the forwarding transport open.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        environment_url: Optional[str] = None,
+        transport: Optional[httpx.BaseTransport] = None
+    ):
+        """
+        Initialize the recorder
+
+        Args:
+            path: Cassette file to write (overwritten)
+            environment_url: Environment URL stored in the cassette header
+            transport: Transport that performs the real requests (defaults to httpx's)
+        """
+        self.path = Path(path)
+        self.transport = transport or httpx.HTTPTransport()
+        self.count = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        header = {
+            "cassette": CASSETTE_VERSION,
+            "environmentUrl": (environment_url or "").rstrip("/"),
+            "recorded": datetime.now().isoformat(timespec="seconds")
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+
+    @classmethod
+    def from_environment(cls, environment_url: str) -> Optional["CassetteRecorder"]:
+        """
+        Create a recorder for a new session if DATAVERSE_CASSETTE_DIR is set.
+
+        Returns:
+            CassetteRecorder writing to a new file in that directory, or None
+        """
+        cassette_dir = os.environ.get("DATAVERSE_CASSETTE_DIR")
+        if not cassette_dir:
+            return None
+
+        host = urlsplit(environment_url).hostname or "dataverse"
+        name = f"{host.split('.')[0]}-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{uuid.uuid4().hex[:6]}.jsonl"
+        recorder = cls(Path(cassette_dir) / name, environment_url)
+        logger.info(f"Recording Dataverse traffic to {recorder.path}")
+        return recorder
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = self.transport.handle_request(request)
+        response.read()
+        elapsed = time.perf_counter() - started
+
+        method, target = _request_key(request.method, request.url)
+        interaction = {
+            "request": {
+                "method": method,
+                "url": target,
+                "headers": {
+                    k: v for k, v in request.headers.items()
+                    if k.lower() not in _SENSITIVE_HEADERS and k.lower() not in _TRANSPORT_HEADERS
+                },
+                **_encode_body(request.content, request.headers.get("content-type", ""))
+            },
+            "response": {
+                "status": response.status_code,
+                "headers": {
+                    k: v for k, v in response.headers.items()
+                    if k.lower() not in _SENSITIVE_HEADERS and k.lower() not in _TRANSPORT_HEADERS
+                },
+                **_encode_body(response.content, response.headers.get("content-type", ""))
+            },
+            "elapsed": round(elapsed, 4)
+        }
+
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+            self.count += 1
+
+        return response
+
+
+class CassetteMissError(httpx.TransportError):
+    """Raised when a replayed session issues a request the cassette does not contain"""
+
+
+class CassetteReplayTransport(httpx.BaseTransport):
+    """
+    httpx transport that serves recorded responses instead of calling Dataverse.
+
+    Requests are matched on method and path + query. Repeated requests to the same
+    target are served in recorded order and wrap around once exhausted, so one
+    cassette can be replayed any number of times.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        latency: Union[None, str, float] = None,
+        strict: bool = True
+    ):
+        """
+        Initialize the replay transport
+
+        Args:
+            path: Cassette file to replay
+            latency: None for no delay, "recorded" to sleep for the recorded duration,
+                     or a fixed number of seconds per request
+            strict: Raise CassetteMissError for unrecorded requests (otherwise answer 404)
+        """
+        if latency is not None and latency != "recorded" and not isinstance(latency, (int, float)):
+            raise ValueError(f"Invalid latency {latency!r}: expected None, 'recorded' or seconds")
+
+        self.path = Path(path)
+        self.latency = latency
+        self.strict = strict
+        self.header, self.interactions = load_cassette(self.path)
+        self.environment_url = self.header.get("environmentUrl", "")
+        self.stats = {"served": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+        self._by_key: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for interaction in self.interactions:
+            req = interaction["request"]
+            self._by_key[(req["method"], req["url"])].append(interaction)
+        self.rewind()
+
+    def rewind(self) -> None:
+        """Restart every request target from its first recorded response"""
+        with self._lock:
+            self._queues: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = {
+                key: deque(entries) for key, entries in self._by_key.items()
+            }
+
+    def _next_interaction(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is None:
+                return None
+            if not queue:
+                queue.extend(self._by_key[key])
+            return queue.popleft()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        key = _request_key(request.method, request.url)
+        interaction = self._next_interaction(key)
+
+        if interaction is None:
+            self.stats["misses"] += 1
+            if self.strict:
+                raise CassetteMissError(f"No recorded response for {key[0]} {key[1]}", request=request)
+            return httpx.Response(404, json={"error": {"message": "Not recorded in cassette"}}, request=request)
+
+        if self.latency == "recorded":
+            time.sleep(interaction.get("elapsed", 0))
+        elif self.latency:
+            time.sleep(self.latency)
+
+        recorded = interaction["response"]
+        self.stats["served"] += 1
+        return httpx.Response(
+            recorded["status"],
+            headers=recorded.get("headers", {}),
+            content=_decode_body(recorded),
+            request=request
+        )
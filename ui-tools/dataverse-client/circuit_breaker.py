@@ -0,0 +1,252 @@
+"""
+Circuit Breaker and Health Scoring per Dataverse Environment
+
+Tracks error and latency rates of Web API calls per environment. Once an
+environment looks degraded the circuit opens and calls fail immediately
+instead of waiting out their timeouts. After a cool-down a cheap probe
+(WhoAmI) decides whether to close the circuit again.
+
+Breakers are shared by every DataverseClient in the process, so a backend
+request learns from failures seen by earlier requests.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of issuing a request while an environment's circuit is open"""
+
+    def __init__(self, environment_url: str, retry_in: float):
+        self.environment_url = environment_url
+        self.retry_in = retry_in
+        super().__init__(
+            f"Dataverse environment {environment_url} is unavailable (circuit open); "
+            f"retrying in {retry_in:.0f}s"
+        )
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for one Dataverse environment.
+
+    The circuit opens when, within the window, at least ``min_requests`` calls were
+    made and the failure rate reaches ``failure_rate_threshold``, or when
+    ``consecutive_failures`` calls fail in a row. Failures are transport errors
+    (including timeouts), HTTP 5xx and HTTP 429. Calls slower than
+    ``slow_call_seconds`` lower the health score but do not open the circuit.
+    """
+
+    def __init__(
+        self,
+        environment_url: str,
+        window_seconds: float = 60.0,
+        min_requests: int = 5,
+        failure_rate_threshold: float = 0.5,
+        consecutive_failures: int = 3,
+        slow_call_seconds: float = 10.0,
+        open_seconds: float = 15.0,
+        max_open_seconds: float = 300.0
+    ):
+        """
+        Initialize the breaker
+
+        Args:
+            environment_url: Environment the breaker guards
+            window_seconds: Length of the rolling window for error and latency rates
+            min_requests: Minimum calls in the window before the failure rate counts
+            failure_rate_threshold: Failure rate (0-1) that opens the circuit
+            consecutive_failures: Consecutive failures that open the circuit
+            slow_call_seconds: Latency above which a call counts as slow
+            open_seconds: Initial cool-down before probing an open circuit
+            max_open_seconds: Upper bound for the cool-down, which doubles after each failed probe
+        """
+        self.environment_url = environment_url
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.failure_rate_threshold = failure_rate_threshold
+        self.consecutive_failures = consecutive_failures
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+
+        self.state = STATE_CLOSED
+        self._calls: Deque[Tuple[float, bool, float]] = deque()
+        self._consecutive = 0
+        self._cooldown = open_seconds
+        self._opened_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_failure_status(status_code: int) -> bool:
+        """Whether an HTTP status indicates a degraded environment (as opposed to a bad request)"""
+        return status_code >= 500 or status_code == 429
+
+    def _trim(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _open(self, now: float, reason: str) -> None:
+        if self.state != STATE_OPEN:
+            logger.warning(f"Circuit opened for {self.environment_url}: {reason}")
+        self.state = STATE_OPEN
+        self._opened_at = now
+
+    def record(self, success: bool, elapsed: float, error: Optional[str] = None) -> None:
+        """
+        Record the outcome of a call
+
+        Args:
+            success: Whether the environment answered normally
+            elapsed: Call duration in seconds
+            error: Error description for failed calls
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._calls.append((now, success, elapsed))
+            self._trim(now)
+
+            if success:
+                self._consecutive = 0
+                return
+
+            self._consecutive += 1
+            self._last_error = error
+            if self.state != STATE_CLOSED:
+                return
+
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            if self._consecutive >= self.consecutive_failures:
+                self._open(now, f"{self._consecutive} consecutive failures ({error})")
+            elif len(self._calls) >= self.min_requests and failures / len(self._calls) >= self.failure_rate_threshold:
+                self._open(now, f"{failures}/{len(self._calls)} calls failed ({error})")
+
+    def before_request(self, probe: Callable[[], bool]) -> None:
+        """
+        Gate a call: return if it may proceed, raise CircuitOpenError otherwise.
+
+        When the cool-down of an open circuit has elapsed, the first caller runs the
+        probe; the circuit closes if it succeeds and reopens with a longer cool-down
+        if it fails. Concurrent callers fail fast while the probe is in flight.
+
+        Args:
+            probe: Callable issuing a cheap request, returning True if the environment is healthy
+        """
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return
+
+            now = time.monotonic()
+            retry_in = self._opened_at + self._cooldown - now
+            if retry_in > 0 or self._probing:
+                raise CircuitOpenError(self.environment_url, max(retry_in, 0.0))
+
+            self.state = STATE_HALF_OPEN
+            self._probing = True
+
+        healthy = False
+        try:
+            healthy = probe()
+        except Exception as e:
+            logger.warning(f"Health probe for {self.environment_url} failed: {e}")
+        finally:
+            with self._lock:
+                self._probing = False
+                now = time.monotonic()
+                if healthy:
+                    logger.info(f"Circuit closed for {self.environment_url} after successful probe")
+                    self.state = STATE_CLOSED
+                    self._calls.clear()
+                    self._consecutive = 0
+                    self._cooldown = self.open_seconds
+                else:
+                    self._cooldown = min(self._cooldown * 2, self.max_open_seconds)
+                    self._open(now, "health probe failed")
+
+        if not healthy:
+            raise CircuitOpenError(self.environment_url, self._cooldown)
+
+    def health(self) -> Dict[str, Any]:
+        """
+        Health snapshot for display
+
+        Returns:
+            Dictionary with state, healthScore (0-100), error/slow rates and latency percentiles
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            calls = list(self._calls)
+            state = self.state
+            retry_in = max(0.0, self._opened_at + self._cooldown - now) if state == STATE_OPEN else 0.0
+
+        total = len(calls)
+        failures = sum(1 for _, ok, _ in calls if not ok)
+        slow = sum(1 for _, _, elapsed in calls if elapsed >= self.slow_call_seconds)
+        latencies = sorted(elapsed for _, _, elapsed in calls)
+        error_rate = failures / total if total else 0.0
+        slow_rate = slow / total if total else 0.0
+
+        if state == STATE_OPEN:
+            score = 0
+        elif state == STATE_HALF_OPEN:
+            score = 25
+        else:
+            score = round(100 * (1 - error_rate) * (1 - 0.5 * slow_rate))
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+        return {
+            "environmentUrl": self.environment_url,
+            "state": state,
+            "healthScore": score,
+            "requests": total,
+            "errorRate": round(error_rate, 3),
+            "slowRate": round(slow_rate, 3),
+            "p50Latency": percentile(0.5),
+            "p95Latency": percentile(0.95),
+            "retryIn": round(retry_in, 1),
+            "lastError": self._last_error
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breakers_enabled() -> bool:
+    """Whether circuit breaking is enabled (DATAVERSE_CIRCUIT_BREAKER=off disables it)"""
+    return os.environ.get("DATAVERSE_CIRCUIT_BREAKER", "").lower() not in ("off", "0", "false", "no")
+
+
+def get_circuit_breaker(environment_url: str) -> CircuitBreaker:
+    """Get the process-wide breaker for an environment, creating it on first use"""
+    key = environment_url.strip().rstrip("/").lower()
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(environment_url.rstrip("/"))
+            _breakers[key] = breaker
+        return breaker
+
+
+def get_environment_health() -> List[Dict[str, Any]]:
+    """Health snapshots of every environment contacted by this process"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [breaker.health() for breaker in breakers]
@@ -6,19 +6,60 @@ Handles authentication and API calls to Dataverse Web API.
 import json
 import logging
 import re
-from typing import Dict, List, Optional, Any
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Any
 import httpx
 from msal import ConfidentialClientApplication
 
+try:
+    from .solution_components import (
+        SolutionComponentBuffer,
+        COMPONENT_TYPE_ATTRIBUTE,
+        COMPONENT_TYPE_OPTIONSET,
+        COMPONENT_TYPE_RELATIONSHIP
+    )
+    from .lookup_resolver import LookupResolver
+    from .request_budget import RequestBudget
+    from .cassette import CassetteRecorder, CassetteReplayTransport
+    from .circuit_breaker import CircuitBreaker, breakers_enabled, get_circuit_breaker
+except ImportError:
+    # Imported as a top-level module (ui-tools backend adds this folder to sys.path)
+    from solution_components import (
+        SolutionComponentBuffer,
+        COMPONENT_TYPE_ATTRIBUTE,
+        COMPONENT_TYPE_OPTIONSET,
+        COMPONENT_TYPE_RELATIONSHIP
+    )
+    from lookup_resolver import LookupResolver
+    from request_budget import RequestBudget
+    from cassette import CassetteRecorder, CassetteReplayTransport
+    from circuit_breaker import CircuitBreaker, breakers_enabled, get_circuit_breaker
+
 logger = logging.getLogger(__name__)
 
 
+class DataverseQueryError(RuntimeError):
+    """A paged query failed before all pages were read"""
+
+
 class DataverseClient:
     """Client for interacting with Dataverse Web API"""
     
     # Dataverse API version
     API_VERSION = "v9.2"
     
+    # Refresh the access token this many seconds before it expires
+    TOKEN_REFRESH_MARGIN = 300
+    
+    # Keep idle connections open long enough to be reused by the next request
+    # of an interactive session (httpx closes them after 5 seconds by default)
+    CONNECTION_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120.0)
+    
+    # Process-wide callbacks receiving timing events of Web API calls and authentication
+    _observers: List[Callable[[Dict[str, Any]], None]] = []
+    
     # Field type mappings from UI to Dataverse AttributeTypeCode
     FIELD_TYPE_MAP = {
         "Text": "String",
@@ -37,7 +78,15 @@ class DataverseClient:
         "Owner": "Owner"
     }
     
-    def __init__(self, environment_url: str, tenant_id: str, client_id: str, client_secret: str):
+    def __init__(
+        self,
+        environment_url: str,
+        tenant_id: str,
+        client_id: str,
+        client_secret: str,
+        request_budget: Optional[RequestBudget] = None,
+        transport: Optional[httpx.BaseTransport] = None
+    ):
         """
         Initialize Dataverse client
         
@@ -46,20 +95,123 @@ class DataverseClient:
             tenant_id: Azure AD tenant ID
             client_id: Application (client) ID
             client_secret: Application client secret
+            request_budget: Shared request budget (defaults to the machine-wide budget
+                            for this application user and environment)
+            transport: Optional httpx transport for all Web API calls, e.g. a
+                       CassetteRecorder or CassetteReplayTransport (defaults to
+                       recording when DATAVERSE_CASSETTE_DIR is set)
         """
         self.environment_url = environment_url.rstrip('/')
         self.tenant_id = tenant_id
         self.client_id = client_id
         self.client_secret = client_secret
         self.access_token = None
+        self.token_expires_at = 0.0
+        
+        # Token bucket shared with every other process using this app user and environment
+        self.request_budget = request_budget or RequestBudget.for_client(self.environment_url, client_id)
+        
+        # Optional buffer collecting created components for a target solution
+        self.component_buffer: Optional[SolutionComponentBuffer] = None
+        
+        # Lazily created natural key -> GUID resolution cache (see `lookups`)
+        self._lookup_resolver: Optional[LookupResolver] = None
         
-        # Initialize MSAL client
+        # Record/replay hook; replayed sessions never contact Azure AD or Dataverse
+        self.transport = transport or CassetteRecorder.from_environment(self.environment_url)
+        self.offline = isinstance(self.transport, CassetteReplayTransport)
+        
+        # Process-wide breaker for this environment: fail fast while it is degraded
+        self.circuit_breaker: Optional[CircuitBreaker] = None
+        if breakers_enabled() and not self.offline:
+            self.circuit_breaker = get_circuit_breaker(self.environment_url)
+        
+        # MSAL client is created on first authentication (authority discovery needs the network)
         self.authority = f"https://login.microsoftonline.com/{tenant_id}"
-        self.app = ConfidentialClientApplication(
-            client_id=client_id,
-            client_credential=client_secret,
-            authority=self.authority
+        self._app: Optional[ConfidentialClientApplication] = None
+        
+        # Connection pool shared by all calls of this client (created on first request)
+        self._http: Optional[httpx.Client] = None
+        self._http_lock = threading.Lock()
+    
+    @classmethod
+    def add_observer(cls, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Register a callback for call timings of every client in this process
+        
+        The callback receives {"kind": "request" | "authenticate", "environmentUrl",
+        "method", "status" (HTTP status, or None on transport errors), "seconds"}.
+        It runs on the calling thread and must be cheap.
+        """
+        cls._observers.append(callback)
+    
+    def _notify_observers(self, kind: str, seconds: float, method: Optional[str] = None, status: Optional[int] = None) -> None:
+        event = {"kind": kind, "environmentUrl": self.environment_url, "method": method, "status": status, "seconds": seconds}
+        for callback in self._observers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.debug(f"Observer failed: {e}")
+    
+    def __enter__(self) -> "DataverseClient":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    @property
+    def http(self) -> httpx.Client:
+        """Pooled HTTP client, keeping TLS connections to the environment alive between calls"""
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    self._http = httpx.Client(transport=self.transport, limits=self.CONNECTION_LIMITS)
+        return self._http
+    
+    def close(self) -> None:
+        """Close pooled connections; the client reconnects on its next call"""
+        with self._http_lock:
+            http, self._http = self._http, None
+        if http is not None:
+            http.close()
+    
+    @classmethod
+    def from_cassette(
+        cls,
+        path: str,
+        latency=None,
+        environment_url: Optional[str] = None
+    ) -> "DataverseClient":
+        """
+        Create an offline client that replays a recorded cassette
+        
+        Args:
+            path: Cassette file recorded with CassetteRecorder
+            latency: None for no delay, "recorded" for recorded durations, or fixed seconds
+            environment_url: Environment URL (defaults to the one stored in the cassette)
+        
+        Returns:
+            DataverseClient serving every Web API call from the cassette
+        """
+        transport = CassetteReplayTransport(path, latency=latency)
+        return cls(
+            environment_url=environment_url or transport.environment_url or "https://replay.crm.dynamics.com",
+            tenant_id="replay",
+            client_id="replay",
+            client_secret="replay",
+            transport=transport
         )
+    
+    @property
+    def app(self) -> ConfidentialClientApplication:
+        """MSAL confidential client application"""
+        if self._app is None:
+            self._app = ConfidentialClientApplication(
+                client_id=self.client_id,
+                client_credential=self.client_secret,
+                authority=self.authority
+            )
+        return self._app
         
     def authenticate(self) -> str:
         """
@@ -68,14 +220,23 @@ class DataverseClient:
         Returns:
             Access token string
         """
+        if self.offline:
+            self.access_token = "offline"
+            self.token_expires_at = float("inf")
+            return self.access_token
+        
         # Dataverse scope
         scopes = [f"{self.environment_url}/.default"]
         
         try:
+            started = time.perf_counter()
             result = self.app.acquire_token_for_client(scopes=scopes)
+            if self._observers:
+                self._notify_observers("authenticate", time.perf_counter() - started, status=200 if "access_token" in result else 401)
             
             if "access_token" in result:
                 self.access_token = result["access_token"]
+                self.token_expires_at = time.monotonic() + float(result.get("expires_in", 3600))
                 logger.info("Successfully authenticated to Dataverse")
                 return self.access_token
             else:
@@ -87,8 +248,8 @@ class DataverseClient:
             raise
     
     def _get_headers(self) -> Dict[str, str]:
-        """Get HTTP headers with authorization"""
-        if not self.access_token:
+        """Get HTTP headers with authorization, renewing the token shortly before it expires"""
+        if not self.access_token or time.monotonic() >= self.token_expires_at - self.TOKEN_REFRESH_MARGIN:
             self.authenticate()
         
         return {
@@ -99,6 +260,69 @@ class DataverseClient:
             "Content-Type": "application/json; charset=utf-8"
         }
     
+    def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Issue an HTTP request against the Dataverse Web API.
+        
+        All Web API traffic goes through here so it is accounted against the shared
+        request budget before it is sent and its outcome feeds the environment's
+        circuit breaker.
+        
+        Raises:
+            CircuitOpenError: If the environment's circuit is open
+        """
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.before_request(self._probe_environment)
+        
+        if self.request_budget is not None and not self.offline:
+            self.request_budget.acquire()
+        
+        started = time.perf_counter()
+        try:
+            response = self.http.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            elapsed = time.perf_counter() - started
+            if breaker is not None:
+                breaker.record(False, elapsed, f"{type(e).__name__}: {e}")
+            if self._observers:
+                self._notify_observers("request", elapsed, method)
+            raise
+        
+        elapsed = time.perf_counter() - started
+        if breaker is not None:
+            failed = CircuitBreaker.is_failure_status(response.status_code)
+            breaker.record(not failed, elapsed, f"HTTP {response.status_code}" if failed else None)
+        if self._observers:
+            self._notify_observers("request", elapsed, method, response.status_code)
+        return response
+    
+    def _probe_environment(self) -> bool:
+        """Cheap WhoAmI call used by the circuit breaker to test an open circuit"""
+        if self.request_budget is not None:
+            self.request_budget.acquire()
+        
+        url = f"{self.environment_url}/api/data/{self.API_VERSION}/WhoAmI"
+        response = self.http.get(url, headers=self._get_headers(), timeout=10.0)
+        return response.status_code == 200
+    
+    @staticmethod
+    def _extract_metadata_id(response: httpx.Response) -> Optional[str]:
+        """Extract the MetadataId of a created component from the OData-EntityId header"""
+        entity_id_header = response.headers.get("OData-EntityId", "")
+        matches = re.findall(r"\(([0-9a-fA-F-]{36})\)", entity_id_header)
+        return matches[-1] if matches else None
+    
+    def _register_component(self, response: httpx.Response, component_type: int, name: str) -> Optional[str]:
+        """Register a created component with the active solution component buffer"""
+        metadata_id = self._extract_metadata_id(response)
+        if self.component_buffer is not None:
+            if metadata_id:
+                self.component_buffer.register(metadata_id, component_type, name)
+            else:
+                logger.warning(f"Could not determine MetadataId for {name}; it will not be added to the solution")
+        return metadata_id
+    
     def create_string_field(
         self, 
         table_name: str, 
@@ -578,36 +802,38 @@ class DataverseClient:
         url = f"{self.environment_url}/api/data/{self.API_VERSION}/RelationshipDefinitions"
         
         try:
-            with httpx.Client() as client:
-                response = client.post(
-                    url,
-                    headers=self._get_headers(),
-                    json=relationship_metadata,
-                    timeout=120.0  # Increased timeout for lookup relationship creation (can take 30-90 seconds)
-                )
+            response = self._request(
+                "POST",
+                url,
+                headers=self._get_headers(),
+                json=relationship_metadata,
+                timeout=120.0  # Increased timeout for lookup relationship creation (can take 30-90 seconds)
+            )
+            
+            if response.status_code in [200, 201, 204]:
+                logger.info(f"Successfully created lookup relationship: {relationship_name}")
+                metadata_id = self._register_component(response, COMPONENT_TYPE_RELATIONSHIP, relationship_name)
+                return {
+                    "success": True,
+                    "schema_name": schema_name_pascal,
+                    "relationship_name": relationship_name,
+                    "metadata_id": metadata_id,
+                    "message": f"Lookup field '{field_display_name}' created successfully"
+                }
+            else:
+                error_detail = response.text
+                try:
+                    error_json = response.json()
+                    error_detail = error_json.get("error", {}).get("message", response.text)
+                except:
+                    pass
                 
-                if response.status_code in [200, 201, 204]:
-                    logger.info(f"Successfully created lookup relationship: {relationship_name}")
-                    return {
-                        "success": True,
-                        "schema_name": schema_name_pascal,
-                        "relationship_name": relationship_name,
-                        "message": f"Lookup field '{field_display_name}' created successfully"
-                    }
-                else:
-                    error_detail = response.text
-                    try:
-                        error_json = response.json()
-                        error_detail = error_json.get("error", {}).get("message", response.text)
-                    except:
-                        pass
-                    
-                    logger.error(f"Failed to create lookup relationship: {response.status_code} - {error_detail}")
-                    return {
-                        "success": False,
-                        "schema_name": schema_name_pascal,
-                        "error": f"API error {response.status_code}: {error_detail}"
-                    }
+                logger.error(f"Failed to create lookup relationship: {response.status_code} - {error_detail}")
+                return {
+                    "success": False,
+                    "schema_name": schema_name_pascal,
+                    "error": f"API error {response.status_code}: {error_detail}"
+                }
                     
         except Exception as e:
             logger.error(f"Error creating lookup relationship: {e}")
@@ -939,30 +1165,32 @@ class DataverseClient:
         url = f"{self.environment_url}/api/data/{self.API_VERSION}/EntityDefinitions(LogicalName='{table_name}')/Attributes"
         
         try:
-            with httpx.Client() as client:
-                response = client.post(
-                    url,
-                    headers=self._get_headers(),
-                    json=attribute,
-                    timeout=30.0
-                )
-                
-                if response.status_code in [200, 201, 204]:
-                    logger.info(f"Successfully created field {attribute['SchemaName']} on {table_name}")
-                    return {
-                        "success": True,
-                        "schema_name": attribute["SchemaName"],
-                        "message": f"Field {attribute['SchemaName']} created successfully"
-                    }
-                else:
-                    error_detail = response.json() if response.text else {}
-                    error_msg = error_detail.get("error", {}).get("message", response.text)
-                    logger.error(f"Failed to create field: {error_msg}")
-                    return {
-                        "success": False,
-                        "schema_name": attribute["SchemaName"],
-                        "error": error_msg
-                    }
+            response = self._request(
+                "POST",
+                url,
+                headers=self._get_headers(),
+                json=attribute,
+                timeout=30.0
+            )
+            
+            if response.status_code in [200, 201, 204]:
+                logger.info(f"Successfully created field {attribute['SchemaName']} on {table_name}")
+                metadata_id = self._register_component(response, COMPONENT_TYPE_ATTRIBUTE, attribute["SchemaName"])
+                return {
+                    "success": True,
+                    "schema_name": attribute["SchemaName"],
+                    "metadata_id": metadata_id,
+                    "message": f"Field {attribute['SchemaName']} created successfully"
+                }
+            else:
+                error_detail = response.json() if response.text else {}
+                error_msg = error_detail.get("error", {}).get("message", response.text)
+                logger.error(f"Failed to create field: {error_msg}")
+                return {
+                    "success": False,
+                    "schema_name": attribute["SchemaName"],
+                    "error": error_msg
+                }
                     
         except Exception as e:
             logger.error(f"Error creating attribute: {e}")
@@ -1152,48 +1380,48 @@ class DataverseClient:
             
             headers = self._get_headers()
             
-            with httpx.Client() as client:
-                # First GET to ensure field exists
-                get_response = client.get(url, headers=headers, timeout=30.0)
-                
-                if get_response.status_code != 200:
-                    return {
-                        "success": False,
-                        "error": f"Name field not found on table '{table_logical_name}'"
-                    }
-                
-                # Now PATCH to update display name
-                patch_data = {
-                    "DisplayName": {
-                        "@odata.type": "Microsoft.Dynamics.CRM.Label",
-                        "LocalizedLabels": [
-                            {
-                                "@odata.type": "Microsoft.Dynamics.CRM.LocalizedLabel",
-                                "Label": new_display_name,
-                                "LanguageCode": 1033
-                            }
-                        ]
-                    }
+            # First GET to ensure field exists
+            get_response = self._request("GET", url, headers=headers, timeout=30.0)
+            
+            if get_response.status_code != 200:
+                return {
+                    "success": False,
+                    "error": f"Name field not found on table '{table_logical_name}'"
+                }
+            
+            # Now PATCH to update display name
+            patch_data = {
+                "DisplayName": {
+                    "@odata.type": "Microsoft.Dynamics.CRM.Label",
+                    "LocalizedLabels": [
+                        {
+                            "@odata.type": "Microsoft.Dynamics.CRM.LocalizedLabel",
+                            "Label": new_display_name,
+                            "LanguageCode": 1033
+                        }
+                    ]
+                }
+            }
+            
+            # Add required header for PATCH
+            patch_headers = {**headers, "If-Match": "*"}
+            
+            patch_response = self._request(
+                "PATCH",
+                url, 
+                json=patch_data, 
+                headers=patch_headers, 
+                timeout=30.0
+            )
+            
+            if patch_response.status_code == 204:
+                return {"success": True}
+            else:
+                error_detail = patch_response.text
+                return {
+                    "success": False,
+                    "error": f"API returned {patch_response.status_code}: {error_detail}"
                 }
-                
-                # Add required header for PATCH
-                patch_headers = {**headers, "If-Match": "*"}
-                
-                patch_response = client.patch(
-                    url, 
-                    json=patch_data, 
-                    headers=patch_headers, 
-                    timeout=30.0
-                )
-                
-                if patch_response.status_code == 204:
-                    return {"success": True}
-                else:
-                    error_detail = patch_response.text
-                    return {
-                        "success": False,
-                        "error": f"API returned {patch_response.status_code}: {error_detail}"
-                    }
                     
         except Exception as e:
             logger.error(f"Error updating Name field: {e}")
@@ -1277,36 +1505,38 @@ class DataverseClient:
                 headers["MSCRM.SolutionUniqueName"] = solution_unique_name
                 logger.info(f"Creating global option set in solution: {solution_unique_name}")
             
-            with httpx.Client() as client:
-                response = client.post(
-                    url,
-                    headers=headers,
-                    json=optionset_metadata,
-                    timeout=120.0  # Increased timeout for option set creation (can take time when adding to solution)
-                )
+            response = self._request(
+                "POST",
+                url,
+                headers=headers,
+                json=optionset_metadata,
+                timeout=120.0  # Increased timeout for option set creation (can take time when adding to solution)
+            )
+            
+            if response.status_code in [200, 201, 204]:
+                logger.info(f"Successfully created global option set: {schema_name}")
+                metadata_id = self._register_component(response, COMPONENT_TYPE_OPTIONSET, schema_name)
+                return {
+                    "success": True,
+                    "schema_name": schema_name,
+                    "display_name": display_name,
+                    "metadata_id": metadata_id,
+                    "message": f"Global option set '{display_name}' created successfully"
+                }
+            else:
+                error_detail = response.text
+                try:
+                    error_json = response.json()
+                    error_detail = error_json.get("error", {}).get("message", response.text)
+                except:
+                    pass
                 
-                if response.status_code in [200, 201, 204]:
-                    logger.info(f"Successfully created global option set: {schema_name}")
-                    return {
-                        "success": True,
-                        "schema_name": schema_name,
-                        "display_name": display_name,
-                        "message": f"Global option set '{display_name}' created successfully"
-                    }
-                else:
-                    error_detail = response.text
-                    try:
-                        error_json = response.json()
-                        error_detail = error_json.get("error", {}).get("message", response.text)
-                    except:
-                        pass
-                    
-                    logger.error(f"Failed to create global option set: {response.status_code} - {error_detail}")
-                    return {
-                        "success": False,
-                        "schema_name": schema_name,
-                        "error": f"API error {response.status_code}: {error_detail}"
-                    }
+                logger.error(f"Failed to create global option set: {response.status_code} - {error_detail}")
+                return {
+                    "success": False,
+                    "schema_name": schema_name,
+                    "error": f"API error {response.status_code}: {error_detail}"
+                }
                     
         except Exception as e:
             logger.error(f"Error creating global option set: {e}")
@@ -1329,18 +1559,18 @@ class DataverseClient:
         url = f"{self.environment_url}/api/data/{self.API_VERSION}/EntityDefinitions(LogicalName='{table_name}')"
         
         try:
-            with httpx.Client() as client:
-                response = client.get(
-                    url,
-                    headers=self._get_headers(),
-                    timeout=15.0
-                )
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.warning(f"Table {table_name} not found or error: {response.status_code}")
-                    return None
+            response = self._request(
+                "GET",
+                url,
+                headers=self._get_headers(),
+                timeout=15.0
+            )
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logger.warning(f"Table {table_name} not found or error: {response.status_code}")
+                return None
                     
         except Exception as e:
             logger.error(f"Error getting table metadata: {e}")
@@ -1359,18 +1589,18 @@ class DataverseClient:
         url = f"{self.environment_url}/api/data/{self.API_VERSION}/GlobalOptionSetDefinitions(Name='{option_set_name}')"
         
         try:
-            with httpx.Client() as client:
-                response = client.get(
-                    url,
-                    headers=self._get_headers(),
-                    timeout=15.0
-                )
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.warning(f"Global option set {option_set_name} not found or error: {response.status_code}")
-                    return None
+            response = self._request(
+                "GET",
+                url,
+                headers=self._get_headers(),
+                timeout=15.0
+            )
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logger.warning(f"Global option set {option_set_name} not found or error: {response.status_code}")
+                return None
                     
         except Exception as e:
             logger.error(f"Error getting global option set metadata: {e}")
@@ -1390,58 +1620,58 @@ class DataverseClient:
         
         try:
             logger.info(f"Querying entity definitions from {url}")
-            with httpx.Client() as client:
-                response = client.get(
-                    url,
-                    headers=self._get_headers(),
-                    params=params,
-                    timeout=30.0
-                )
-                
-                logger.info(f"Entity definitions response status: {response.status_code}")
+            response = self._request(
+                "GET",
+                url,
+                headers=self._get_headers(),
+                params=params,
+                timeout=30.0
+            )
+            
+            logger.info(f"Entity definitions response status: {response.status_code}")
+            
+            if response.status_code == 200:
+                data = response.json()
+                entities = []
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    entities = []
+                for entity in data.get("value", []):
+                    logical_name = entity.get("LogicalName", "")
+                    display_name_obj = entity.get("DisplayName", {})
                     
-                    for entity in data.get("value", []):
-                        logical_name = entity.get("LogicalName", "")
-                        display_name_obj = entity.get("DisplayName", {})
-                        
-                        # Filter to custom entities and common system tables
-                        is_custom = entity.get("IsCustomEntity", False)
-                        is_common_system = logical_name in ['account', 'contact', 'systemuser', 'team']
-                        
-                        if not (is_custom or is_common_system):
-                            continue
-                        
-                        # Extract display name from LocalizedLabels
-                        display_name = logical_name  # fallback
-                        if display_name_obj and "LocalizedLabels" in display_name_obj:
-                            labels = display_name_obj.get("LocalizedLabels", [])
-                            if labels and len(labels) > 0:
-                                display_name = labels[0].get("Label", logical_name)
-                        
-                        entities.append({
-                            "logicalName": logical_name,
-                            "displayName": display_name,
-                            "primaryIdAttribute": entity.get("PrimaryIdAttribute", f"{logical_name}id")
-                        })
+                    # Filter to custom entities and common system tables
+                    is_custom = entity.get("IsCustomEntity", False)
+                    is_common_system = logical_name in ['account', 'contact', 'systemuser', 'team']
                     
-                    # Sort by display name since $orderby not supported on EntityDefinitions
-                    entities.sort(key=lambda e: e["displayName"].lower())
+                    if not (is_custom or is_common_system):
+                        continue
                     
-                    logger.info(f"Retrieved {len(entities)} entity definitions")
-                    return entities
-                else:
-                    error_detail = response.text
-                    try:
-                        error_json = response.json()
-                        error_detail = error_json.get("error", {}).get("message", response.text)
-                    except:
-                        pass
-                    logger.error(f"Failed to get entity definitions: {response.status_code} - {error_detail}")
-                    return []
+                    # Extract display name from LocalizedLabels
+                    display_name = logical_name  # fallback
+                    if display_name_obj and "LocalizedLabels" in display_name_obj:
+                        labels = display_name_obj.get("LocalizedLabels", [])
+                        if labels and len(labels) > 0:
+                            display_name = labels[0].get("Label", logical_name)
+                    
+                    entities.append({
+                        "logicalName": logical_name,
+                        "displayName": display_name,
+                        "primaryIdAttribute": entity.get("PrimaryIdAttribute", f"{logical_name}id")
+                    })
+                
+                # Sort by display name since $orderby not supported on EntityDefinitions
+                entities.sort(key=lambda e: e["displayName"].lower())
+                
+                logger.info(f"Retrieved {len(entities)} entity definitions")
+                return entities
+            else:
+                error_detail = response.text
+                try:
+                    error_json = response.json()
+                    error_detail = error_json.get("error", {}).get("message", response.text)
+                except:
+                    pass
+                logger.error(f"Failed to get entity definitions: {response.status_code} - {error_detail}")
+                return []
                     
         except Exception as e:
             logger.error(f"Error getting entity definitions: {e}")
@@ -1463,56 +1693,56 @@ class DataverseClient:
         
         try:
             logger.info(f"Querying global option set definitions from {url}")
-            with httpx.Client() as client:
-                response = client.get(
-                    url,
-                    headers=self._get_headers(),
-                    params=params,
-                    timeout=30.0
-                )
-                
-                logger.info(f"Global option set definitions response status: {response.status_code}")
+            response = self._request(
+                "GET",
+                url,
+                headers=self._get_headers(),
+                params=params,
+                timeout=30.0
+            )
+            
+            logger.info(f"Global option set definitions response status: {response.status_code}")
+            
+            if response.status_code == 200:
+                data = response.json()
+                option_sets = []
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    option_sets = []
+                for optionset in data.get("value", []):
+                    schema_name = optionset.get("Name", "")
+                    display_name_obj = optionset.get("DisplayName", {})
                     
-                    for optionset in data.get("value", []):
-                        schema_name = optionset.get("Name", "")
-                        display_name_obj = optionset.get("DisplayName", {})
-                        
-                        # Filter to custom option sets (exclude system option sets by default)
-                        is_custom = optionset.get("IsCustomOptionSet", False)
-                        
-                        if not is_custom:
-                            continue
-                        
-                        # Extract display name from LocalizedLabels
-                        display_name = schema_name  # fallback
-                        if display_name_obj and "LocalizedLabels" in display_name_obj:
-                            labels = display_name_obj.get("LocalizedLabels", [])
-                            if labels and len(labels) > 0:
-                                display_name = labels[0].get("Label", schema_name)
-                        
-                        option_sets.append({
-                            "schemaName": schema_name,
-                            "displayName": display_name
-                        })
+                    # Filter to custom option sets (exclude system option sets by default)
+                    is_custom = optionset.get("IsCustomOptionSet", False)
                     
-                    # Sort by display name
-                    option_sets.sort(key=lambda o: o["displayName"].lower())
+                    if not is_custom:
+                        continue
                     
-                    logger.info(f"Retrieved {len(option_sets)} global option set definitions")
-                    return option_sets
-                else:
-                    error_detail = response.text
-                    try:
-                        error_json = response.json()
-                        error_detail = error_json.get("error", {}).get("message", response.text)
-                    except:
-                        pass
-                    logger.error(f"Failed to get global option set definitions: {response.status_code} - {error_detail}")
-                    return []
+                    # Extract display name from LocalizedLabels
+                    display_name = schema_name  # fallback
+                    if display_name_obj and "LocalizedLabels" in display_name_obj:
+                        labels = display_name_obj.get("LocalizedLabels", [])
+                        if labels and len(labels) > 0:
+                            display_name = labels[0].get("Label", schema_name)
+                    
+                    option_sets.append({
+                        "schemaName": schema_name,
+                        "displayName": display_name
+                    })
+                
+                # Sort by display name
+                option_sets.sort(key=lambda o: o["displayName"].lower())
+                
+                logger.info(f"Retrieved {len(option_sets)} global option set definitions")
+                return option_sets
+            else:
+                error_detail = response.text
+                try:
+                    error_json = response.json()
+                    error_detail = error_json.get("error", {}).get("message", response.text)
+                except:
+                    pass
+                logger.error(f"Failed to get global option set definitions: {response.status_code} - {error_detail}")
+                return []
                     
         except Exception as e:
             logger.error(f"Error getting global option set definitions: {e}")
@@ -1520,6 +1750,212 @@ class DataverseClient:
             traceback.print_exc()
             return []
 
+    # -------------------------------------------------------------------------
+    # Solution component operations
+    # -------------------------------------------------------------------------
+
+    def track_solution_components(
+        self,
+        solution_unique_name: str,
+        batch_size: int = 100,
+        add_required_components: bool = False
+    ) -> SolutionComponentBuffer:
+        """
+        Start collecting created attributes, relationships and option sets for a solution.
+
+        Every component created through this client afterwards is registered with the
+        buffer. Call ``flush_solution_components`` to add them to the solution.
+
+        Args:
+            solution_unique_name: Unique name of the target solution
+            batch_size: Maximum number of components per $batch request
+            add_required_components: Whether Dataverse should also add required components
+
+        Returns:
+            The active SolutionComponentBuffer
+        """
+        self.component_buffer = SolutionComponentBuffer(
+            self,
+            solution_unique_name,
+            batch_size=batch_size,
+            add_required_components=add_required_components
+        )
+        return self.component_buffer
+
+    def flush_solution_components(self) -> Dict[str, Any]:
+        """
+        Add all components collected since ``track_solution_components`` to the target solution.
+
+        Returns:
+            Dictionary with success status, added/skipped counts and failed components
+        """
+        if self.component_buffer is None:
+            return {"success": True, "added": 0, "skipped": 0, "failed": []}
+        return self.component_buffer.flush()
+
+    def get_solution_id(self, solution_unique_name: str) -> Optional[str]:
+        """
+        Get the solutionid GUID for a solution unique name.
+
+        Args:
+            solution_unique_name: Unique name of the solution
+
+        Returns:
+            Solution GUID or None if not found
+        """
+        records = self.query_records(
+            "solutions",
+            select="solutionid",
+            filter_query=f"uniquename eq '{solution_unique_name}'",
+            top=1,
+        )
+        if records:
+            return records[0].get("solutionid")
+        return None
+
+    def get_solution_component_ids(self, solution_unique_name: str) -> Optional[set]:
+        """
+        Get the components already contained in a solution.
+
+        Args:
+            solution_unique_name: Unique name of the solution
+
+        Returns:
+            Set of (objectid, componenttype) tuples, or None if the solution was not found
+
+        Raises:
+            DataverseQueryError: If the components cannot all be read
+        """
+        solution_id = self.get_solution_id(solution_unique_name)
+        if not solution_id:
+            logger.warning(f"Solution {solution_unique_name} not found")
+            return None
+
+        components = set()
+        for component in self.iter_records(
+            "solutioncomponents",
+            select="objectid,componenttype",
+            filter_query=f"_solutionid_value eq {solution_id}",
+        ):
+            object_id = component.get("objectid")
+            if object_id:
+                components.add((object_id.lower(), component.get("componenttype")))
+
+        return components
+
+    def add_solution_components(
+        self,
+        solution_unique_name: str,
+        components: List[Dict[str, Any]],
+        add_required_components: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Add components to a solution using a single $batch request of AddSolutionComponent actions.
+
+        Args:
+            solution_unique_name: Unique name of the target solution
+            components: List of dicts with 'componentId' and 'componentType' keys
+            add_required_components: Whether Dataverse should also add required components
+
+        Returns:
+            One result dict (success, error) per component, in input order
+        """
+        if not components:
+            return []
+
+        batch_boundary = f"batch_{uuid.uuid4()}"
+        action_url = f"{self.environment_url}/api/data/{self.API_VERSION}/AddSolutionComponent"
+
+        parts = []
+        for component in components:
+            payload = {
+                "ComponentId": component["componentId"],
+                "ComponentType": component["componentType"],
+                "SolutionUniqueName": solution_unique_name,
+                "AddRequiredComponents": add_required_components,
+                "DoNotIncludeSubcomponents": False
+            }
+            parts.append(
+                f"--{batch_boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                "Content-Transfer-Encoding: binary\r\n"
+                "\r\n"
+                f"POST {action_url} HTTP/1.1\r\n"
+                "Content-Type: application/json; type=entry\r\n"
+                "\r\n"
+                f"{json.dumps(payload)}\r\n"
+            )
+        body = "".join(parts) + f"--{batch_boundary}--\r\n"
+
+        headers = self._get_headers()
+        headers["Content-Type"] = f"multipart/mixed; boundary={batch_boundary}"
+        headers["Prefer"] = "odata.continue-on-error"
+
+        url = f"{self.environment_url}/api/data/{self.API_VERSION}/$batch"
+
+        try:
+            response = self._request(
+                "POST",
+                url,
+                headers=headers,
+                content=body.encode("utf-8"),
+                timeout=120.0
+            )
+
+            if response.status_code != 200:
+                error_msg = f"Batch request failed: {response.status_code} - {response.text}"
+                logger.error(error_msg)
+                return [{"success": False, "error": error_msg} for _ in components]
+
+            results = self._parse_batch_response(response)
+
+        except Exception as e:
+            logger.error(f"Error adding solution components: {e}")
+            return [{"success": False, "error": str(e)} for _ in components]
+
+        # A missing response part means the operation was never executed
+        while len(results) < len(components):
+            results.append({"success": False, "error": "No response returned for batch operation"})
+
+        return results[:len(components)]
+
+    @staticmethod
+    def _parse_batch_response(response: httpx.Response) -> List[Dict[str, Any]]:
+        """
+        Parse a multipart/mixed $batch response into per-operation results.
+
+        Returns:
+            List of result dicts (success, error) in response order
+        """
+        content_type = response.headers.get("Content-Type", "")
+        boundary_match = re.search(r"boundary=([^;\s]+)", content_type)
+        if not boundary_match:
+            return []
+
+        boundary = boundary_match.group(1).strip('"')
+        results = []
+
+        for part in response.text.split(f"--{boundary}"):
+            status_match = re.search(r"HTTP/1\.1 (\d{3})", part)
+            if not status_match:
+                continue
+
+            status = int(status_match.group(1))
+            if 200 <= status < 300:
+                results.append({"success": True})
+            else:
+                error_msg = f"HTTP {status}"
+                body_start = part.find("{")
+                if body_start != -1:
+                    try:
+                        error_json = json.loads(part[body_start:part.rfind("}") + 1])
+                        error_msg = error_json.get("error", {}).get("message", error_msg)
+                    except ValueError:
+                        pass
+                results.append({"success": False, "error": error_msg})
+
+        return results
+
     # -------------------------------------------------------------------------
     # Record operations
     # -------------------------------------------------------------------------
@@ -1556,43 +1992,43 @@ class DataverseClient:
         url = f"{self.environment_url}/api/data/{self.API_VERSION}/{entity_set_name}"
 
         try:
-            with httpx.Client() as client:
-                response = client.post(
-                    url,
-                    headers=self._get_headers(),
-                    json=fields,
-                    timeout=30.0,
-                )
-
-                if response.status_code in [200, 201, 204]:
-                    # Extract GUID from OData-EntityId header
-                    entity_id_header = response.headers.get("OData-EntityId", "")
-                    match = re.search(r"\(([0-9a-fA-F-]{36})\)", entity_id_header)
-                    if match:
-                        guid = match.group(1)
-                    else:
-                        # 201 responses may include the record in the body
-                        try:
-                            body = response.json()
-                            # Primary key is typically the first key ending in "id"
-                            guid = next(
-                                (v for k, v in body.items() if k.endswith("id") and isinstance(v, str) and len(v) == 36),
-                                None,
-                            )
-                        except Exception:
-                            guid = None
-
-                    logger.info(f"Created record in {entity_set_name}: {guid}")
-                    return guid
+            response = self._request(
+                "POST",
+                url,
+                headers=self._get_headers(),
+                json=fields,
+                timeout=30.0,
+            )
+
+            if response.status_code in [200, 201, 204]:
+                # Extract GUID from OData-EntityId header
+                entity_id_header = response.headers.get("OData-EntityId", "")
+                match = re.search(r"\(([0-9a-fA-F-]{36})\)", entity_id_header)
+                if match:
+                    guid = match.group(1)
                 else:
-                    error_detail = {}
+                    # 201 responses may include the record in the body
                     try:
-                        error_detail = response.json()
+                        body = response.json()
+                        # Primary key is typically the first key ending in "id"
+                        guid = next(
+                            (v for k, v in body.items() if k.endswith("id") and isinstance(v, str) and len(v) == 36),
+                            None,
+                        )
                     except Exception:
-                        pass
-                    error_msg = error_detail.get("error", {}).get("message", response.text)
-                    logger.error(f"Failed to create record in {entity_set_name}: {error_msg}")
-                    return None
+                        guid = None
+
+                logger.info(f"Created record in {entity_set_name}: {guid}")
+                return guid
+            else:
+                error_detail = {}
+                try:
+                    error_detail = response.json()
+                except Exception:
+                    pass
+                error_msg = error_detail.get("error", {}).get("message", response.text)
+                logger.error(f"Failed to create record in {entity_set_name}: {error_msg}")
+                return None
 
         except Exception as e:
             logger.error(f"Error creating record in {entity_set_name}: {e}")
@@ -1619,20 +2055,19 @@ class DataverseClient:
         headers = {**self._get_headers(), "If-None-Match": "null"}
 
         try:
-            with httpx.Client() as client:
-                response = client.patch(url, headers=headers, json=fields, timeout=30.0)
-                if response.status_code in [200, 201, 204]:
-                    logger.info(f"Upserted record {record_id} in {entity_set_name}")
-                    return True
-                else:
-                    error_detail = {}
-                    try:
-                        error_detail = response.json()
-                    except Exception:
-                        pass
-                    error_msg = error_detail.get("error", {}).get("message", response.text)
-                    logger.error(f"Failed to upsert record {record_id} in {entity_set_name}: {error_msg}")
-                    return False
+            response = self._request("PATCH", url, headers=headers, json=fields, timeout=30.0)
+            if response.status_code in [200, 201, 204]:
+                logger.info(f"Upserted record {record_id} in {entity_set_name}")
+                return True
+            else:
+                error_detail = {}
+                try:
+                    error_detail = response.json()
+                except Exception:
+                    pass
+                error_msg = error_detail.get("error", {}).get("message", response.text)
+                logger.error(f"Failed to upsert record {record_id} in {entity_set_name}: {error_msg}")
+                return False
 
         except Exception as e:
             logger.error(f"Error upserting record: {e}")
@@ -1665,29 +2100,103 @@ class DataverseClient:
             params["$filter"] = filter_query
 
         try:
-            with httpx.Client() as client:
-                response = client.get(
-                    url,
-                    headers=self._get_headers(),
-                    params=params,
-                    timeout=30.0,
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    records = data.get("value", [])
-                    logger.info(f"Queried {len(records)} records from {entity_set_name}")
-                    return records
-                else:
+            response = self._request(
+                "GET",
+                url,
+                headers=self._get_headers(),
+                params=params,
+                timeout=30.0,
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                records = data.get("value", [])
+                logger.info(f"Queried {len(records)} records from {entity_set_name}")
+                return records
+            else:
+                error_detail = {}
+                try:
+                    error_detail = response.json()
+                except Exception:
+                    pass
+                error_msg = error_detail.get("error", {}).get("message", response.text)
+                logger.error(f"Failed to query {entity_set_name}: {error_msg}")
+                return []
+
+        except Exception as e:
+            logger.error(f"Error querying {entity_set_name}: {e}")
+            return []
+
+    def iter_records(
+        self,
+        entity_set_name: str,
+        select: Optional[str] = None,
+        filter_query: Optional[str] = None,
+        page_size: int = 5000,
+    ):
+        """
+        Iterate over all records matching a query, following @odata.nextLink paging.
+
+        Args:
+            entity_set_name: OData collection name (e.g., "contacts")
+            select: Comma-separated field names for $select
+            filter_query: OData $filter expression
+            page_size: Records per page (odata.maxpagesize preference)
+
+        Yields:
+            Record dictionaries, one page at a time
+
+        Raises:
+            DataverseQueryError: If a page cannot be read (records already yielded are incomplete)
+        """
+        url = f"{self.environment_url}/api/data/{self.API_VERSION}/{entity_set_name}"
+        params: Optional[Dict[str, Any]] = {}
+        if select:
+            params["$select"] = select
+        if filter_query:
+            params["$filter"] = filter_query
+        headers = {**self._get_headers(), "Prefer": f"odata.maxpagesize={page_size}"}
+
+        pages = 0
+        try:
+            while url:
+                response = self._request("GET", url, headers=headers, params=params, timeout=60.0)
+                if response.status_code != 200:
                     error_detail = {}
                     try:
                         error_detail = response.json()
                     except Exception:
                         pass
                     error_msg = error_detail.get("error", {}).get("message", response.text)
-                    logger.error(f"Failed to query {entity_set_name}: {error_msg}")
-                    return []
+                    logger.error(f"Failed to query {entity_set_name} (page {pages + 1}): {error_msg}")
+                    raise DataverseQueryError(f"Failed to query {entity_set_name} (page {pages + 1}): {error_msg}")
+
+                data = response.json()
+                pages += 1
+                yield from data.get("value", [])
+
+                # nextLink already carries the query options
+                url = data.get("@odata.nextLink")
+                params = None
 
+        except DataverseQueryError:
+            raise
         except Exception as e:
-            logger.error(f"Error querying {entity_set_name}: {e}")
-            return []
+            logger.error(f"Error querying {entity_set_name} (page {pages + 1}): {e}")
+            raise DataverseQueryError(f"Error querying {entity_set_name} (page {pages + 1}): {e}") from e
+
+        logger.info(f"Queried {entity_set_name} in {pages} page(s)")
+
+    @property
+    def lookups(self) -> LookupResolver:
+        """
+        Lookup resolution service for binding related records by natural key.
+
+        Example::
+
+            client.lookups.prefetch("appbase_assetcategory")
+            fields["appbase_assetcategory@odata.bind"] = client.lookups.bind("appbase_assetcategory", "Vehicles")
+        """
+        if self._lookup_resolver is None:
+            self._lookup_resolver = LookupResolver(self)
+        return self._lookup_resolver
@@ -0,0 +1,329 @@
+"""
+Lookup Resolution Cache
+
+Resolves related records by natural key (primary name or alternate key) to
+GUIDs for ``@odata.bind`` values. Each target table is prefetched once with
+paged queries and kept in an LRU cache, so loading many related rows costs
+O(tables) queries instead of O(rows).
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+KeyValue = Union[str, int, Sequence[Any]]
+
+
+def _normalize_key(value: KeyValue) -> Tuple[Any, ...]:
+    """Normalize a natural key value (scalar or composite) for case-insensitive matching"""
+    if isinstance(value, (list, tuple)):
+        parts = value
+    else:
+        parts = (value,)
+
+    normalized = []
+    for part in parts:
+        if isinstance(part, str):
+            normalized.append(part.strip().casefold())
+        else:
+            normalized.append(part)
+    return tuple(normalized)
+
+
+class _TableKeyMap:
+    """Natural key -> GUID map for one table and one key definition"""
+
+    def __init__(self, entity_set_name: str, primary_id_attribute: str):
+        self.entity_set_name = entity_set_name
+        self.primary_id_attribute = primary_id_attribute
+        self.guids: Dict[Tuple[Any, ...], str] = {}
+        self.ambiguous: set = set()
+
+    def add(self, key: Tuple[Any, ...], guid: str) -> None:
+        existing = self.guids.get(key)
+        if existing and existing != guid:
+            self.ambiguous.add(key)
+        else:
+            self.guids[key] = guid
+
+
+class LookupResolver:
+    """
+    Natural key -> GUID resolution service with per-table prefetch and LRU eviction.
+
+    Key maps are cached per (table, key attributes, prefetch filter), so rows outside a
+    filtered prefetch are never reported missing by lookups without that filter. A
+    prefetch whose query fails part way is not cached; lookups against it resolve to
+    None without querying again for ``failure_ttl`` seconds. The least recently used
+    maps are evicted once more than ``max_tables`` maps or ``max_entries`` keys are held.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_tables: int = 32,
+        max_entries: int = 500000,
+        page_size: int = 5000,
+        failure_ttl: float = 60.0
+    ):
+        """
+        Initialize the resolver
+
+        Args:
+            client: DataverseClient used for metadata and paged record queries
+            max_tables: Maximum number of cached key maps
+            max_entries: Maximum number of cached keys across all maps
+            page_size: Records per page when prefetching
+            failure_ttl: Seconds lookups skip a table whose prefetch failed, instead of
+                         re-reading it for every key
+        """
+        self.client = client
+        self.max_tables = max(1, max_tables)
+        self.max_entries = max(1, max_entries)
+        self.page_size = page_size
+        self.failure_ttl = failure_ttl
+        self._maps: "OrderedDict[Tuple[str, Tuple[str, ...], Optional[str]], _TableKeyMap]" = OrderedDict()
+        self._table_info: Dict[str, Dict[str, str]] = {}
+        self._failed_until: Dict[Tuple[str, Tuple[str, ...], Optional[str]], float] = {}
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "prefetches": 0, "failed_prefetches": 0}
+
+    def _get_table_info(self, table_logical_name: str) -> Optional[Dict[str, str]]:
+        """Get entity set name, primary id and primary name attribute for a table"""
+        info = self._table_info.get(table_logical_name)
+        if info is not None:
+            return info
+
+        meta = self.client.get_table_metadata(table_logical_name)
+        if not meta:
+            return None
+
+        info = {
+            "entity_set_name": meta.get("EntitySetName"),
+            "primary_id_attribute": meta.get("PrimaryIdAttribute", f"{table_logical_name}id"),
+            "primary_name_attribute": meta.get("PrimaryNameAttribute"),
+        }
+        self._table_info[table_logical_name] = info
+        return info
+
+    def _resolve_key_attributes(
+        self,
+        table_logical_name: str,
+        key_attributes: Optional[Iterable[str]]
+    ) -> Optional[Tuple[str, ...]]:
+        """Default to the table's primary name attribute when no key attributes are given"""
+        if key_attributes:
+            return tuple(key_attributes)
+
+        info = self._get_table_info(table_logical_name)
+        if not info or not info.get("primary_name_attribute"):
+            logger.error(f"No primary name attribute found for {table_logical_name}")
+            return None
+        return (info["primary_name_attribute"],)
+
+    def _evict(self) -> None:
+        """Evict least recently used key maps until within limits"""
+        total = sum(len(m.guids) for m in self._maps.values())
+        # The most recently used map is always kept, even if it alone exceeds max_entries
+        while len(self._maps) > 1 and (len(self._maps) > self.max_tables or total > self.max_entries):
+            (table, keys, _), evicted = self._maps.popitem(last=False)
+            total -= len(evicted.guids)
+            logger.info(f"Evicted lookup cache for {table} ({', '.join(keys)}): {len(evicted.guids)} keys")
+
+    def prefetch(
+        self,
+        table_logical_name: str,
+        key_attributes: Optional[Iterable[str]] = None,
+        filter_query: Optional[str] = None
+    ) -> int:
+        """
+        Load the natural key -> GUID map for a table with paged queries.
+
+        Args:
+            table_logical_name: Logical name of the target table
+            key_attributes: Attributes forming the key (defaults to the primary name attribute).
+                            Pass the alternate key's attributes for composite keys.
+            filter_query: Optional OData $filter to restrict the prefetched rows
+
+        Returns:
+            Number of keys cached for the table (0 if the query failed and nothing was cached)
+        """
+        keys = self._resolve_key_attributes(table_logical_name, key_attributes)
+        info = self._get_table_info(table_logical_name)
+        if keys is None or not info or not info.get("entity_set_name"):
+            logger.error(f"Cannot prefetch lookups for {table_logical_name}: table metadata not found")
+            return 0
+
+        cache_key = (table_logical_name, keys, filter_query or None)
+        key_map = _TableKeyMap(info["entity_set_name"], info["primary_id_attribute"])
+        select = ",".join((info["primary_id_attribute"],) + keys)
+
+        try:
+            for record in self.client.iter_records(
+                info["entity_set_name"],
+                select=select,
+                filter_query=filter_query,
+                page_size=self.page_size,
+            ):
+                guid = record.get(info["primary_id_attribute"])
+                values = tuple(record.get(k) for k in keys)
+                if guid and all(v is not None for v in values):
+                    key_map.add(_normalize_key(values), guid)
+        except Exception as e:
+            # A partial map would report the unread rows as missing; don't cache it
+            logger.error(f"Cannot prefetch lookups for {table_logical_name}: {e}")
+            with self._lock:
+                self._failed_until[cache_key] = time.monotonic() + self.failure_ttl
+                self.stats["failed_prefetches"] += 1
+            return 0
+
+        if key_map.ambiguous:
+            logger.warning(
+                f"{len(key_map.ambiguous)} ambiguous key(s) in {table_logical_name} ({', '.join(keys)}); "
+                f"they will not resolve"
+            )
+
+        with self._lock:
+            self._failed_until.pop(cache_key, None)
+            self._maps[cache_key] = key_map
+            self._maps.move_to_end(cache_key)
+            self.stats["prefetches"] += 1
+            self._evict()
+
+        logger.info(f"Prefetched {len(key_map.guids)} lookup keys for {table_logical_name}")
+        return len(key_map.guids)
+
+    def _get_map(
+        self,
+        table_logical_name: str,
+        keys: Tuple[str, ...],
+        prefetch: bool,
+        filter_query: Optional[str] = None
+    ) -> Optional[_TableKeyMap]:
+        cache_key = (table_logical_name, keys, filter_query or None)
+        with self._lock:
+            key_map = self._maps.get(cache_key)
+            if key_map is not None:
+                self._maps.move_to_end(cache_key)
+                return key_map
+
+        if not prefetch:
+            return None
+
+        with self._lock:
+            failed_until = self._failed_until.get(cache_key)
+            if failed_until is not None:
+                if time.monotonic() < failed_until:
+                    # Failed recently; retrying for every key would re-read the table each time
+                    return None
+                del self._failed_until[cache_key]
+
+        self.prefetch(table_logical_name, keys, filter_query)
+        with self._lock:
+            return self._maps.get(cache_key)
+
+    def resolve(
+        self,
+        table_logical_name: str,
+        key_value: KeyValue,
+        key_attributes: Optional[Iterable[str]] = None,
+        prefetch: bool = True,
+        filter_query: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Resolve a natural key to a record GUID.
+
+        Args:
+            table_logical_name: Logical name of the target table
+            key_value: Key value, or a sequence of values for composite alternate keys
+            key_attributes: Attributes forming the key (defaults to the primary name attribute)
+            prefetch: Prefetch the table on first use if it is not cached yet
+            filter_query: Resolve against the rows of a filtered prefetch instead of the whole table
+
+        Returns:
+            Record GUID, or None if not found or ambiguous
+        """
+        keys = self._resolve_key_attributes(table_logical_name, key_attributes)
+        if keys is None:
+            return None
+
+        key_map = self._get_map(table_logical_name, keys, prefetch, filter_query)
+        if key_map is None:
+            return None
+
+        normalized = _normalize_key(key_value)
+        if normalized in key_map.ambiguous:
+            logger.warning(f"Ambiguous lookup key {key_value!r} in {table_logical_name}")
+            self.stats["misses"] += 1
+            return None
+
+        guid = key_map.guids.get(normalized)
+        self.stats["hits" if guid else "misses"] += 1
+        return guid
+
+    def bind(
+        self,
+        table_logical_name: str,
+        key_value: KeyValue,
+        key_attributes: Optional[Iterable[str]] = None,
+        filter_query: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Build an ``@odata.bind`` reference for a record identified by natural key.
+
+        Returns:
+            Bind path such as "/appbase_assetcategories(guid)", or None if not resolved
+        """
+        guid = self.resolve(table_logical_name, key_value, key_attributes, filter_query=filter_query)
+        if not guid:
+            return None
+
+        info = self._get_table_info(table_logical_name)
+        return f"/{info['entity_set_name']}({guid})"
+
+    def bind_many(
+        self,
+        table_logical_name: str,
+        key_values: Iterable[KeyValue],
+        key_attributes: Optional[Iterable[str]] = None,
+        filter_query: Optional[str] = None
+    ) -> List[Optional[str]]:
+        """Build ``@odata.bind`` references for many natural keys (single prefetch per table)"""
+        return [self.bind(table_logical_name, value, key_attributes, filter_query) for value in key_values]
+
+    def register(
+        self,
+        table_logical_name: str,
+        key_value: KeyValue,
+        guid: str,
+        key_attributes: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Add a newly created record to the table's unfiltered key map (no-op if it is not cached).
+
+        Lets rows created during a load be bound later without another prefetch.
+        """
+        keys = self._resolve_key_attributes(table_logical_name, key_attributes)
+        if keys is None:
+            return
+
+        with self._lock:
+            key_map = self._maps.get((table_logical_name, keys, None))
+            if key_map is not None:
+                key_map.add(_normalize_key(key_value), guid)
+
+    def invalidate(self, table_logical_name: Optional[str] = None) -> None:
+        """Drop cached key maps (and prefetch failures) for one table, or all tables"""
+        with self._lock:
+            if table_logical_name is None:
+                self._maps.clear()
+                self._failed_until.clear()
+            else:
+                for cache_key in [k for k in self._maps if k[0] == table_logical_name]:
+                    del self._maps[cache_key]
+                for cache_key in [k for k in self._failed_until if k[0] == table_logical_name]:
+                    del self._failed_until[cache_key]
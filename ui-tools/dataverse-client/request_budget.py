@@ -0,0 +1,305 @@
+"""
+Cross-Process Request Budget
+
+Token bucket shared by every process on this machine that talks to the same
+Dataverse environment as the same application user (backend, CLI tools and
+PowerShell scripts). The bucket state lives in a small file guarded by an OS
+file lock, so aggregate throughput stays just under the service protection
+limits instead of collapsing into 429 retries.
+
+PowerShell scripts reserve budget through the command line interface:
+
+    python request_budget.py reserve --deployment "Development" --environment "INDUSTRY APPS CORE"
+    python request_budget.py status --environment-url https://org.crm.dynamics.com --client-id <id>
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Service protection allows 6000 requests per 5 minutes per user (20/s);
+# stay just under it by default
+DEFAULT_RATE = 18.0
+DEFAULT_BURST = 60.0
+
+
+@contextmanager
+def _file_lock(lock_path: Path):
+    """Hold an exclusive OS-level lock on a file for the duration of the block"""
+    with open(lock_path, "a+b") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.005)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class RequestBudget:
+    """
+    File-backed token bucket keyed per application user and environment.
+
+    Reservations may take the bucket into debt: the caller is told how long to wait
+    until its tokens are covered, so each request costs a single lock acquisition
+    and concurrent callers are queued fairly by arrival order.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        state_dir: Optional[Path] = None
+    ):
+        """
+        Initialize the budget
+
+        Args:
+            key: Budget key (see make_key)
+            rate: Sustained requests per second shared by all processes
+            burst: Maximum tokens that can accumulate while idle
+            state_dir: Directory holding the shared state (defaults to the system temp dir)
+        """
+        self.key = key
+        self.rate = max(rate, 0.001)
+        self.burst = max(burst, 1.0)
+        self.state_dir = Path(state_dir) if state_dir else Path(tempfile.gettempdir()) / "dataverse-request-budget"
+
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        self.state_path = self.state_dir / f"{digest}.json"
+        self.lock_path = self.state_dir / f"{digest}.lock"
+        self._disabled = False
+
+    @staticmethod
+    def make_key(environment_url: str, client_id: str) -> str:
+        """Build the budget key for an application user and environment"""
+        return f"{client_id.strip().lower()}|{environment_url.strip().rstrip('/').lower()}"
+
+    @staticmethod
+    def enabled() -> bool:
+        """Whether shared budgeting is enabled (DATAVERSE_REQUEST_BUDGET=off disables it)"""
+        return os.environ.get("DATAVERSE_REQUEST_BUDGET", "").lower() not in ("off", "0", "false", "no")
+
+    @classmethod
+    def from_environment(cls, key: str) -> "RequestBudget":
+        """
+        Create a budget configured from DATAVERSE_REQUEST_RATE, DATAVERSE_REQUEST_BURST
+        and DATAVERSE_BUDGET_DIR.
+        """
+        return cls(
+            key,
+            rate=float(os.environ.get("DATAVERSE_REQUEST_RATE", DEFAULT_RATE)),
+            burst=float(os.environ.get("DATAVERSE_REQUEST_BURST", DEFAULT_BURST)),
+            state_dir=os.environ.get("DATAVERSE_BUDGET_DIR") or None
+        )
+
+    @classmethod
+    def for_client(cls, environment_url: str, client_id: str) -> Optional["RequestBudget"]:
+        """
+        Create the shared budget for an application user and environment.
+
+        Returns:
+            RequestBudget, or None if budgeting is disabled
+        """
+        if not cls.enabled():
+            return None
+        return cls.from_environment(cls.make_key(environment_url, client_id))
+
+    def _read_state(self, now: float) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            tokens = float(state.get("tokens", self.burst))
+            updated = float(state.get("updated", now))
+        except (OSError, ValueError):
+            tokens, updated = self.burst, now
+
+        # Refill for the time elapsed since the last reservation by any process
+        elapsed = max(0.0, now - updated)
+        tokens = min(self.burst, tokens + elapsed * self.rate)
+        return {"key": self.key, "tokens": tokens, "updated": now}
+
+    def _write_state(self, state: Dict[str, Any]) -> None:
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Reserve tokens without waiting.
+
+        Args:
+            tokens: Number of requests to reserve
+
+        Returns:
+            Seconds the caller must wait before issuing the reserved requests
+        """
+        if self._disabled:
+            return 0.0
+
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            with _file_lock(self.lock_path):
+                state = self._read_state(time.time())
+                state["tokens"] -= tokens
+                self._write_state(state)
+        except OSError as e:
+            # Never block Dataverse traffic because the shared state is unavailable
+            logger.warning(f"Request budget unavailable ({e}); continuing without throttling")
+            self._disabled = True
+            return 0.0
+
+        return max(0.0, -state["tokens"] / self.rate)
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """Return tokens of a reservation that will not be used"""
+        if self._disabled:
+            return
+
+        try:
+            with _file_lock(self.lock_path):
+                state = self._read_state(time.time())
+                state["tokens"] = min(self.burst, state["tokens"] + tokens)
+                self._write_state(state)
+        except OSError as e:
+            logger.warning(f"Could not refund request budget: {e}")
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> float:
+        """
+        Reserve tokens and wait until they are available.
+
+        Args:
+            tokens: Number of requests to reserve
+            timeout: Maximum seconds to wait; the reservation is refunded if exceeded
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            TimeoutError: If the wait would exceed the timeout
+        """
+        wait = self.reserve(tokens)
+        if timeout is not None and wait > timeout:
+            self.refund(tokens)
+            raise TimeoutError(f"Request budget for {self.key} needs {wait:.1f}s, exceeds timeout of {timeout:.1f}s")
+
+        if wait > 0:
+            logger.debug(f"Waiting {wait:.2f}s for request budget ({self.key})")
+            time.sleep(wait)
+        return wait
+
+    def status(self) -> Dict[str, Any]:
+        """Current bucket state (tokens may be negative while callers are queued)"""
+        try:
+            with _file_lock(self.lock_path):
+                state = self._read_state(time.time())
+        except OSError as e:
+            return {"key": self.key, "error": str(e)}
+
+        return {
+            "key": self.key,
+            "tokens": round(state["tokens"], 3),
+            "rate": self.rate,
+            "burst": self.burst,
+            "queuedSeconds": round(max(0.0, -state["tokens"] / self.rate), 3)
+        }
+
+
+def _resolve_cli_key(args) -> str:
+    """Resolve the budget key from CLI arguments (explicit or via deployments.json)"""
+    if args.environment_url and args.client_id:
+        return RequestBudget.make_key(args.environment_url, args.client_id)
+
+    if not (args.deployment and args.environment):
+        raise ValueError("Provide either --environment-url and --client-id, or --deployment and --environment")
+
+    config_path = Path(args.config) if args.config else Path(__file__).parent.parent.parent / ".config" / "deployments.json"
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    deployment = config.get("Deployments", {}).get(args.deployment)
+    if deployment is None:
+        raise KeyError(f"Deployment '{args.deployment}' not found in {config_path}")
+
+    auth = deployment.get("Auth", {})
+    environment_urls = auth.get("EnvironmentUrls", {})
+    # Accept either the environment key or the environment name it maps to
+    environment_url = environment_urls.get(args.environment)
+    if not environment_url:
+        for env_key, env_name in deployment.get("Environments", {}).items():
+            if args.environment in (env_key, env_name):
+                environment_url = environment_urls.get(env_key) or environment_urls.get(env_name)
+                break
+
+    if not environment_url or not auth.get("ClientId"):
+        raise ValueError(
+            f"Auth.ClientId and Auth.EnvironmentUrls['{args.environment}'] are required in deployment '{args.deployment}'"
+        )
+
+    return RequestBudget.make_key(environment_url, auth["ClientId"])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reserve shared Dataverse request budget")
+    parser.add_argument("command", choices=["reserve", "status"])
+    parser.add_argument("--deployment", help="Deployment name in .config/deployments.json")
+    parser.add_argument("--environment", help="Environment key or name in the deployment")
+    parser.add_argument("--environment-url", help="Dataverse environment URL")
+    parser.add_argument("--client-id", help="Application (client) ID")
+    parser.add_argument("--config", help="Path to deployments.json")
+    parser.add_argument("--count", type=float, default=1.0, help="Number of requests to reserve")
+    parser.add_argument("--timeout", type=float, default=None, help="Maximum seconds to wait")
+    args = parser.parse_args(argv)
+
+    try:
+        budget = RequestBudget.from_environment(_resolve_cli_key(args))
+    except (OSError, KeyError, ValueError) as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        return 1
+
+    if not RequestBudget.enabled():
+        print(json.dumps({"success": True, "key": budget.key, "reserved": 0, "waited": 0, "disabled": True}))
+        return 0
+
+    if args.command == "status":
+        print(json.dumps(budget.status()))
+        return 0
+
+    try:
+        waited = budget.acquire(args.count, timeout=args.timeout)
+    except TimeoutError as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        return 2
+
+    print(json.dumps({"success": True, "key": budget.key, "reserved": args.count, "waited": round(waited, 3)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Solution Component Registration
+
+Collects metadata components (attributes, relationships, global option sets)
+created during a session and adds them to a target solution with batched
+AddSolutionComponent calls.
+"""
+
+import logging
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# Dataverse solution component type codes
+COMPONENT_TYPE_ENTITY = 1
+COMPONENT_TYPE_ATTRIBUTE = 2
+COMPONENT_TYPE_OPTIONSET = 9
+COMPONENT_TYPE_RELATIONSHIP = 10
+
+COMPONENT_TYPE_NAMES = {
+    COMPONENT_TYPE_ENTITY: "Entity",
+    COMPONENT_TYPE_ATTRIBUTE: "Attribute",
+    COMPONENT_TYPE_OPTIONSET: "OptionSet",
+    COMPONENT_TYPE_RELATIONSHIP: "Relationship",
+}
+
+
+class SolutionComponentBuffer:
+    """
+    Buffer of created components waiting to be added to a solution.
+
+    Components are registered as they are created and flushed in batches.
+    On flush, components that are already part of the solution are skipped so
+    re-running a session never issues redundant AddSolutionComponent calls.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        solution_unique_name: str,
+        batch_size: int = 100,
+        add_required_components: bool = False
+    ):
+        """
+        Initialize the buffer
+
+        Args:
+            client: Authenticated DataverseClient used to flush the buffer
+            solution_unique_name: Unique name of the target solution
+            batch_size: Maximum number of components per $batch request
+            add_required_components: Whether Dataverse should also add required components
+        """
+        self.client = client
+        self.solution_unique_name = solution_unique_name
+        self.batch_size = max(1, batch_size)
+        self.add_required_components = add_required_components
+        self._pending: Dict[tuple, Dict[str, Any]] = {}
+
+    def register(self, component_id: str, component_type: int, name: Optional[str] = None) -> None:
+        """
+        Register a created component for addition to the solution
+
+        Args:
+            component_id: MetadataId of the component
+            component_type: Solution component type code (e.g., COMPONENT_TYPE_ATTRIBUTE)
+            name: Optional schema name, used for reporting only
+        """
+        if not component_id:
+            return
+
+        key = (component_id.lower(), component_type)
+        if key not in self._pending:
+            self._pending[key] = {
+                "componentId": component_id.lower(),
+                "componentType": component_type,
+                "name": name or component_id
+            }
+
+    @property
+    def pending(self) -> List[Dict[str, Any]]:
+        """Components registered but not yet flushed"""
+        return list(self._pending.values())
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> Dict[str, Any]:
+        """
+        Add all pending components to the target solution
+
+        Returns:
+            Dictionary with success status, added/skipped counts and failed components
+        """
+        if not self._pending:
+            return {"success": True, "added": 0, "skipped": 0, "failed": []}
+
+        try:
+            existing = self.client.get_solution_component_ids(self.solution_unique_name)
+        except Exception as e:
+            # Without the complete list, components already in the solution would be added again
+            return {
+                "success": False,
+                "added": 0,
+                "skipped": 0,
+                "failed": self.pending,
+                "error": f"Could not read the components of solution '{self.solution_unique_name}': {e}"
+            }
+        if existing is None:
+            return {
+                "success": False,
+                "added": 0,
+                "skipped": 0,
+                "failed": self.pending,
+                "error": f"Solution '{self.solution_unique_name}' not found"
+            }
+
+        to_add = []
+        skipped = 0
+        for key, component in self._pending.items():
+            if key in existing:
+                skipped += 1
+            else:
+                to_add.append(component)
+
+        added = 0
+        failed = []
+        for start in range(0, len(to_add), self.batch_size):
+            chunk = to_add[start:start + self.batch_size]
+            results = self.client.add_solution_components(
+                self.solution_unique_name,
+                chunk,
+                add_required_components=self.add_required_components
+            )
+            for component, result in zip(chunk, results):
+                if result.get("success"):
+                    added += 1
+                else:
+                    failed.append({**component, "error": result.get("error", "Unknown error")})
+
+        # Failed components stay pending so the caller can retry the flush
+        failed_keys = {(f["componentId"], f["componentType"]) for f in failed}
+        self._pending = {k: v for k, v in self._pending.items() if k in failed_keys}
+
+        logger.info(
+            f"Flushed solution components to {self.solution_unique_name}: "
+            f"{added} added, {skipped} already present, {len(failed)} failed"
+        )
+
+        return {
+            "success": len(failed) == 0,
+            "added": added,
+            "skipped": skipped,
+            "failed": failed
+        }
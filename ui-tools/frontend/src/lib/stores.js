@@ -83,41 +83,107 @@ export async function loadEnvironments() {
   }
 }
 
-// Stream response helper
-export async function streamResponse(response) {
-  const reader = response.body.getReader();
-  const decoder = new TextDecoder();
+// Events after which a job's stream is over (anything else means the connection dropped)
+const FINAL_EVENT_TYPES = new Set(['complete', 'error', 'cancelled']);
+const REATTACH_ATTEMPTS = 5;
+const REATTACH_DELAY_MS = 1000;
+
+// Read the `data:` payloads of a server-sent event stream. A single write can carry many
+// events and an event can arrive split across reads, so text is buffered across reads and
+// only complete events (up to the last blank line) are parsed.
+//
+// Operations run as backend jobs (X-Job-Id header). If the connection ends before the job's
+// final event, the stream is reattached at /api/jobs/{id}/events after the last event id
+// seen, so output produced while disconnected is replayed instead of lost.
+export async function* sseData(response) {
+  const jobId = response.headers.get('X-Job-Id');
+  let lastEventId = 0;
+  let finished = false;
+  let attempts = 0;
   
-  try {
+  async function* read(current) {
+    const reader = current.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
     while (true) {
       const { done, value } = await reader.read();
-      if (done) break;
+      buffer += done ? decoder.decode() : decoder.decode(value, { stream: true });
+      if (done) buffer += '\n\n';  // A final event without its blank line is still complete
       
-      const text = decoder.decode(value);
-      const lines = text.split('\n');
-      
-      for (const line of lines) {
-        if (line.startsWith('data: ')) {
-          try {
-            const data = JSON.parse(line.substring(6));
-            console.log('[DEBUG] SSE data:', data);
-            
-            if (data.type === 'output') {
-              outputLines.update(lines => [...lines, data.line]);
-            } else if (data.type === 'complete') {
-              operationStatus.set(data.exitCode === 0 ? 'success' : 'error');
-              outputLines.update(lines => [...lines, `\n${data.exitCode === 0 ? '✓' : '✗'} Completed with exit code: ${data.exitCode}`]);
-            } else if (data.type === 'error') {
-              operationStatus.set('error');
-              console.error('[ERROR] Backend error:', data);
-              outputLines.update(lines => [...lines, `\n✗ Error: ${data.message || 'Unknown error'}`]);
+      const end = buffer.lastIndexOf('\n\n');
+      if (end !== -1) {
+        const complete = buffer.substring(0, end);
+        buffer = buffer.substring(end + 2);
+        for (const line of complete.split('\n')) {
+          if (line.startsWith('id: ')) {
+            lastEventId = parseInt(line.substring(4), 10) || lastEventId;
+            attempts = 0;
+          } else if (line.startsWith('data: ')) {
+            const payload = line.substring(6);
+            try {
+              finished = FINAL_EVENT_TYPES.has(JSON.parse(payload).type);
+            } catch {
+              // Reported by the caller when it parses the payload
             }
-          } catch (parseError) {
-            console.error('Failed to parse SSE data:', line, parseError);
-            outputLines.update(lines => [...lines, `\n✗ Parse error: ${line}`]);
+            yield payload;
           }
         }
       }
+      if (done) break;
+    }
+  }
+  
+  let current = response;
+  while (true) {
+    if (current) {
+      try {
+        yield* read(current);
+      } catch (error) {
+        if (!jobId) throw error;
+        console.error('Stream of job', jobId, 'interrupted:', error);
+      }
+      current = null;
+    }
+    
+    if (!jobId || finished || attempts >= REATTACH_ATTEMPTS) return;
+    
+    // Reattach to the job where the dropped connection left off
+    attempts += 1;
+    await new Promise(resolve => setTimeout(resolve, REATTACH_DELAY_MS));
+    try {
+      const url = new URL(`/api/jobs/${encodeURIComponent(jobId)}/events?lastEventId=${lastEventId}`, response.url);
+      const next = await fetch(url);
+      if (next.status === 404) return;  // Job no longer known to the backend
+      if (next.ok) current = next;
+    } catch (error) {
+      console.error('Failed to reattach to job', jobId, error);
+    }
+  }
+}
+
+// Stream response helper
+export async function streamResponse(response) {
+  try {
+    for await (const payload of sseData(response)) {
+      try {
+        const data = JSON.parse(payload);
+        console.log('[DEBUG] SSE data:', data);
+        
+        if (data.type === 'output') {
+          outputLines.update(lines => [...lines, data.line]);
+        } else if (data.type === 'complete') {
+          operationStatus.set(data.exitCode === 0 ? 'success' : 'error');
+          outputLines.update(lines => [...lines, `\n${data.exitCode === 0 ? '✓' : '✗'} Completed with exit code: ${data.exitCode}`]);
+        } else if (data.type === 'error') {
+          operationStatus.set('error');
+          console.error('[ERROR] Backend error:', data);
+          outputLines.update(lines => [...lines, `\n✗ Error: ${data.message || 'Unknown error'}`]);
+        }
+      } catch (parseError) {
+        console.error('Failed to parse SSE data:', payload, parseError);
+        outputLines.update(lines => [...lines, `\n✗ Parse error: ${payload}`]);
+      }
     }
   } catch (error) {
     operationStatus.set('error');
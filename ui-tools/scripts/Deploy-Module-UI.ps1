@@ -120,6 +120,9 @@ try {
     }
     Write-Host ""
     
+    # Reserve shared request budget for the import
+    Request-DataverseBudget -Deployment $Deployment -Environment $envKey -Count 25
+
     # Use the existing Deploy-Solution function from Util.ps1
     if ($Managed) {
         if ($Upgrade) {
@@ -0,0 +1,108 @@
+# PowerShell-Worker.ps1
+# Long-lived PowerShell host for the UI backend (ui-tools/backend/powershell_host.py)
+# Loads Util.ps1 once, then runs UI scripts sent as JSON commands on stdin, one per line:
+#   {"id": "<command id>", "script": "<path to script>", "parameters": {"Module": "core", "Managed": true}}
+# Script output (all streams) is written to stdout as it is produced, followed by the line
+#   <Marker> <command id> <exit code>
+# The worker exits when stdin is closed.
+
+param(
+    [Parameter(Mandatory=$true)]
+    [string]$Marker
+)
+
+# Get project root (go up from ui-tools/scripts to repo root)
+$projectRoot = Split-Path -Parent (Split-Path -Parent $PSScriptRoot)
+
+$utf8 = New-Object System.Text.UTF8Encoding($false)
+[Console]::InputEncoding = $utf8
+[Console]::OutputEncoding = $utf8
+$stdin = [Console]::In
+$stdout = [Console]::Out
+
+# Load utility functions (and the modules they import) once; scripts dot-sourcing Util.ps1 again
+# get the already parsed script block
+. "$projectRoot\.scripts\Util.ps1"
+
+# Environment variables set by a script must not leak into the next one
+$baseEnvironment = [Environment]::GetEnvironmentVariables()
+
+function Restore-Environment {
+    $current = [Environment]::GetEnvironmentVariables()
+    foreach ($name in @($current.Keys)) {
+        if (-not $baseEnvironment.Contains($name)) {
+            [Environment]::SetEnvironmentVariable($name, $null)
+        }
+        elseif ($current[$name] -ne $baseEnvironment[$name]) {
+            [Environment]::SetEnvironmentVariable($name, $baseEnvironment[$name])
+        }
+    }
+    foreach ($name in $baseEnvironment.Keys) {
+        if (-not $current.Contains($name)) {
+            [Environment]::SetEnvironmentVariable($name, $baseEnvironment[$name])
+        }
+    }
+}
+
+$stdout.WriteLine("$Marker ready")
+$stdout.Flush()
+
+while ($null -ne ($line = $stdin.ReadLine())) {
+    if (-not $line.Trim()) {
+        continue
+    }
+
+    $id = ""
+    $exitCode = 1
+    try {
+        $command = $line | ConvertFrom-Json
+        $id = $command.id
+
+        $parameters = @{}
+        if ($command.parameters) {
+            foreach ($property in $command.parameters.PSObject.Properties) {
+                $parameters[$property.Name] = $property.Value
+            }
+        }
+
+        Set-Location $projectRoot
+        $global:LASTEXITCODE = 0
+        $succeeded = $false
+
+        # Same output as the console would show for -File: Write-Host, errors and warnings included.
+        # $? is read right after the script call: it is false only if the script ended with a
+        # non-zero "exit" (which also sets $LASTEXITCODE). A failing native command inside the
+        # script leaves $? alone, so e.g. "git commit" returning 1 for "nothing to commit" in a
+        # script that then returns normally does not fail the run.
+        & {
+            & $command.script @parameters
+            $script:succeeded = $?
+        } *>&1 | Out-String -Stream | ForEach-Object {
+            $stdout.WriteLine($_)
+            $stdout.Flush()
+        }
+
+        # As pwsh -File: the code passed to "exit", and 0 for a script that returns normally
+        if ($succeeded) {
+            $exitCode = 0
+        }
+        elseif ($global:LASTEXITCODE) {
+            $exitCode = $global:LASTEXITCODE
+        }
+        else {
+            $exitCode = 1
+        }
+    }
+    catch {
+        # Terminating error not handled by the script (as pwsh -File reports it)
+        $_ | Out-String -Stream | ForEach-Object { $stdout.WriteLine($_) }
+        $exitCode = 1
+    }
+    finally {
+        Set-Location $projectRoot
+        Restore-Environment
+    }
+
+    $stdout.WriteLine("$Marker $id $exitCode")
+    $stdout.Flush()
+}
@@ -82,6 +82,7 @@ try {
     Write-Host "Path: $modulePath" -ForegroundColor Gray
     Write-Host ""
     
+    Request-DataverseBudget -Deployment $Deployment -Environment $envKey -Count 25
     Set-Location $modulePath
     pac solution sync
     
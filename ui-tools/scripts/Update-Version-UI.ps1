@@ -101,6 +101,9 @@ try {
     Write-Host "Connecting to source environment ($sourceEnv)..." -ForegroundColor Yellow
     Connect-DataverseEnvironment -envName $sourceEnv
     
+    # Reserve shared request budget for the online-version update and sync
+    Request-DataverseBudget -Deployment $Deployment -Environment $sourceEnvKey -Count 30
+
     # Update online version
     Write-Host ""
     Write-Host "Updating online version to $Version..." -ForegroundColor Yellow
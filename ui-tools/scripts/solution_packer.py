@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Pure-Python packer for unmanaged Dataverse solution packages.
+
+Assembles the solution zip directly from a module's unpacked `src/` layout
+(the format written by `pac solution sync` / SolutionPackager) without
+PowerShell, pac or MSBuild:
+
+- Other/Solution.xml becomes solution.xml (marked unmanaged)
+- Other/Customizations.xml is the skeleton of customizations.xml; entities
+  (with their forms, views, visualizations and ribbon), relationships, global
+  option sets, web resources, workflows, app modules, site maps and canvas
+  apps are merged into it
+- Web resource, workflow and canvas app content files are added at the paths
+  their metadata refers to
+
+customizations.xml is written into the zip entry one component at a time and
+content files are streamed from disk, so nothing is staged in a temporary
+folder. Many modules are packed in parallel in a process pool.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import quoteattr
+
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+ET.register_namespace("xsi", XSI_NAMESPACE)
+
+# Entity sub-folders in the order SolutionPackager writes them into an <Entity>
+# (folder, wrapper element, collection element of each file)
+ENTITY_PARTS = [
+    ("FormXml", "FormXml", "forms"),
+    ("SavedQueries", "SavedQueries", "savedqueries"),
+    ("RibbonDiff.xml", "RibbonDiffXml", None),
+    ("Visualizations", "Visualizations", None),
+]
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+class PackError(Exception):
+    """The module's source cannot be packed (missing or malformed files)."""
+
+
+@dataclass
+class PackResult:
+    """Outcome of packing one module."""
+    module: str
+    output: Optional[str] = None
+    version: Optional[str] = None
+    components: Dict[str, int] = field(default_factory=dict)
+    files: int = 0
+    size: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def _parse(path: Path) -> ET.Element:
+    try:
+        return ET.parse(path).getroot()
+    except ET.ParseError as e:
+        raise PackError(f"Malformed XML in {path}: {e}") from e
+
+
+def _serialize(element: ET.Element) -> bytes:
+    element.tail = "\n"
+    return ET.tostring(element, encoding="utf-8", xml_declaration=False)
+
+
+def _is_managed_variant(path: Path) -> bool:
+    return path.stem.endswith("_managed")
+
+
+def _xml_files(folder: Path) -> List[Path]:
+    """Unmanaged component files of a folder, in a stable order."""
+    if not folder.is_dir():
+        return []
+    return sorted(p for p in folder.glob("*.xml") if not _is_managed_variant(p))
+
+
+class SolutionPacker:
+    """Packs one module's src/ folder into an unmanaged solution zip."""
+
+    def __init__(self, module_dir: Path):
+        self.module_dir = Path(module_dir)
+        self.src = self.module_dir / "src"
+        self.components: Dict[str, int] = {}
+        # Zip path -> local file of every content file referenced by the metadata
+        self.content_files: Dict[str, Path] = {}
+
+    # ------------------------------------------------------------------
+    # Solution manifest
+    # ------------------------------------------------------------------
+
+    def solution_xml(self) -> Tuple[bytes, ET.Element]:
+        """solution.xml marked as unmanaged, and its manifest."""
+        path = self.src / "Other" / "Solution.xml"
+        if not path.exists():
+            raise PackError(f"Solution.xml not found at {path}")
+        root = _parse(path)
+        manifest = root.find("SolutionManifest")
+        if manifest is None:
+            raise PackError(f"No SolutionManifest in {path}")
+        managed = manifest.find("Managed")
+        if managed is not None:
+            managed.text = "0"
+        return b'<?xml version="1.0" encoding="utf-8"?>\n' + ET.tostring(root, encoding="utf-8", xml_declaration=False), manifest
+
+    # ------------------------------------------------------------------
+    # customizations.xml sections
+    # ------------------------------------------------------------------
+
+    def _count(self, kind: str) -> None:
+        self.components[kind] = self.components.get(kind, 0) + 1
+
+    def _entity(self, entity_dir: Path) -> bytes:
+        source = _parse(entity_dir / "Entity.xml")
+        entity = ET.Element("Entity")
+        handled = set()
+        for tag in ("Name", "EntityInfo"):
+            child = source.find(tag)
+            if child is not None:
+                entity.append(child)
+                handled.add(tag)
+
+        for folder, wrapper_tag, collection_tag in ENTITY_PARTS:
+            path = entity_dir / folder
+            if wrapper_tag == "RibbonDiffXml":
+                ribbon = _parse(path) if path.exists() else source.find("RibbonDiffXml")
+                if ribbon is not None:
+                    ribbon.tag = "RibbonDiffXml"
+                    entity.append(ribbon)
+                handled.add("RibbonDiffXml")
+                continue
+            if not path.is_dir():
+                continue
+
+            wrapper = ET.SubElement(entity, wrapper_tag)
+            handled.add(wrapper_tag)
+            if folder == "FormXml":
+                # One <forms type="..."> per form type folder, holding every systemform of that type
+                for type_dir in sorted(p for p in path.iterdir() if p.is_dir()):
+                    forms = ET.SubElement(wrapper, "forms", {"type": type_dir.name})
+                    for form_file in _xml_files(type_dir):
+                        forms.extend(list(_parse(form_file)))
+                        self._count("forms")
+            elif collection_tag:
+                collection = ET.SubElement(wrapper, collection_tag)
+                for item_file in _xml_files(path):
+                    collection.extend(list(_parse(item_file)))
+                    self._count(folder)
+            else:
+                for item_file in _xml_files(path):
+                    wrapper.append(_parse(item_file))
+                    self._count(folder)
+
+        for child in source:
+            if child.tag not in handled:
+                entity.append(child)
+        self._count("entities")
+        return _serialize(entity)
+
+    def _entities(self) -> Iterator[bytes]:
+        entities_dir = self.src / "Entities"
+        if not entities_dir.is_dir():
+            return
+        for entity_dir in sorted(p for p in entities_dir.iterdir() if (p / "Entity.xml").exists()):
+            yield self._entity(entity_dir)
+
+    def _relationships(self) -> Iterator[bytes]:
+        """Relationship definitions from Other/Relationships/*.xml, in Relationships.xml order."""
+        definitions: Dict[str, ET.Element] = {}
+        for path in _xml_files(self.src / "Other" / "Relationships"):
+            for relationship in _parse(path):
+                definitions.setdefault(relationship.get("Name"), relationship)
+
+        listing = self.src / "Other" / "Relationships.xml"
+        names = [r.get("Name") for r in _parse(listing)] if listing.exists() else []
+        names += sorted(name for name in definitions if name not in set(names))
+        for name in names:
+            relationship = definitions.get(name)
+            if relationship is not None:
+                self._count("relationships")
+                yield _serialize(relationship)
+
+    def _simple(self, folder: str, kind: str, pattern: str = "*.xml") -> Iterator[bytes]:
+        """Components stored one per file (optionally one folder per component)."""
+        base = self.src / folder
+        if not base.is_dir():
+            return
+        for path in sorted(base.glob(pattern)):
+            if _is_managed_variant(path):
+                continue
+            self._count(kind)
+            yield _serialize(_parse(path))
+
+    def _with_content(self, folder: str, kind: str, suffix: str, uri_tags: Tuple[str, ...]) -> Iterator[bytes]:
+        """
+        Components whose metadata file sits next to content files (web resources,
+        workflows, canvas apps); the content is added at the zip path in the metadata.
+        """
+        base = self.src / folder
+        if not base.is_dir():
+            return
+        for meta_path in sorted(base.rglob(f"*{suffix}")):
+            element = _parse(meta_path)
+            for tag in uri_tags:
+                for uri_element in element.iter(tag):
+                    uri = (uri_element.text or "").strip()
+                    if not uri:
+                        continue
+                    zip_path = uri.lstrip("/")
+                    local = self._content_file(meta_path, suffix, zip_path)
+                    if local is None:
+                        raise PackError(f"Content file for {zip_path} (referenced by {meta_path.name}) not found")
+                    self.content_files[zip_path] = local
+            self._count(kind)
+            yield _serialize(element)
+
+    def _content_file(self, meta_path: Path, suffix: str, zip_path: str) -> Optional[Path]:
+        """Local file of a content URI: same path in src/, else the metadata file without its suffix."""
+        candidate = self.src / zip_path
+        if candidate.is_file():
+            return candidate
+        # Web resources are unpacked without the id suffix of their FileName
+        stripped = meta_path.with_name(meta_path.name[:-len(suffix)])
+        if suffix == ".data.xml" and stripped.is_file():
+            return stripped
+        return None
+
+    def _sections(self) -> Dict[str, Iterator[bytes]]:
+        return {
+            "Entities": self._entities(),
+            "EntityRelationships": self._relationships(),
+            "optionsets": self._simple("OptionSets", "optionSets"),
+            "WebResources": self._with_content("WebResources", "webResources", ".data.xml", ("FileName",)),
+            "Workflows": self._with_content("Workflows", "workflows", ".data.xml", ("XamlFileName", "JsonFileName")),
+            "AppModuleSiteMaps": self._simple("AppModuleSiteMaps", "siteMaps", "*/AppModuleSiteMap.xml"),
+            "AppModules": self._simple("AppModules", "appModules", "*/AppModule.xml"),
+            "CanvasApps": self._with_content(
+                "CanvasApps", "canvasApps", ".meta.xml",
+                ("DocumentUri", "BackgroundImageUri", "AdditionalUri")
+            ),
+        }
+
+    def customizations_xml(self) -> Iterator[bytes]:
+        """customizations.xml in pieces: the skeleton with every component merged in."""
+        path = self.src / "Other" / "Customizations.xml"
+        if not path.exists():
+            raise PackError(f"Customizations.xml not found at {path}")
+        skeleton = _parse(path)
+
+        attributes = "".join(f" {name}={quoteattr(value)}" for name, value in skeleton.attrib.items())
+        yield b'<?xml version="1.0" encoding="utf-8"?>\n'
+        yield f'<{skeleton.tag} xmlns:xsi="{XSI_NAMESPACE}"{attributes}>\n'.encode("utf-8")
+
+        sections = self._sections()
+        for child in skeleton:
+            section = sections.get(child.tag)
+            if section is None:
+                yield _serialize(child)
+                continue
+            first = next(section, None)
+            if first is None:
+                yield _serialize(child)
+                continue
+            yield f"<{child.tag}>\n".encode("utf-8")
+            yield first
+            yield from section
+            yield f"</{child.tag}>\n".encode("utf-8")
+        yield f"</{skeleton.tag}>".encode("utf-8")
+
+    # ------------------------------------------------------------------
+    # Package
+    # ------------------------------------------------------------------
+
+    def _content_types(self, parts: List[str]) -> bytes:
+        extensions = sorted({Path(part).suffix.lstrip(".").lower() for part in parts if Path(part).suffix})
+        lines = ['<?xml version="1.0" encoding="utf-8"?>',
+                 '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">']
+        lines += [f'<Default Extension="{ext}" ContentType="application/octet-stream" />' for ext in extensions]
+        lines += [f'<Override PartName="/{part}" ContentType="application/octet-stream" />'
+                  for part in parts if not Path(part).suffix]
+        lines.append("</Types>")
+        return "".join(lines).encode("utf-8")
+
+    def pack(self, output: Path, compression: int = zipfile.ZIP_DEFLATED) -> PackResult:
+        """Write the unmanaged solution zip to output."""
+        started = time.perf_counter()
+        solution, manifest = self.solution_xml()
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tmp_output = output.with_suffix(".zip.tmp")
+
+        try:
+            with zipfile.ZipFile(tmp_output, "w", compression=compression, compresslevel=6) as package:
+                package.writestr("solution.xml", solution)
+                with package.open("customizations.xml", "w") as entry:
+                    for piece in self.customizations_xml():
+                        entry.write(piece)
+                for zip_path, local in sorted(self.content_files.items()):
+                    package.write(local, zip_path)
+                parts = ["solution.xml", "customizations.xml"] + sorted(self.content_files)
+                package.writestr("[Content_Types].xml", self._content_types(parts))
+            os.replace(tmp_output, output)
+        except BaseException:
+            tmp_output.unlink(missing_ok=True)
+            raise
+
+        return PackResult(
+            module=str(self.module_dir),
+            output=str(output),
+            version=manifest.findtext("Version"),
+            components=dict(sorted(self.components.items())),
+            files=len(parts) + 1,
+            size=output.stat().st_size,
+            seconds=time.perf_counter() - started
+        )
+
+
+def package_name(module_dir: Path) -> str:
+    """Release file name of the unmanaged package (App-Base-<Friendly-Name>-v<version>.zip)."""
+    root = _parse(Path(module_dir) / "src" / "Other" / "Solution.xml")
+    manifest = root.find("SolutionManifest")
+    version = manifest.findtext("Version") or "1.0.0.0"
+    name = Path(module_dir).name
+    localized = manifest.find("LocalizedNames/LocalizedName[@languagecode='1033']")
+    if localized is not None and localized.get("description"):
+        name = re.sub(r"^App Base - ", "", localized.get("description").strip()).replace(" ", "-")
+    return f"App-Base-{name}-v{version}.zip"
+
+
+def pack_module(module_dir: str, output_dir: str, store: bool = False) -> PackResult:
+    """Pack one module; errors are returned in the result (safe to run in a worker process)."""
+    module_path = Path(module_dir)
+    try:
+        output = Path(output_dir) / module_path.name / package_name(module_path)
+        compression = zipfile.ZIP_STORED if store else zipfile.ZIP_DEFLATED
+        return SolutionPacker(module_path).pack(output, compression)
+    except (PackError, OSError, ET.ParseError) as e:
+        return PackResult(module=str(module_path), error=str(e))
+
+
+def pack_modules(module_dirs: List[Path], output_dir: Path, workers: Optional[int] = None,
+                 store: bool = False) -> Iterator[PackResult]:
+    """Pack many modules in a process pool, yielding results as modules finish."""
+    if len(module_dirs) <= 1 or workers == 1:
+        for module_dir in module_dirs:
+            yield pack_module(str(module_dir), str(output_dir), store)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(pack_module, str(m), str(output_dir), store) for m in module_dirs]
+        for future in futures:
+            yield future.result()
+
+
+def find_modules(root: Path) -> List[Path]:
+    """Module folders (category/module) below root that have an unpacked solution."""
+    return sorted(path.parent.parent.parent for path in root.glob("*/*/src/Other/Solution.xml"))
+
+
+def main():
+    """Main entry point for the CLI tool."""
+    parser = argparse.ArgumentParser(
+        description="Pack unmanaged Dataverse solution zips from module src folders",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Pack one module into ./packages/core/
+  python solution_packer.py shared/core
+
+  # Pack every module using 4 worker processes
+  python solution_packer.py --all --workers 4 -o /tmp/packages
+        """
+    )
+    parser.add_argument("modules", nargs="*", help="Module folders (e.g. shared/core), relative to the project root")
+    parser.add_argument("--all", action="store_true", help="Pack every module in the project")
+    parser.add_argument("-o", "--output-dir", default="packages",
+                        help="Output folder; packages are written to <output>/<module>/ (default: ./packages)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--store", action="store_true", help="Store entries uncompressed (faster, larger)")
+    args = parser.parse_args()
+
+    if args.all:
+        module_dirs = find_modules(PROJECT_ROOT)
+    else:
+        module_dirs = [Path(m) if Path(m).is_absolute() else PROJECT_ROOT / m for m in args.modules]
+    if not module_dirs:
+        parser.print_usage()
+        print("Error: No modules given (pass module folders or --all)")
+        return 1
+
+    started = time.perf_counter()
+    failed = 0
+    for result in pack_modules(module_dirs, Path(args.output_dir), args.workers, args.store):
+        name = Path(result.module).name
+        if result.error:
+            failed += 1
+            print(f"✗ {name}: {result.error}")
+            continue
+        counts = ", ".join(f"{count} {kind}" for kind, count in result.components.items())
+        print(f"✓ {name} v{result.version}: {result.output} ({result.size / 1024:.0f} KB, {result.seconds:.2f}s)")
+        if counts:
+            print(f"    {counts}")
+
+    print(f"\nPacked {len(module_dirs) - failed}/{len(module_dirs)} module(s) in {time.perf_counter() - started:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())